@@ -0,0 +1,53 @@
+"""Benchmark batch execution-cost queries against one-at-a-time `Book` queries.
+
+Run with `python benchmarks/book_queries.py`. Each scenario prices the same candidate
+order sizes on a deep book: one `market_buy_price` call per size, one
+`market_buy_prices` batch (exact `Decimal`), and a `FloatLadder` batch (NumPy, if
+installed).
+"""
+
+from decimal import Decimal
+import random
+import time
+
+from tribulnation.sdk.market import Book, FloatLadder
+
+def deep_book(levels: int, *, mid: int = 100_000) -> Book:
+  """A book with `levels` one-tick-apart levels per side around `mid`."""
+  return Book(
+    bids=[Book.Entry(Decimal(mid - i), Decimal(1)) for i in range(1, levels + 1)],
+    asks=[Book.Entry(Decimal(mid + i), Decimal(1)) for i in range(1, levels + 1)],
+  )
+
+def timed(fn, *, repeat: int = 5) -> float:
+  """Best-of-`repeat` seconds for one call of `fn`."""
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    fn()
+    best = min(best, time.perf_counter() - start)
+  return best
+
+def main():
+  try:
+    import numpy # noqa: F401
+    has_numpy = True
+  except ImportError:
+    has_numpy = False
+  rng = random.Random(0)
+  print(f'{"levels":>8} {"sizes":>6} {"single (ms)":>12} {"batch (ms)":>11} {"float (ms)":>11}')
+  for levels in (100, 1_000, 5_000):
+    book = deep_book(levels)
+    for count in (50, 200):
+      qtys = [Decimal(rng.randint(1, levels)) for _ in range(count)]
+      single = timed(lambda: [book.market_buy_price(qty=q) for q in qtys])
+      batch = timed(lambda: book.market_buy_prices(qtys=qtys))
+      if has_numpy:
+        floats = [float(q) for q in qtys]
+        fast = f'{timed(lambda: FloatLadder.of(book.asks).prices_qty(floats))*1e3:>11.2f}'
+      else:
+        fast = f'{"n/a":>11}'
+      print(f'{levels:>8} {count:>6} {single*1e3:>12.2f} {batch*1e3:>11.2f} {fast}')
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,66 @@
+"""Benchmark `Book.update` against the previous rebuild-and-sort implementation.
+
+Run with `python benchmarks/book_update.py`. Each scenario applies the same stream of
+random level diffs to a deep book, once per implementation, and reports the mean cost
+per applied diff.
+"""
+
+from decimal import Decimal
+import random
+import time
+
+from tribulnation.sdk.market import Book
+
+def legacy_update(book: Book, updates: Book):
+  """The pre-ladder `Book.update`: rebuild both sides and re-sort every level."""
+  bids = {e.price: e for e in book.bids}
+  asks = {e.price: e for e in book.asks}
+  for e in updates.bids:
+    if e.qty > 0:
+      bids[e.price] = e
+    else:
+      bids.pop(e.price, None)
+  for e in updates.asks:
+    if e.qty > 0:
+      asks[e.price] = e
+    else:
+      asks.pop(e.price, None)
+  book.bids = [bids[p] for p in sorted(bids.keys(), reverse=True)]
+  book.asks = [asks[p] for p in sorted(asks.keys())]
+
+def deep_book(levels: int, *, mid: int = 100_000) -> Book:
+  """A book with `levels` one-tick-apart levels per side around `mid`."""
+  return Book(
+    bids=[Book.Entry(Decimal(mid - i), Decimal(1)) for i in range(1, levels + 1)],
+    asks=[Book.Entry(Decimal(mid + i), Decimal(1)) for i in range(1, levels + 1)],
+  )
+
+def random_diffs(count: int, *, levels: int, changes: int, seed: int = 0, mid: int = 100_000) -> list[Book]:
+  """Diffs touching `changes` levels each: updates, inserts and removals near the top."""
+  rng = random.Random(seed)
+  def side(sign: int) -> list[Book.Entry]:
+    return [
+      Book.Entry(Decimal(mid + sign * rng.randint(1, levels + levels // 10)), Decimal(rng.choice([0, 1, 2, 3])))
+      for _ in range(changes)
+    ]
+  return [Book(bids=side(-1), asks=side(1)) for _ in range(count)]
+
+def measure(apply, *, levels: int, diffs: list[Book]) -> float:
+  """Mean seconds per diff applied by `apply` on a fresh deep book."""
+  book = deep_book(levels)
+  start = time.perf_counter()
+  for diff in diffs:
+    apply(book, diff)
+  return (time.perf_counter() - start) / len(diffs)
+
+def main():
+  print(f'{"levels":>8} {"changes":>8} {"legacy (us)":>12} {"ladder (us)":>12} {"speedup":>8}')
+  for levels in (100, 1_000, 5_000, 20_000):
+    for changes in (1, 10):
+      diffs = random_diffs(500, levels=levels, changes=changes)
+      legacy = measure(legacy_update, levels=levels, diffs=diffs)
+      ladder = measure(Book.update, levels=levels, diffs=diffs)
+      print(f'{levels:>8} {changes:>8} {legacy*1e6:>12.1f} {ladder*1e6:>12.1f} {legacy/ladder:>7.1f}x')
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,54 @@
+"""Benchmark `@SDK.method` dispatch overhead under different contexts.
+
+Run with `python benchmarks/dispatch.py`. The method itself does nothing, so the figures
+are the cost of entering the context span and running the middleware chain.
+"""
+
+import asyncio
+import contextlib
+import io
+import time
+
+from tribulnation.sdk.core import SDK, Context
+
+class Venue(SDK):
+  @SDK.method
+  async def place_order(self, order: dict) -> str:
+    return 'ok'
+
+  @SDK.method
+  async def nested(self, order: dict) -> str:
+    return await self.place_order(order)
+
+async def per_call(fn, order: dict, *, calls: int) -> float:
+  """Seconds per awaited call."""
+  start = time.perf_counter()
+  for _ in range(calls):
+    await fn(order)
+  return (time.perf_counter() - start) / calls
+
+async def run(calls: int):
+  venue = Venue()
+  order = {'type': 'LIMIT', 'qty': 1, 'price': 100}
+  contexts = {
+    'none': None,
+    'empty': Context(),
+    'log': Context().logged(),
+    'retry': Context().retried(Exception, max_retries=3),
+    'retry+metrics': Context().retried(Exception, max_retries=3).measured(),
+  }
+  print(f'{"context":>14} {"call (us)":>10} {"nested (us)":>12}')
+  for name, ctx in contexts.items():
+    with contextlib.ExitStack() as stack:
+      stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+      if ctx is not None:
+        stack.enter_context(ctx.use())
+      flat = await per_call(venue.place_order, order, calls=calls)
+      nested = await per_call(venue.nested, order, calls=calls)
+    print(f'{name:>14} {flat*1e6:>10.2f} {nested*1e6:>12.2f}')
+
+def main():
+  asyncio.run(run(100_000))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,75 @@
+"""Benchmark `TickBook` against `Decimal` books on an `l2Book`-style snapshot feed.
+
+Run with `python benchmarks/tick_book.py`. Each message is a full snapshot of `(price, size)`
+strings, as Hyperliquid sends them; both paths parse it and work out the changed levels.
+"""
+
+from decimal import Decimal
+import random
+import sys
+import time
+
+from tribulnation.sdk.market import Book, Grid, TickBook, TickLiveBook
+from tribulnation.sdk.market.types.book import diff_books
+
+def snapshots(count: int, *, levels: int, changes: int, seed: int = 0) -> list[tuple[list[tuple[str, str]], list[tuple[str, str]]]]:
+  """Snapshots with `levels` levels per side, on a 0.1 tick / 0.001 step grid.
+
+  Between messages, `changes` random levels per side get a new size.
+  """
+  rng = random.Random(seed)
+  mid = 1_000_000
+  bids = [[f'{(mid - i) / 10:.1f}', f'{rng.randint(1, 5000) / 1000:.3f}'] for i in range(1, levels + 1)]
+  asks = [[f'{(mid + i) / 10:.1f}', f'{rng.randint(1, 5000) / 1000:.3f}'] for i in range(1, levels + 1)]
+  out = []
+  for _ in range(count):
+    for side in (bids, asks):
+      for i in rng.sample(range(levels), changes):
+        side[i][1] = f'{rng.randint(1, 5000) / 1000:.3f}'
+    out.append(([tuple(l) for l in bids], [tuple(l) for l in asks]))
+  return out
+
+def decimal_path(msgs) -> float:
+  """Seconds per message: parse to a `Decimal` book, then diff against the previous one."""
+  prev = Book()
+  start = time.perf_counter()
+  for bids, asks in msgs:
+    book = Book(
+      bids=[Book.Entry(Decimal(p), Decimal(q)) for p, q in bids],
+      asks=[Book.Entry(Decimal(p), Decimal(q)) for p, q in asks],
+    )
+    diff_books(prev, book)
+    prev = book
+  return (time.perf_counter() - start) / len(msgs)
+
+def tick_path(msgs) -> float:
+  """Seconds per message: `TickBook.replace`, building `Decimal`s only for changed levels."""
+  ticks = TickBook(Grid.of(Decimal('0.1')), Grid.of(Decimal('0.001')))
+  start = time.perf_counter()
+  for bids, asks in msgs:
+    ticks.replace(bids=bids, asks=asks)
+  return (time.perf_counter() - start) / len(msgs)
+
+def live_path(msgs) -> float:
+  """Seconds per message: `TickLiveBook.replace`, as Hyperliquid depth streams run it.
+  No `Decimal`s are built until a subscriber reads the book."""
+  live = TickLiveBook(TickBook(Grid.of(Decimal('0.1')), Grid.of(Decimal('0.001'))))
+  start = time.perf_counter()
+  for bids, asks in msgs:
+    live.replace(bids=bids, asks=asks)
+  return (time.perf_counter() - start) / len(msgs)
+
+def main():
+  print(f'{"levels":>8} {"changes":>8} {"decimal (us)":>13} {"ticks (us)":>11} {"live (us)":>10} {"speedup":>8}')
+  for levels in (20, 100, 1_000):
+    for changes in (1, levels // 4, levels):
+      msgs = snapshots(300, levels=levels, changes=changes)
+      dec, tick, live = decimal_path(msgs), tick_path(msgs), live_path(msgs)
+      print(f'{levels:>8} {changes:>8} {dec*1e6:>13.1f} {tick*1e6:>11.1f} {live*1e6:>10.1f} {dec/live:>7.1f}x')
+
+  entry = Book.Entry(Decimal('100000.1'), Decimal('1.234'))
+  decimal_bytes = sys.getsizeof(entry) + sys.getsizeof(entry.__dict__) + sys.getsizeof(entry.price) + sys.getsizeof(entry.qty) + 8
+  print(f'\nbytes per level: Decimal book ~{decimal_bytes}, TickBook 16')
+
+if __name__ == '__main__':
+  main()
@@ -80,6 +80,8 @@ class Exchange(ExchangeMixin, PerpExchange):
     if market_id is not None:
       m = await self.market(market_id)
       return await m.perp_collateral()
+    if (account := await self.synced_account()) is not None:
+      return account.perp_collateral(self.subaccount)
     address = self.address
     sub, markets = await asyncio.gather(
       self.indexer.data.get_subaccount(address=address, subaccount=self.subaccount),
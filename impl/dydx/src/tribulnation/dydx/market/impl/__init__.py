@@ -1,9 +1,10 @@
 from .leverage import max_leverage, effective_imf, effective_mmf
 from .depth import parse_book, depth_stream
 from .rules import parse_rules
+from .account import AccountState
 from .mixin import ExchangeMixin, MarketMixin, Settings
 from .orders import (
-  place_order,
+  place_order, place_orders,
   cancel_order, cancel_orders,
   query_order, open_orders,
 )
@@ -0,0 +1,215 @@
+from typing_extensions import AsyncIterable, AsyncIterator, Awaitable, Callable, Hashable, Mapping, TypeVar
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+import time
+
+from dydx.indexer.data.get_parent_subaccount import ParentSubaccount
+from dydx.indexer.streams.markets import Notification as MarketsNotification
+from dydx.indexer.streams.parent_subaccounts import Notification
+from dydx.indexer.types import PerpetualMarket
+from tribulnation.sdk.core import ApiError, SingleFlight, managed_tasks
+from tribulnation.sdk.market import PerpCollateral, PerpPosition
+from .leverage import effective_imf, effective_mmf
+
+T = TypeVar('T')
+
+QUOTE_SYMBOL = 'USDC'
+
+def _signed(size, side: str) -> Decimal:
+  """Signed size: the indexer reports sizes both signed and unsigned, with a `side`."""
+  size = abs(Decimal(size))
+  return size if side == 'LONG' else -size
+
+@dataclass
+class Holding:
+  size: Decimal
+  """Signed, in base units."""
+  entry_price: Decimal
+
+@dataclass
+class AccountState:
+  """Positions and collateral of a parent subaccount and its children, kept in memory
+  from the parent-subaccount stream, with oracle prices from the markets stream.
+
+  Seeded from REST (one `get_parent_subaccount` call) on first use, and again every
+  `reconcile_every` seconds, to catch anything the stream missed. In between,
+  `perp_position`, `perp_collateral` and `available_notional` answer from memory.
+  Once either stream ends or fails (`live = False`, recorded in `ended`), every call
+  goes back to REST.
+
+  ```python
+  async with exchange.track_account() as account:
+    await market.perp_collateral()  # REST once, then from memory
+    account.updated_at, account.prices_at  # as of
+  ```
+  """
+  reconcile_every: float = 60
+  positions: dict[tuple[int, str], Holding] = field(default_factory=dict)
+  """Open positions, by `(subaccount, market)`."""
+  quote: dict[int, Decimal] = field(default_factory=dict)
+  """Signed USDC balance, by subaccount."""
+  markets: dict[str, PerpetualMarket] = field(default_factory=dict)
+  """Oracle prices and margin parameters, by ticker."""
+  updated: dict[Hashable, int] = field(default_factory=dict)
+  """`version` at each position's or balance's last stream update."""
+  version: int = 0
+  reconciled: float | None = None
+  """`clock()` at the last reconciliation."""
+  updated_at: datetime | None = None
+  """When positions and balances were last updated, from REST or the parent-subaccount stream."""
+  prices_at: datetime | None = None
+  """When oracle prices were last updated, from the markets stream. Not a sign the account is current."""
+  height: int | None = None
+  """Block height of the last stream notification."""
+  live: bool = True
+  ended: dict[str, BaseException | None] = field(default_factory=dict)
+  """Streams (`'account'`, `'markets'`) that ended, with the exception each failed with (`None` if it just ended)."""
+  flights: SingleFlight = field(default_factory=SingleFlight)
+  clock: Callable[[], float] = time.monotonic
+
+  def fresh(self) -> bool:
+    at = self.reconciled
+    return self.live and at is not None and self.clock() - at < self.reconcile_every
+
+  def touch(self):
+    """Mark positions and balances as current."""
+    self.updated_at = datetime.now(timezone.utc)
+
+  def set_position(self, subaccount: int, market: str, holding: Holding | None):
+    if holding is None or holding.size == 0:
+      self.positions.pop((subaccount, market), None)
+    else:
+      self.positions[(subaccount, market)] = holding
+
+  def apply(self, notification: Notification):
+    """Apply a parent-subaccount stream notification."""
+    for p in notification.get('perpetualPositions') or []:
+      key = (p['subaccountNumber'], p['market'])
+      self.version += 1
+      self.updated[key] = self.version
+      holding = Holding(_signed(p['size'], p['side']), Decimal(p['entryPrice'])) if p['status'] == 'OPEN' else None
+      self.set_position(*key, holding)
+    for a in notification.get('assetPositions') or []:
+      if a['symbol'] != QUOTE_SYMBOL:
+        continue
+      self.version += 1
+      self.updated[a['subaccountNumber']] = self.version
+      self.quote[a['subaccountNumber']] = _signed(a['size'], a['side'])
+    if (height := notification.get('blockHeight')) is not None:
+      self.height = int(height)
+    self.touch()
+
+  def apply_markets(self, notification: MarketsNotification):
+    """Apply a markets stream notification (oracle prices and open interest)."""
+    for ticker, update in (notification.get('trading') or {}).items():
+      if (market := self.markets.get(ticker)) is not None:
+        market.update({k: v for k, v in update.items() if v is not None}) # type: ignore
+    for ticker, price in (notification.get('oraclePrices') or {}).items():
+      if (market := self.markets.get(ticker)) is not None:
+        market['oraclePrice'] = price['oraclePrice']
+    self.prices_at = datetime.now(timezone.utc)
+
+  def reconcile(self, snapshot: ParentSubaccount, since: int):
+    """Adopt `snapshot`, fetched over REST from `version == since` on.
+
+    Positions and balances updated by the stream meanwhile keep their newer state;
+    those no longer listed are dropped.
+    """
+    positions: dict[tuple[int, str], Holding] = {}
+    quote: dict[int, Decimal] = {}
+    for sub in snapshot['childSubaccounts']:
+      n = sub['subaccountNumber']
+      for p in sub['openPerpetualPositions'].values():
+        positions[(n, p['market'])] = Holding(_signed(p['size'], p['side']), Decimal(p['entryPrice']))
+      if (a := sub['assetPositions'].get(QUOTE_SYMBOL)) is not None:
+        quote[n] = _signed(a['size'], a['side'])
+    stale = lambda key: self.updated.get(key, 0) <= since
+    for key in [k for k in self.positions if k not in positions and stale(k)]:
+      del self.positions[key]
+    for key, holding in positions.items():
+      if stale(key):
+        self.set_position(*key, holding)
+    for n in [n for n in self.quote if n not in quote and stale(n)]:
+      del self.quote[n]
+    for n, balance in quote.items():
+      if stale(n):
+        self.quote[n] = balance
+    self.reconciled = self.clock()
+    self.touch()
+
+  async def synced(self, fetch: Callable[[], Awaitable[ParentSubaccount]]) -> 'AccountState':
+    """The state, reconciled with `fetch()` first unless fresh."""
+    if not self.fresh():
+      async def reconcile():
+        since = self.version
+        self.reconcile(await fetch(), since)
+      await self.flights.run('account', reconcile)
+    return self
+
+  def market(self, ticker: str) -> PerpetualMarket:
+    market = self.markets.get(ticker)
+    if market is None or market.get('oraclePrice') is None:
+      raise ApiError(f'Oracle price unavailable for {ticker}')
+    return market
+
+  def perp_position(self, market: str, subaccount: int | None = None) -> PerpPosition:
+    """Net position in `market` of `subaccount`, or of every subaccount if `None`."""
+    holdings = [
+      h for (n, m), h in self.positions.items()
+      if m == market and (subaccount is None or n == subaccount)
+    ]
+    size = sum((h.size for h in holdings), Decimal(0))
+    if size == 0:
+      return PerpPosition()
+    entry_price = sum((h.size * h.entry_price for h in holdings), Decimal(0)) / size
+    return PerpPosition(size=size, entry_price=entry_price)
+
+  def perp_collateral(self, subaccount: int) -> PerpCollateral:
+    """Collateral of `subaccount`, as the indexer computes it: equity is the USDC balance
+    plus position values at oracle prices; initial margin uses the effective IMF."""
+    equity = self.quote.get(subaccount, Decimal(0))
+    notional = initial_margin = maintenance_margin = Decimal(0)
+    for (n, ticker), h in self.positions.items():
+      if n != subaccount:
+        continue
+      market = self.market(ticker)
+      price = Decimal(market['oraclePrice']) # type: ignore
+      equity += h.size * price
+      position_notional = abs(h.size) * price
+      notional += position_notional
+      initial_margin += position_notional * effective_imf(market)
+      maintenance_margin += position_notional * effective_mmf(market)
+    return PerpCollateral(
+      equity=equity,
+      free_collateral=equity - initial_margin,
+      initial_margin=initial_margin,
+      maintenance_margin=maintenance_margin,
+      leverage=notional / equity if equity > 0 else Decimal(0),
+      margin_mode='cross' if subaccount < 128 else 'isolated',
+    )
+
+  async def follow(self, stream: str, updates: AsyncIterable[T], apply: Callable[[T], None]):
+    """Apply `updates` until they end or fail, then record `stream` in `ended` and stop
+    answering from memory."""
+    try:
+      async for update in updates:
+        apply(update)
+    except Exception as e:
+      self.ended[stream] = e
+      raise
+    else:
+      self.ended[stream] = None
+    finally:
+      self.live = False
+
+  @asynccontextmanager
+  async def following(
+    self, notifications: AsyncIterable[Notification], markets: AsyncIterable[MarketsNotification],
+    *, initial_markets: Mapping[str, PerpetualMarket],
+  ) -> AsyncIterator['AccountState']:
+    """Follow both streams in the background while in the context, starting from `initial_markets`."""
+    self.markets = {ticker: dict(m) for ticker, m in initial_markets.items()} # type: ignore
+    async with managed_tasks([self.follow('account', notifications, self.apply), self.follow('markets', markets, self.apply_markets)]):
+      yield self
@@ -1,7 +1,7 @@
 from typing_extensions import AsyncIterable, Awaitable, Callable
 from decimal import Decimal
 
-from tribulnation.sdk.market import Book
+from tribulnation.sdk.market import Book, LiveBook
 
 from tribulnation.dydx.core import wrap_exceptions
 from dydx import Indexer
@@ -21,11 +21,18 @@ def parse_book(book: OrderBook) -> Book:
   )
 
 @wrap_exceptions
-async def depth_stream(indexer: Indexer, market: str) -> tuple[AsyncIterable[Book], Callable[[], Awaitable]]:
+async def depth_stream(indexer: Indexer, market: str) -> tuple[AsyncIterable[LiveBook], Callable[[], Awaitable]]:
+  """Maintain a live book from the indexer's orders channel.
+
+  Yields the same `LiveBook` for the initial snapshot and after every update,
+  mutated in place: subscribers must read it through a view (`BookView`,
+  `DiffView`).
+  """
   stream = await indexer.streams.orders(id=market)
-  book = parse_book(stream.reply)
+  live = LiveBook(parse_book(stream.reply))
   async def parsed_stream():
+    yield live
     async for msg in stream:
-      book.update(parse_update(msg))
-      yield book
+      live.update(parse_update(msg))
+      yield live
   return parsed_stream(), stream.unsubscribe
@@ -2,6 +2,7 @@ from typing_extensions import AsyncIterable, Sequence
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+from tribulnation.sdk.core import PaginatedResponse
 from tribulnation.sdk.market import FundingRate, NextFunding, FundingPayment
 
 from tribulnation.dydx.core import wrap_exceptions
@@ -18,24 +19,24 @@ async def next_funding(self: MarketMixin) -> NextFunding:
     interval=timedelta(hours=1),
   )
 
-@wrap_exceptions
-async def funding_rates(self: MarketMixin, start: datetime | None = None, end: datetime | None = None) -> AsyncIterable[Sequence[FundingRate]]:
+def funding_rates(self: MarketMixin, start: datetime | None = None, end: datetime | None = None) -> PaginatedResponse[FundingRate]:
   start = start.astimezone() if start is not None else None
   end = end.astimezone() if end is not None else None
   paging = self.indexer.data.get_historical_funding_paged(self.market, effective_before_or_at=end)
-  state = paging.init
-  while state is not None:
-    next_state = state
-    page, state = await self.call_dydx(lambda: paging.next(next_state))
+
+  @wrap_exceptions
+  async def fetch(state):
+    page, state = await self.call_dydx(lambda: paging.next(state))
     rates = [
       FundingRate(rate=Decimal(item['rate']), time=item['effectiveAt'])
       for item in page
       if start is None or item['effectiveAt'] >= start
     ]
-    if rates:
-      yield rates
-    elif start is not None:
-      break
+    if not rates and start is not None:
+      state = None
+    return rates, state
+
+  return PaginatedResponse.cursored(fetch, paging.init)
 
 @wrap_exceptions
 async def funding_payments(self: MarketMixin, start: datetime, end: datetime) -> AsyncIterable[Sequence[FundingPayment]]:
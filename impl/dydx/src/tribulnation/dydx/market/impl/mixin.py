@@ -1,4 +1,5 @@
-from typing_extensions import AsyncContextManager, Iterable, TypedDict, Callable, Awaitable, TypeVar
+from typing_extensions import AsyncContextManager, AsyncIterator, Iterable, TypedDict, Callable, Awaitable, TypeVar
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 import asyncio
 import pydantic
@@ -8,9 +9,11 @@ from dydx import Dydx
 from dydx.indexer.streams.parent_subaccounts import Notification as ParentSubaccountNotification
 from dydx.node.orders import Flags, TimeInForce
 from dydx.protos.dydxprotocol import feetiers as feetiers_proto
-from tribulnation.sdk.core import SDK, Subscription, OverflowPolicy
+from tribulnation.sdk.core import SDK, SingleFlight, Subscription, OverflowPolicy
+from tribulnation.sdk.market import BookView, DiffView, LiveBook, OrderStore
 from tribulnation.dydx.core import wrap_exceptions
-from .depth import depth_stream, Book
+from .account import AccountState
+from .depth import depth_stream
 from .rules import parse_rules, Rules
 
 T = TypeVar('T')
@@ -41,18 +44,24 @@ class Shared(SDK):
   perpetual_markets: dict[str, PerpetualMarket] | None = None
   fee_tier: feetiers_proto.PerpetualFeeTier | None = None
   parent_subaccount_subscriptions: dict[int, Subscription[ParentSubaccountNotification]] = field(default_factory=dict)
-  depth_subscriptions: dict[str, Subscription[Book]] = field(default_factory=dict)
+  depth_subscriptions: dict[str, Subscription[LiveBook]] = field(default_factory=dict)
+  order_store: OrderStore | None = None
+  """Set while `ExchangeMixin.track_orders` is active."""
+  account_state: AccountState | None = None
+  """Set while `ExchangeMixin.track_account` is active."""
+  flights: SingleFlight = field(default_factory=SingleFlight, init=False, repr=False)
+  """Coalesces concurrent lazy loads. Refetches are keyed apart, so they never join a lazy load in flight."""
 
   @wrap_exceptions
   async def load_markets(self, *, refetch: bool = False) -> dict[str, PerpetualMarket]:
     if refetch or self.perpetual_markets is None:
-      self.perpetual_markets = (await self.client.indexer.data.get_markets())['markets']
+      self.perpetual_markets = (await self.flights.run(('markets', refetch), self.client.indexer.data.get_markets))['markets']
     return self.perpetual_markets
 
   @wrap_exceptions
   async def load_fee_tier(self, *, refetch: bool = False) -> feetiers_proto.PerpetualFeeTier:
     if refetch or self.fee_tier is None:
-      response = await self.client.chain.feetiers.user_fee_tier(self.address)
+      response = await self.flights.run(('fee_tier', refetch), lambda: self.client.chain.feetiers.user_fee_tier(self.address))
       if response.tier is None:
         raise ValueError('dYdX fee tier response did not include a tier')
       self.fee_tier = response.tier
@@ -75,7 +84,7 @@ class Shared(SDK):
           async for msg in stream:
             yield msg
         return parsed_stream(), stream.unsubscribe
-      self.parent_subaccount_subscriptions[parent_subaccount] = Subscription.of(subscribe)
+      self.parent_subaccount_subscriptions[parent_subaccount] = Subscription.of(subscribe, batched=True)
     return self.parent_subaccount_subscriptions[parent_subaccount]
 
   def depth_subscription(self, market: str):
@@ -118,13 +127,75 @@ class ExchangeMixin(SDK):
   def resources(self) -> Iterable[AsyncContextManager[object]]:
     yield self.shared
 
+  def venue_identity(self) -> object:
+    return self.shared
+
   def subscribe_parent_subaccount(
     self, parent_subaccount: int, *, queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
   ):
     return self.shared.parent_account_subscription(parent_subaccount).subscribe(queue_size=queue_size, overflow=overflow)
 
-  def subscribe_depth(self, market: str, *, queue_size: int = 1, overflow: OverflowPolicy = 'latest'):
-    return self.shared.depth_subscription(market).subscribe(queue_size=queue_size, overflow=overflow)
+  @asynccontextmanager
+  async def track_orders(self, *, reconcile_every: float = 60, queue_size: int = 1000) -> AsyncIterator[OrderStore]:
+    """Answer `open_orders`/`query_order` of every market of the parent subaccount from memory,
+    kept from its parent-subaccount stream, while in the context (see `OrderStore`)."""
+    if (store := self.shared.order_store) is not None and store.live:
+      yield store
+      return
+    # Local import avoids a circular import (orders.py imports the mixins).
+    from .orders import order_updates
+    store = OrderStore(reconcile_every=reconcile_every)
+    async with self.subscribe_parent_subaccount(
+      self.shared.parent_subaccount, queue_size=queue_size, overflow='fail',
+    ) as notifications:
+      async with store.following(order_updates(notifications, address=self.address, store=store)):
+        self.shared.order_store = store
+        try:
+          yield store
+        finally:
+          self.shared.order_store = None
+
+  @asynccontextmanager
+  async def track_account(self, *, reconcile_every: float = 60, queue_size: int = 1000) -> AsyncIterator[AccountState]:
+    """Answer `perp_position`, `perp_collateral` and `available_notional` of the parent
+    subaccount and its children from memory, kept from the parent-subaccount and markets
+    streams, while in the context (see `AccountState`)."""
+    if (state := self.shared.account_state) is not None and state.live:
+      yield state
+      return
+    state = AccountState(reconcile_every=reconcile_every)
+    async with self.indexer.streams.markets() as markets:
+      async with self.subscribe_parent_subaccount(
+        self.shared.parent_subaccount, queue_size=queue_size, overflow='fail',
+      ) as notifications:
+        async with state.following(notifications, markets, initial_markets=markets.reply['markets']):
+          self.shared.account_state = state
+          try:
+            yield state
+          finally:
+            self.shared.account_state = None
+
+  async def synced_account(self) -> AccountState | None:
+    """The live `AccountState`, reconciled over REST if due; `None` outside `track_account`."""
+    if (state := self.shared.account_state) is None or not state.live:
+      return None
+    return await state.synced(lambda: self.indexer.data.get_parent_subaccount(
+      self.address, self.shared.parent_subaccount,
+    ))
+
+  def subscribe_depth(
+    self, market: str, *, levels: int | None = None, queue_size: int = 1, overflow: OverflowPolicy = 'latest',
+  ):
+    return self.shared.depth_subscription(market).subscribe(
+      view=BookView(levels), queue_size=queue_size, overflow=overflow,
+    )
+
+  def subscribe_depth_diffs(
+    self, market: str, *, resync_every: int = 1000, queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ):
+    return self.shared.depth_subscription(market).subscribe(
+      view=DiffView(resync_every), join=LiveBook.snapshot, queue_size=queue_size, overflow=overflow,
+    )
 
 @dataclass(kw_only=True, frozen=True)
 class MarketMixin(ExchangeMixin):
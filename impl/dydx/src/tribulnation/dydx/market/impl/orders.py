@@ -1,11 +1,14 @@
-from typing_extensions import Literal, Sequence
+from typing_extensions import AsyncIterable, Literal, Sequence
 from decimal import Decimal
+import asyncio
 import base64
 
 from dydx.indexer.data.list_parent_orders import Order as IndexerOrder
-from dydx.node.orders import OrderParams, TimeInForce, Flags
+from dydx.indexer.streams.parent_subaccounts import Notification, OrderSubaccountMessage
+from dydx.node import STATEFUL_ORDER_TIME_WINDOW
+from dydx.node.orders import OrderParams, TimeInForce, Flags, PlacedOrder
 from tribulnation.sdk.core import ValidationError
-from tribulnation.sdk.market import Order, OrderResponse, OrderState, Settings as MarketSettings
+from tribulnation.sdk.market import Order, OrderResponse, OrderState, OrderStore, OrderUpdate, Settings as MarketSettings
 from dydx.protos.dydxprotocol import clob, subaccounts
 from tribulnation.dydx.core import wrap_exceptions
 from .mixin import MarketMixin, Settings, settings_adapter
@@ -61,11 +64,56 @@ def parse_state(order: IndexerOrder, *, address: str) -> OrderState:
     details=order,
   )
 
+def parse_update(msg: OrderSubaccountMessage, *, address: str, store: OrderStore) -> OrderUpdate | None:
+  """A parent-subaccount stream order message as an `OrderStore` update. Fields the
+  message leaves out are taken from the order on record; `None` if that is not enough."""
+  flags, number = msg.get('orderFlags'), msg.get('subaccountNumber')
+  if flags is None or number is None:
+    return None
+  id = serialize_id(clob.OrderId(
+    client_id=int(msg['clientId']),
+    order_flags=int(flags),
+    clob_pair_id=int(msg['clobPairId']),
+    subaccount_id=subaccounts.SubaccountId(owner=address, number=int(number)),
+  ))
+  known = store.get(id)
+  sign = _sign(msg['side'])
+  price = msg.get('price')
+  filled = msg.get('totalFilled')
+  if price is None or filled is None:
+    if known is None:
+      return None
+    price = known.price if price is None else price
+    filled = abs(known.filled_qty) if filled is None else filled
+  return msg.get('ticker'), OrderState(
+    id=id,
+    price=Decimal(price),
+    qty=Decimal(msg['size']) * sign,
+    filled_qty=Decimal(filled) * sign,
+    active=_active(msg['status']),
+    details=msg,
+  )
+
+async def order_updates(updates: AsyncIterable[Notification], *, address: str, store: OrderStore) -> AsyncIterable[list[OrderUpdate]]:
+  """Parent-subaccount notifications as `OrderStore` updates, keyed by ticker."""
+  async for notification in updates:
+    parsed = [parse_update(msg, address=address, store=store) for msg in notification.get('orders') or []]
+    yield [update for update in parsed if update is not None]
+
+def _scoped(self: MarketMixin, orders: Sequence[OrderState]) -> list[OrderState]:
+  """Scope to the addressed subaccount. The parent exchange (subaccount == parent) keeps
+  the parent-aggregate view; a child exchange filters down to just that child."""
+  if self.subaccount == self.shared.parent_subaccount:
+    return list(orders)
+  return [o for o in orders if (sub := parse_id(o.id).subaccount_id) is not None and sub.number == self.subaccount]
+
 @wrap_exceptions
 async def list_orders(
   self: MarketMixin, *,
   status: Literal['OPEN', 'FILLED', 'CANCELED', 'BEST_EFFORT_CANCELED', 'UNTRIGGERED', 'BEST_EFFORT_OPENED', 'PENDING'] | None = None,
+  scoped: bool = True,
 ) -> list[OrderState]:
+  """Orders of the market under the parent subaccount, scoped to the addressed one unless `scoped=False`."""
   address = self.address
   orders = await self.indexer.data.list_parent_orders(
     address=address,
@@ -73,11 +121,8 @@ async def list_orders(
     ticker=self.market,
     status=status,
   )
-  # Scope to the addressed subaccount. The parent exchange (subaccount == parent) keeps
-  # the parent-aggregate view; a child exchange filters down to just that child.
-  if self.subaccount != self.shared.parent_subaccount:
-    orders = [order for order in orders if order['subaccountNumber'] == self.subaccount]
-  return [parse_state(order, address=address) for order in orders]
+  states = [parse_state(order, address=address) for order in orders]
+  return _scoped(self, states) if scoped else states
 
 def _default_tif(order: Order) -> TimeInForce:
   if order['type'] == 'POST_ONLY':
@@ -129,6 +174,12 @@ async def with_expiry(self: MarketMixin, params: OrderParams, settings: Settings
     return {**params, 'good_til_block_time': int(block.header.time.timestamp()) + delta}
   return params
 
+def _placed_response(placed: PlacedOrder) -> OrderResponse:
+  order_id = placed.order.order_id
+  if order_id is None:
+    raise ValidationError('dYdX place order response did not include an order ID')
+  return OrderResponse(id=serialize_id(order_id), details=placed)
+
 @wrap_exceptions
 async def place_order(self: MarketMixin, order: Order, *, settings: MarketSettings = {}) -> OrderResponse:
   s = settings_adapter.validate_python(settings.get('dydx', {}))
@@ -137,40 +188,116 @@ async def place_order(self: MarketMixin, order: Order, *, settings: MarketSettin
     order=await with_expiry(self, export_order(order, s), s),
     subaccount=self.subaccount,
   )
-  order_id = response.order.order_id
-  if order_id is None:
-    raise ValidationError('dYdX place order response did not include an order ID')
-  return OrderResponse(
-    id=serialize_id(order_id),
-    details=response,
-  )
+  return _placed_response(response)
+
+MAX_BATCH_ORDERS = 20
+"""Stateful orders signed into one transaction, keeping its gas well within a block."""
+
+async def with_stateful_expiry(self: MarketMixin, params: Sequence[OrderParams], settings: Settings) -> list[OrderParams]:
+  """Give stateful orders placed together one expiry, reading the latest block once
+  (instead of once per order, as the node does for orders without one)."""
+  delta = settings.get('long_term_gtbt', STATEFUL_ORDER_TIME_WINDOW)
+  latest = await self.client.chain.tendermint.get_latest_block()
+  block = latest.block
+  if block is None or block.header is None or block.header.time is None:
+    raise ValidationError('Latest dYdX block response did not include a timestamp')
+  good_til_block_time = int(block.header.time.timestamp()) + delta
+  return [{**p, 'good_til_block_time': good_til_block_time} for p in params]
+
+@wrap_exceptions
+async def place_orders(self: MarketMixin, orders: Sequence[Order], *, settings: MarketSettings = {}) -> Sequence[OrderResponse]:
+  """Place stateful orders as multi-message transactions (per `MAX_BATCH_ORDERS`).
+
+  dYdX rejects transactions with several short-term orders, so those (e.g. `MARKET`)
+  are still placed one per transaction.
+  """
+  s = settings_adapter.validate_python(settings.get('dydx', {}))
+  params = [export_order(order, s) for order in orders]
+  stateful = [i for i, p in enumerate(params) if p['flags'] != 'SHORT_TERM']
+  short_term = [i for i, p in enumerate(params) if p['flags'] == 'SHORT_TERM']
+
+  responses: list[OrderResponse | None] = [None] * len(params)
+  if stateful:
+    expiring = await with_stateful_expiry(self, [params[i] for i in stateful], s)
+    for start in range(0, len(stateful), MAX_BATCH_ORDERS):
+      placed = await self.client.node.place_orders([
+        {'market': self.perpetual_market, 'order': p, 'subaccount': self.subaccount}
+        for p in expiring[start:start+MAX_BATCH_ORDERS]
+      ])
+      for i, order in zip(stateful[start:start+MAX_BATCH_ORDERS], placed.orders):
+        responses[i] = _placed_response(PlacedOrder(tx=placed.tx, order=order))
+
+  async def place_short_term(i: int):
+    placed = await self.client.node.place_order(
+      self.perpetual_market,
+      order=await with_expiry(self, params[i], s),
+      subaccount=self.subaccount,
+    )
+    responses[i] = _placed_response(placed)
+  await asyncio.gather(*[place_short_term(i) for i in short_term])
+  return responses # type: ignore
 
 @wrap_exceptions
 async def cancel_order(self: MarketMixin, id: str, *, settings: MarketSettings = {}):
   return await self.client.node.cancel_order(parse_id(id))
 
+async def cancel_stateful(self: MarketMixin, order_ids: Sequence[clob.OrderId]) -> list:
+  """Cancel long-term/conditional orders as multi-message transactions (per `MAX_BATCH_ORDERS`),
+  all expiring at one block time read once."""
+  latest = await self.client.chain.tendermint.get_latest_block()
+  block = latest.block
+  if block is None or block.header is None or block.header.time is None:
+    raise ValidationError('Latest dYdX block response did not include a timestamp')
+  good_til_block_time = int(block.header.time.timestamp()) + STATEFUL_ORDER_TIME_WINDOW
+  messages = [
+    clob.MsgCancelOrder(order_id=order_id, good_til_block_time=good_til_block_time)
+    for order_id in order_ids
+  ]
+  tx = self.client.node.tx
+  return [
+    await tx.sign_and_broadcast(messages[start:start+MAX_BATCH_ORDERS])
+    for start in range(0, len(messages), MAX_BATCH_ORDERS)
+  ]
+
 @wrap_exceptions
 async def cancel_orders(self: MarketMixin, ids: Sequence[str], *, settings: MarketSettings = {}):
+  """Short-term orders are cancelled in one `MsgBatchCancel`, stateful ones in multi-message
+  transactions; both go out concurrently (short-term messages don't use the account sequence)."""
   order_ids = [parse_id(id) for id in ids]
   short_term = [order_id for order_id in order_ids if order_id.order_flags == 0]
   long_term = [order_id for order_id in order_ids if order_id.order_flags != 0]
 
   results: dict = {}
-  if short_term:
+  async def cancel_short_term():
     results['short_term'] = await self.client.node.batch_cancel_orders(short_term)
-  if long_term:
-    results['long_term'] = []
-    for order_id in long_term:
-      results['long_term'].append(await self.client.node.cancel_order(order_id))
+  async def cancel_long_term():
+    results['long_term'] = await cancel_stateful(self, long_term)
 
+  await asyncio.gather(
+    *([cancel_short_term()] if short_term else []),
+    *([cancel_long_term()] if long_term else []),
+  )
   return results
 
-@wrap_exceptions
-async def query_order(self: MarketMixin, id: str) -> OrderState | None:
+async def fetch_order(self: MarketMixin, id: str) -> OrderState | None:
   for order in await list_orders(self):
     if order.id == id:
       return order
 
+@wrap_exceptions
+async def query_order(self: MarketMixin, id: str) -> OrderState | None:
+  if (store := self.shared.order_store) is not None:
+    order = await store.query_order(
+      self.market, id, lambda: fetch_order(self, id),
+      lambda: list_orders(self, status='OPEN', scoped=False),
+    )
+    return order if order is not None and _scoped(self, [order]) else None
+  return await fetch_order(self, id)
+
 @wrap_exceptions
 async def open_orders(self: MarketMixin) -> Sequence[OrderState]:
+  if (store := self.shared.order_store) is not None:
+    # The store keeps every subaccount's orders of the market; scope them afterwards.
+    orders = await store.open_orders(self.market, lambda: list_orders(self, status='OPEN', scoped=False))
+    return _scoped(self, orders)
   return await list_orders(self, status='OPEN')
@@ -8,6 +8,7 @@ import asyncio
 from tribulnation.sdk.core import PaginatedResponse, ApiError, OverflowPolicy
 from tribulnation.sdk.market import (
   Book,
+  BookDiff,
   FundingPayment,
   FundingRate,
   NextFunding,
@@ -34,6 +35,7 @@ from .impl import  (
   funding_payments,
   open_orders,
   place_order,
+  place_orders,
   query_order,
   cancel_order,
   cancel_orders,
@@ -64,7 +66,17 @@ class Market(MarketMixin, PerpMarket):
     self, *, levels: int | None = None,
     queue_size: int = 1, overflow: OverflowPolicy = 'latest',
   ) -> AsyncIterator[AsyncIterable[Book]]:
-    async with self.subscribe_depth(self.market, queue_size=queue_size, overflow=overflow) as stream:
+    async with self.subscribe_depth(self.market, levels=levels, queue_size=queue_size, overflow=overflow) as stream:
+      yield stream
+
+  @asynccontextmanager
+  async def depth_diff_stream(
+    self, *, resync_every: int = 1000,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ) -> AsyncIterator[AsyncIterable[BookDiff]]:
+    async with self.subscribe_depth_diffs(
+      self.market, resync_every=resync_every, queue_size=queue_size, overflow=overflow,
+    ) as stream:
       yield stream
 
   async def rules(self, *, refetch: bool = False) -> Rules:
@@ -83,6 +95,9 @@ class Market(MarketMixin, PerpMarket):
 
   @wrap_exceptions
   async def perp_position(self) -> PerpPosition:
+    if (account := await self.synced_account()) is not None:
+      subaccount = None if self.subaccount == self.shared.parent_subaccount else self.subaccount
+      return account.perp_position(self.market, subaccount)
     positions = await self.indexer.data.list_parent_positions(
       self.address,
       parent_subaccount=self.shared.parent_subaccount,
@@ -122,6 +137,9 @@ class Market(MarketMixin, PerpMarket):
 
   @wrap_exceptions
   async def available_notional(self) -> Decimal:
+    if (account := await self.synced_account()) is not None:
+      collateral = account.perp_collateral(self.subaccount).free_collateral
+      return collateral*max_leverage(account.market(self.market))
     sub, market = await asyncio.gather(
       self.indexer.data.get_subaccount(address=self.address, subaccount=self.subaccount),
       self.indexer.data.get_market(self.market)
@@ -133,6 +151,9 @@ class Market(MarketMixin, PerpMarket):
   async def place_order(self, order: Order, *, settings: Settings = {}) -> OrderResponse:
     return await place_order(self, order, settings=settings)
 
+  async def place_orders(self, orders: Sequence[Order], *, settings: Settings = {}) -> Sequence[OrderResponse]:
+    return await place_orders(self, orders, settings=settings)
+
   async def query_order(self, id: str) -> OrderState | None:
     return await query_order(self, id)
 
@@ -161,7 +182,7 @@ class Market(MarketMixin, PerpMarket):
     return await next_funding(self)
 
   def funding_rates(self, start: datetime | None = None, end: datetime | None = None) -> PaginatedResponse[FundingRate]:
-    return PaginatedResponse(funding_rates(self, start, end))
+    return funding_rates(self, start, end)
 
   def funding_payments(self, start: datetime, end: datetime) -> PaginatedResponse[FundingPayment]:
     return PaginatedResponse(funding_payments(self, start, end))
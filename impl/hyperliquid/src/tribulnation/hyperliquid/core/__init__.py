@@ -9,4 +9,5 @@ from .constants import (
   MAX_RELATIVE_PRICE,
   round_price,
 )
-from .settings import Settings
\ No newline at end of file
+from .settings import Settings
+from .rate_limits import info_limiter, rate_limited
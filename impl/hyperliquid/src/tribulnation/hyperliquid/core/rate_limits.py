@@ -0,0 +1,81 @@
+"""Hyperliquid's REST weight limit, applied to `Info` transports.
+
+Hyperliquid meters info requests per IP: 1200 weight per minute, where most
+requests weigh 20, a few cheap ones 2, and history endpoints add 1 per 20 items
+returned.
+
+References:
+  - [Hyperliquid rate limits](https://hyperliquid.gitbook.io/hyperliquid-docs/for-developers/api/rate-limits-and-user-limits)
+"""
+from typing_extensions import Any, Mapping, Self
+from dataclasses import dataclass
+import math
+
+from hyperliquid.info import Info
+from hyperliquid.info.core import InfoClient, InfoHttpClient
+
+from tribulnation.sdk.core import RateLimiter
+
+CAPACITY = 1200
+PER = 60
+
+LIGHT_REQUESTS = {'l2Book', 'allMids', 'clearinghouseState', 'orderStatus', 'spotClearinghouseState', 'exchangeStatus'}
+"""Info requests weighing 2."""
+HEAVY_REQUESTS = {'userRole': 60}
+SIZED_REQUESTS = {
+  'recentTrades', 'historicalOrders', 'userFills', 'userFillsByTime', 'fundingHistory',
+  'userFunding', 'nonUserFundingUpdates', 'twapHistory', 'userTwapSliceFills',
+  'userTwapSliceFillsByTime', 'delegatorHistory', 'delegatorRewards', 'validatorStats',
+}
+"""Info requests charged an extra 1 per 20 items returned."""
+
+
+def info_limiter() -> RateLimiter:
+  """The process-wide limiter for Hyperliquid's REST weight budget."""
+  return RateLimiter.shared('hyperliquid', capacity=CAPACITY, per=PER)
+
+
+def request_weight(params: Mapping[str, Any]) -> int:
+  kind = params.get('type')
+  if kind in LIGHT_REQUESTS:
+    return 2
+  return HEAVY_REQUESTS.get(kind, 20) # type: ignore
+
+
+def response_weight(params: Mapping[str, Any], response: Any) -> int:
+  if params.get('type') in SIZED_REQUESTS and isinstance(response, list):
+    return math.ceil(len(response) / 20)
+  return 0
+
+
+@dataclass(kw_only=True)
+class RateLimitedInfoClient(InfoClient):
+  """Wraps an info transport, drawing each request's weight from `limiter`."""
+  client: InfoClient
+  limiter: RateLimiter
+
+  async def request(self, params: Mapping[str, Any]):
+    await self.limiter.acquire(request_weight(params))
+    response = await self.client.request(params)
+    if (extra := response_weight(params, response)):
+      self.limiter.charge(extra)
+    return response
+
+  async def __aenter__(self) -> Self:
+    await self.client.__aenter__()
+    return self
+
+  async def __aexit__(self, exc_type, exc_value, traceback):
+    await self.client.__aexit__(exc_type, exc_value, traceback)
+
+
+def rate_limited(info: Info, limiter: RateLimiter | None = None) -> Info:
+  """`info` with its requests drawn from `limiter` (default: `info_limiter()`).
+
+  Only HTTP transports are limited (the weight budget is REST's); others, already
+  limited and non-`Info` objects (e.g. test doubles) are returned as is.
+  """
+  if not isinstance(info, Info) or not isinstance(info.client, InfoHttpClient):
+    return info
+  client = RateLimitedInfoClient(client=info.client, limiter=limiter or info_limiter())
+  return Info(client=client, validate=info.validate)
@@ -1,7 +1,7 @@
 from .mixin import Shared, SharedMixin, SpotMixin, PerpMixin, SpotMarketMixin, PerpMarketMixin, SpotMeta, PerpMeta, Settings
 
-from .depth import depth, depth_stream
-from .orders import open_orders, place_order, cancel_order, query_order
+from .depth import depth, depth_stream, depth_diff_stream
+from .orders import open_orders, place_order, place_orders, cancel_order, cancel_orders, query_order
 from .trades import trades_history, trades_stream
 
 from .spot_rules import rules as spot_rules
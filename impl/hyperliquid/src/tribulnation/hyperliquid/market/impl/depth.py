@@ -1,18 +1,17 @@
-from typing_extensions import AsyncIterable
+from typing_extensions import AsyncIterable, AsyncIterator
 from contextlib import asynccontextmanager
 from decimal import Decimal
 
-from tribulnation.sdk.market import Book
+from hyperliquid.streams.l2_book import L2BookData
+from tribulnation.sdk.market import Book, TickBook, TickLiveBook, Grid
 from tribulnation.sdk.core import OverflowPolicy
 
-from tribulnation.hyperliquid.core import wrap_exceptions
+from tribulnation.hyperliquid.core import SPOT_PRICE_MAX_DECIMALS, FUTURES_PRICE_MAX_DECIMALS, wrap_exceptions
 from .mixin import SpotMarketMixin, PerpMarketMixin
 
 Mixin = SpotMarketMixin | PerpMarketMixin
 
-@wrap_exceptions
-async def depth(self: Mixin) -> Book:
-  book = await self.client.info.l2_book(self.asset_name)
+def parse_l2_book(book: L2BookData) -> Book:
   raw_bids, raw_asks = book["levels"]
   bids = [Book.Entry(price=Decimal(b["px"]), qty=Decimal(b["sz"])) for b in raw_bids]
   asks = [Book.Entry(price=Decimal(a["px"]), qty=Decimal(a["sz"])) for a in raw_asks]
@@ -21,25 +20,64 @@ async def depth(self: Mixin) -> Book:
     asks=sorted(asks, key=lambda e: e.price),
   )
 
+@wrap_exceptions
+async def depth(self: Mixin) -> Book:
+  book = await self.client.info.l2_book(self.asset_name)
+  return parse_l2_book(book)
+
+
+def l2_grids(self: Mixin) -> tuple[Grid, Grid]:
+  """The finest price and size grids Hyperliquid quotes the market's levels on.
+
+  Prices carry at most `MAX_DECIMALS - szDecimals` decimals, which may be finer
+  than the market's `Rules.tick_size`.
+  """
+  if isinstance(self, SpotMarketMixin):
+    sz_decimals, max_decimals = self.base_meta['szDecimals'], SPOT_PRICE_MAX_DECIMALS
+  else:
+    sz_decimals, max_decimals = self.asset_meta['szDecimals'], FUTURES_PRICE_MAX_DECIMALS
+  return Grid.of(Decimal(10) ** -(max_decimals - sz_decimals)), Grid.of(Decimal(10) ** -sz_decimals)
+
+
+async def live_books(updates: AsyncIterable[L2BookData], *, price: Grid, qty: Grid) -> AsyncIterator[TickLiveBook]:
+  """Maintain a live book from Hyperliquid's `l2Book` feed.
+
+  The feed sends a full snapshot per message. Each one is parsed and diffed
+  against the previous one as integers; the book is only stored as a `TickBook`,
+  and `Decimal` levels are built when subscribers read them.
+  """
+  live: TickLiveBook | None = None
+  async for update in updates:
+    raw_bids, raw_asks = update['levels']
+    bids = [(b['px'], b['sz']) for b in raw_bids]
+    asks = [(a['px'], a['sz']) for a in raw_asks]
+    if live is None:
+      live = TickLiveBook(TickBook(price, qty), seq=-1)
+      live.reset(bids=bids, asks=asks)
+    else:
+      live.replace(bids=bids, asks=asks)
+    yield live
+
 
 @asynccontextmanager
-async def depth_stream(self: Mixin, *, queue_size: int = 1, overflow: OverflowPolicy = 'latest'):
-  async with self.subscribe_l2_book(self.asset_name, queue_size=queue_size, overflow=overflow) as l2:
-    async def gen() -> AsyncIterable[Book]:
-      async for update in l2:
-        raw_bids, raw_asks = update["levels"]
-        # Hyperliquid `l2Book` is a snapshot-per-message feed.
-        book = Book(
-          bids=sorted(
-            [Book.Entry(price=Decimal(b["px"]), qty=Decimal(b["sz"])) for b in raw_bids],
-            key=lambda e: e.price,
-            reverse=True,
-          ),
-          asks=sorted(
-            [Book.Entry(price=Decimal(a["px"]), qty=Decimal(a["sz"])) for a in raw_asks],
-            key=lambda e: e.price,
-          ),
-        )
-        yield book
-    yield gen()
+async def depth_stream(
+  self: Mixin, *, levels: int | None = None,
+  queue_size: int = 1, overflow: OverflowPolicy = 'latest',
+):
+  price, qty = l2_grids(self)
+  async with self.subscribe_l2_book(
+    self.asset_name, price=price, qty=qty, levels=levels, queue_size=queue_size, overflow=overflow,
+  ) as stream:
+    yield stream
+
 
+@asynccontextmanager
+async def depth_diff_stream(
+  self: Mixin, *, resync_every: int = 1000,
+  queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+):
+  price, qty = l2_grids(self)
+  async with self.subscribe_l2_book_diffs(
+    self.asset_name, price=price, qty=qty, resync_every=resync_every, queue_size=queue_size, overflow=overflow,
+  ) as stream:
+    yield stream
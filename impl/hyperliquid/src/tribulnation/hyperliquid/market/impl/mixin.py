@@ -1,9 +1,10 @@
-from typing_extensions import Any, AsyncContextManager, Iterable, TypedDict
+from typing_extensions import Any, AsyncContextManager, AsyncIterator, Iterable, TypedDict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-import asyncio
 import os
 
-from tribulnation.sdk.core import SDK, Subscription, OverflowPolicy
+from tribulnation.sdk.core import SDK, SingleFlight, Subscription, OverflowPolicy
+from tribulnation.sdk.market import BookView, DiffView, TickLiveBook, Grid, OrderStore
 
 from hyperliquid import Hyperliquid, Wallet
 from hyperliquid.info.spot.spot_meta import SpotMetaResponse, SpotAssetInfo, SpotTokenInfo
@@ -15,9 +16,9 @@ from hyperliquid.info.perps.perp_meta_and_asset_ctxs import (
 )
 from hyperliquid.info.perps.perp_dexs import PerpDex
 from hyperliquid.streams.user_fills import WsUserFills
-from hyperliquid.streams.l2_book import L2BookData
+from hyperliquid.streams.order_updates import OrderUpdatesData
 
-from tribulnation.hyperliquid.core import Settings, wrap_exceptions
+from tribulnation.hyperliquid.core import Settings, wrap_exceptions, rate_limited
 
 class DEX(TypedDict):
   name: str
@@ -83,36 +84,32 @@ class Shared(SDK):
 
   # Stream subscriptions.
   user_fills_subscription: Subscription[WsUserFills] | None = None
-  l2_book_subscriptions: dict[str, Subscription[L2BookData]] = field(default_factory=dict)
+  order_updates_subscription: Subscription[OrderUpdatesData] | None = None
+  l2_book_subscriptions: dict[str, Subscription[TickLiveBook]] = field(default_factory=dict)
 
-  # Locks for concurrent lazy loads.
-  _spot_meta_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
-  _perp_meta_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
-  _fees_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+  # Set while `SharedMixin.track_orders` is active.
+  order_store: OrderStore | None = None
+
+  # Coalesces concurrent lazy loads. Refetches are keyed apart, so they never join a lazy load in flight.
+  flights: SingleFlight = field(default_factory=SingleFlight, init=False, repr=False)
 
   def resources(self) -> Iterable[AsyncContextManager[object]]:
     yield self.client
 
   @wrap_exceptions
   async def load_spot_meta(self, *, refetch: bool = False) -> SpotMetaResponse:
-    if not refetch and self.spot_meta is not None:
-      return self.spot_meta
-    async with self._spot_meta_lock:
-      if not refetch and self.spot_meta is not None:
-        return self.spot_meta
-      self.spot_meta = await self.client.info.spot_meta()
-      return self.spot_meta
+    if refetch or self.spot_meta is None:
+      self.spot_meta = await self.flights.run(('spot_meta', refetch), self.client.info.spot_meta)
+    return self.spot_meta
 
   @wrap_exceptions
   async def load_perp_dexs(self, *, refetch: bool = False) -> dict[int, PerpDex | None]:
     """
     Load and cache the list of DEXs (lightweight). Keyed by dex index.
     """
-    if not refetch and self.perp_dexs is not None:
-      return self.perp_dexs
-    # No separate lock; cost is small and we typically call this rarely.
-    dexs = await self.client.info.perp_dexs()
-    self.perp_dexs = {idx: dex for idx, dex in enumerate(dexs)}
+    if refetch or self.perp_dexs is None:
+      dexs = await self.flights.run(('perp_dexs', refetch), self.client.info.perp_dexs)
+      self.perp_dexs = {idx: dex for idx, dex in enumerate(dexs)}
     return self.perp_dexs
 
   @wrap_exceptions
@@ -133,25 +130,19 @@ class Shared(SDK):
       dex_idx = find_dex_idx(dex_name, list(dexs.values()))
 
     key = dex_idx
-    if not refetch and key in self.perp_metas and key in self.perp_asset_ctxs:
-      return key, self.perp_metas[key], self.perp_asset_ctxs[key]
-    async with self._perp_meta_lock:
-      if not refetch and key in self.perp_metas and key in self.perp_asset_ctxs:
-        return key, self.perp_metas[key], self.perp_asset_ctxs[key]
-      perp_meta, asset_ctxs = await self.client.info.perp_meta_and_asset_ctxs(dex_name)
+    if refetch or key not in self.perp_metas or key not in self.perp_asset_ctxs:
+      perp_meta, asset_ctxs = await self.flights.run(
+        ('perp_meta', key, refetch), lambda: self.client.info.perp_meta_and_asset_ctxs(dex_name),
+      )
       self.perp_metas[key] = perp_meta
       self.perp_asset_ctxs[key] = asset_ctxs
-      return key, perp_meta, asset_ctxs
+    return key, self.perp_metas[key], self.perp_asset_ctxs[key]
 
   @wrap_exceptions
   async def load_user_fees(self, *, refetch: bool = False) -> UserFeesResponse:
-    if not refetch and self.user_fees is not None:
-      return self.user_fees
-    async with self._fees_lock:
-      if not refetch and self.user_fees is not None:
-        return self.user_fees
-      self.user_fees = await self.client.info.user_fees(self.address)
-      return self.user_fees
+    if refetch or self.user_fees is None:
+      self.user_fees = await self.flights.run(('user_fees', refetch), lambda: self.client.info.user_fees(self.address))
+    return self.user_fees
 
   async def resolve_dex_idx(self, dex_name: str | None, *, refetch: bool = False) -> int:
     """
@@ -166,14 +157,25 @@ class Shared(SDK):
       async def subscribe_user_fills():
         stream = await self.client.streams.user_fills(self.address, aggregate_by_time=True)
         return stream, stream.unsubscribe
-      self.user_fills_subscription = Subscription.of(subscribe_user_fills)
+      self.user_fills_subscription = Subscription.of(subscribe_user_fills, batched=True)
     return self.user_fills_subscription
 
-  def l2_book_subscription(self, coin: str, /) -> Subscription[L2BookData]:
+  def order_updates_sub(self) -> Subscription[OrderUpdatesData]:
+    if self.order_updates_subscription is None:
+      async def subscribe_order_updates():
+        stream = await self.client.streams.order_updates(self.address)
+        return stream, stream.unsubscribe
+      self.order_updates_subscription = Subscription.of(subscribe_order_updates, batched=True)
+    return self.order_updates_subscription
+
+  def l2_book_subscription(self, coin: str, /, *, price: Grid, qty: Grid) -> Subscription[TickLiveBook]:
+    """Shared `l2Book` subscription for `coin`, with levels parsed on the `price`/`qty` grids."""
     if coin not in self.l2_book_subscriptions:
       async def subscribe():
+        # Local import avoids a circular import (depth.py imports the mixins).
+        from .depth import live_books
         stream = await self.client.streams.l2_book(coin)
-        return stream, stream.unsubscribe
+        return live_books(stream, price=price, qty=qty), stream.unsubscribe
       self.l2_book_subscriptions[coin] = Subscription.of(subscribe)
     return self.l2_book_subscriptions[coin]
 
@@ -223,6 +225,8 @@ class SharedMixin(SDK):
       env_var = 'HYPERLIQUID_ADDRESS' if mainnet else 'HYPERLIQUID_TESTNET_ADDRESS'
       address = os.environ.get(env_var)
     client = Hyperliquid.http(wallet, mainnet=mainnet, validate=validate, public=True)
+    # Every market of the venue draws from the process-wide REST weight budget.
+    client.info = rate_limited(client.info)
     return cls(shared=Shared(client=client, maybe_address=address))
 
   @classmethod
@@ -247,11 +251,44 @@ class SharedMixin(SDK):
   def resources(self) -> Iterable[AsyncContextManager[object]]:
     yield self.shared
 
+  def venue_identity(self) -> object:
+    return self.shared
+
   def subscribe_user_fills(self, *, queue_size: int = 1000, overflow: OverflowPolicy = 'fail'):
     return self.shared.user_fills_sub().subscribe(queue_size=queue_size, overflow=overflow)
 
-  def subscribe_l2_book(self, coin: str, /, *, queue_size: int = 1, overflow: OverflowPolicy = 'latest'):
-    return self.shared.l2_book_subscription(coin).subscribe(queue_size=queue_size, overflow=overflow)
+  @asynccontextmanager
+  async def track_orders(self, *, reconcile_every: float = 60, queue_size: int = 1000) -> AsyncIterator[OrderStore]:
+    """Answer `open_orders`/`query_order` of every market of the account from memory, kept
+    from the `orderUpdates` stream, while in the context (see `OrderStore`)."""
+    if (store := self.shared.order_store) is not None and store.live:
+      yield store
+      return
+    # Local import avoids a circular import (orders.py imports the mixins).
+    from .orders import order_updates
+    async with self.shared.order_updates_sub().subscribe(queue_size=queue_size, overflow='fail') as updates:
+      async with OrderStore(reconcile_every=reconcile_every).following(order_updates(updates)) as store:
+        self.shared.order_store = store
+        try:
+          yield store
+        finally:
+          self.shared.order_store = None
+
+  def subscribe_l2_book(
+    self, coin: str, /, *, price: Grid, qty: Grid,
+    levels: int | None = None, queue_size: int = 1, overflow: OverflowPolicy = 'latest',
+  ):
+    return self.shared.l2_book_subscription(coin, price=price, qty=qty).subscribe(
+      view=BookView(levels), queue_size=queue_size, overflow=overflow,
+    )
+
+  def subscribe_l2_book_diffs(
+    self, coin: str, /, *, price: Grid, qty: Grid,
+    resync_every: int = 1000, queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ):
+    return self.shared.l2_book_subscription(coin, price=price, qty=qty).subscribe(
+      view=DiffView(resync_every), join=TickLiveBook.snapshot, queue_size=queue_size, overflow=overflow,
+    )
 
 
 @dataclass(kw_only=True, frozen=True)
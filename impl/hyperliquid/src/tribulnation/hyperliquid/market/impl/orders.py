@@ -1,13 +1,14 @@
-from typing_extensions import Any, Sequence
+from typing_extensions import Any, AsyncIterable, Sequence
 from decimal import Decimal
 
 from tribulnation.sdk.core import ApiError
-from tribulnation.sdk.market import Order, OrderResponse, OrderState, Settings as MarketSettings
+from tribulnation.sdk.market import Order, OrderResponse, OrderState, OrderUpdate, Settings as MarketSettings
 from tribulnation.sdk.util import fmt_num
 
 from hyperliquid.exchange.cancel import Cancel as CancelWire
 from hyperliquid.exchange.order import Order as OrderWire
 from hyperliquid.info.methods.order_status import OrderStatusResponse
+from hyperliquid.streams.order_updates import OrderUpdatesData
 
 from tribulnation.hyperliquid.core import Settings, round_price, wrap_exceptions
 from .mixin import SpotMarketMixin, PerpMarketMixin
@@ -39,45 +40,59 @@ def _export_order(self: SpotMarketMixin | PerpMarketMixin, o: Order, settings: S
   }
 
 
-@wrap_exceptions
-async def open_orders(self: SpotMarketMixin | PerpMarketMixin) -> Sequence[OrderState]:
+def _parse_order(o, *, active: bool, details: Any) -> OrderState:
+  qty = Decimal(o['origSz'])
+  return OrderState(
+    id=str(o['oid']),
+    price=Decimal(o['limitPx']),
+    qty=qty,
+    filled_qty=qty - Decimal(o['sz']),
+    active=active,
+    details=details,
+  )
+
+
+async def order_updates(updates: AsyncIterable[OrderUpdatesData]) -> AsyncIterable[list[OrderUpdate]]:
+  """`orderUpdates` messages as `OrderStore` updates, keyed by coin."""
+  async for msg in updates:
+    yield [
+      (u['order']['coin'], _parse_order(u['order'], active=_active(u['status']), details=u))
+      for u in msg
+    ]
+
+
+async def fetch_open_orders(self: SpotMarketMixin | PerpMarketMixin) -> Sequence[OrderState]:
   dex = getattr(self, 'dex_name', None)
   if dex is not None:
     orders = await self.client.info.open_orders(self.address, dex=dex)
   else:
     orders = await self.client.info.open_orders(self.address)
-
-  out: list[OrderState] = []
-  for o in orders:
-    if o.get('coin') != self.asset_name:
-      continue
-    qty = Decimal(o['origSz'])
-    out.append(
-      OrderState(
-        id=str(o['oid']),
-        price=Decimal(o['limitPx']),
-        qty=qty,
-        filled_qty=qty - Decimal(o['sz']),
-        active=True,
-        details=o,
-      )
-    )
-  return out
+  return [_parse_order(o, active=True, details=o) for o in orders if o.get('coin') == self.asset_name]
 
 
 @wrap_exceptions
-async def place_order(self: SpotMarketMixin | PerpMarketMixin, order: Order, *, settings: MarketSettings = {}) -> OrderResponse:
-  s: Settings = settings.get('hyperliquid', {})
-  wire = _export_order(self, order, s)
-  result = await self.client.exchange.order(wire)
-  if result['status'] != 'ok':
-    raise ApiError(result)
+async def open_orders(self: SpotMarketMixin | PerpMarketMixin) -> Sequence[OrderState]:
+  if (store := self.shared.order_store) is not None:
+    return await store.open_orders(self.asset_name, lambda: fetch_open_orders(self))
+  return await fetch_open_orders(self)
+
 
-  statuses = result['response']['data']['statuses']
-  if not statuses:
-    raise ApiError({'error': 'empty status list', 'details': result})
+def _record_placements(self: SpotMarketMixin | PerpMarketMixin, wires: Sequence[OrderWire], statuses: Sequence):
+  if (store := self.shared.order_store) is None:
+    return
+  for wire, stat in zip(wires, statuses):
+    if (resting := stat.get('resting')) is not None:
+      qty = Decimal(wire['s'])
+      store.add(self.asset_name, OrderState(
+        id=str(resting['oid']), price=Decimal(wire['p']), qty=qty,
+        filled_qty=Decimal(0), active=True, details=stat,
+      ))
 
-  stat = statuses[0]
+
+MAX_BATCH_ORDERS = 40
+"""Orders sent per `order` (or `cancel`) action. Each 40 orders add one unit of rate-limit weight to the action."""
+
+def _order_response(stat) -> OrderResponse:
   if (err := stat.get('error')) is not None:
     raise ApiError(err)
   if (resting := stat.get('resting')) is not None:
@@ -86,26 +101,75 @@ async def place_order(self: SpotMarketMixin | PerpMarketMixin, order: Order, *,
     return OrderResponse(id=str(filled['oid']), details=stat)
   raise ApiError({'error': 'unknown order status', 'details': stat})
 
+async def _place_wires(self: SpotMarketMixin | PerpMarketMixin, wires: Sequence[OrderWire]) -> list:
+  """Statuses of `wires`, placed in one signed action per `MAX_BATCH_ORDERS`."""
+  statuses = []
+  for start in range(0, len(wires), MAX_BATCH_ORDERS):
+    chunk = wires[start:start+MAX_BATCH_ORDERS]
+    result = await self.client.exchange.order(*chunk)
+    if result['status'] != 'ok':
+      raise ApiError(result)
+    chunk_statuses = result['response']['data']['statuses']
+    if len(chunk_statuses) != len(chunk):
+      raise ApiError({'error': f'expected {len(chunk)} statuses', 'details': result})
+    statuses.extend(chunk_statuses)
+  _record_placements(self, wires, statuses)
+  return statuses
+
 
 @wrap_exceptions
-async def cancel_order(self: SpotMarketMixin | PerpMarketMixin, id: str, *, settings: MarketSettings = {}) -> Any:
-  cancel: CancelWire = {'a': self.asset_id, 'o': int(id)}
-  result = await self.client.exchange.cancel(cancel)
-  if result['status'] != 'ok':
-    raise ApiError(result)
-  statuses = result['response']['data']['statuses']
-  if not statuses:
-    raise ApiError({'error': 'empty status list', 'details': result})
-  s = statuses[0]
+async def place_order(self: SpotMarketMixin | PerpMarketMixin, order: Order, *, settings: MarketSettings = {}) -> OrderResponse:
+  s: Settings = settings.get('hyperliquid', {})
+  [stat] = await _place_wires(self, [_export_order(self, order, s)])
+  return _order_response(stat)
+
+
+@wrap_exceptions
+async def place_orders(self: SpotMarketMixin | PerpMarketMixin, orders: Sequence[Order], *, settings: MarketSettings = {}) -> Sequence[OrderResponse]:
+  """Place `orders` as one `order` action (per `MAX_BATCH_ORDERS`). Raises on the first rejected order,
+  after the whole batch has been sent."""
+  s: Settings = settings.get('hyperliquid', {})
+  statuses = await _place_wires(self, [_export_order(self, o, s) for o in orders])
+  return [_order_response(stat) for stat in statuses]
+
+
+def _cancel_status(s) -> Any:
   if s == 'success':
     return s
   if isinstance(s, dict) and (err := s.get('error')) is not None:
     raise ApiError(err)
   raise ApiError({'error': 'unknown cancel status', 'details': s})
 
+async def _cancel_wires(self: SpotMarketMixin | PerpMarketMixin, cancels: Sequence[CancelWire]) -> list:
+  """Statuses of `cancels`, sent in one signed action per `MAX_BATCH_ORDERS`."""
+  statuses = []
+  for start in range(0, len(cancels), MAX_BATCH_ORDERS):
+    chunk = cancels[start:start+MAX_BATCH_ORDERS]
+    result = await self.client.exchange.cancel(*chunk)
+    if result['status'] != 'ok':
+      raise ApiError(result)
+    chunk_statuses = result['response']['data']['statuses']
+    if len(chunk_statuses) != len(chunk):
+      raise ApiError({'error': f'expected {len(chunk)} statuses', 'details': result})
+    statuses.extend(chunk_statuses)
+  return statuses
+
 
 @wrap_exceptions
-async def query_order(self: SpotMarketMixin | PerpMarketMixin, id: str) -> OrderState | None:
+async def cancel_order(self: SpotMarketMixin | PerpMarketMixin, id: str, *, settings: MarketSettings = {}) -> Any:
+  [s] = await _cancel_wires(self, [{'a': self.asset_id, 'o': int(id)}])
+  return _cancel_status(s)
+
+
+@wrap_exceptions
+async def cancel_orders(self: SpotMarketMixin | PerpMarketMixin, ids: Sequence[str], *, settings: MarketSettings = {}) -> Sequence[Any]:
+  """Cancel `ids` as one `cancel` action (per `MAX_BATCH_ORDERS`). Raises on the first failed cancel,
+  after the whole batch has been sent."""
+  statuses = await _cancel_wires(self, [{'a': self.asset_id, 'o': int(id)} for id in ids])
+  return [_cancel_status(s) for s in statuses]
+
+
+async def fetch_order(self: SpotMarketMixin | PerpMarketMixin, id: str) -> OrderState | None:
   status: OrderStatusResponse = await self.client.info.order_status(self.address, int(id))
   if status['status'] == 'unknownOid':
     return None
@@ -114,14 +178,13 @@ async def query_order(self: SpotMarketMixin | PerpMarketMixin, id: str) -> Order
   o = entry['order']
   if o.get('coin') != self.asset_name:
     return None
+  return _parse_order(o, active=_active(entry['status']), details=status)
 
-  qty = Decimal(o['origSz'])
-  return OrderState(
-    id=str(o['oid']),
-    price=Decimal(o['limitPx']),
-    qty=qty,
-    filled_qty=qty - Decimal(o['sz']),
-    active=_active(entry['status']),
-    details=status,
-  )
 
+@wrap_exceptions
+async def query_order(self: SpotMarketMixin | PerpMarketMixin, id: str) -> OrderState | None:
+  if (store := self.shared.order_store) is not None:
+    return await store.query_order(
+      self.asset_name, id, lambda: fetch_order(self, id), lambda: fetch_open_orders(self),
+    )
+  return await fetch_order(self, id)
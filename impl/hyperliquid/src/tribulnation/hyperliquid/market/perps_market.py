@@ -7,6 +7,7 @@ from tribulnation.sdk.core import PaginatedResponse, LogicError, OverflowPolicy
 from tribulnation.sdk.market import (
   PerpMarket as _PerpMarket,
   Book,
+  BookDiff,
   Order,
   OrderResponse,
   OrderState,
@@ -26,6 +27,7 @@ from .impl import (
   PerpMarketMixin,
   depth,
   depth_stream,
+  depth_diff_stream,
   perps_rules,
   index,
   next_funding,
@@ -35,7 +37,9 @@ from .impl import (
   perp_market_collateral,
   open_orders,
   place_order,
+  place_orders,
   cancel_order,
+  cancel_orders,
   query_order,
   trades_history,
   trades_stream,
@@ -64,15 +68,20 @@ class PerpMarket(PerpMarketMixin, _PerpMarket):
     self, *, levels: int | None = None,
     queue_size: int = 1, overflow: OverflowPolicy = 'latest',
   ) -> AsyncContextManager[AsyncIterable[Book]]:
-    return depth_stream(self, queue_size=queue_size, overflow=overflow)
+    return depth_stream(self, levels=levels, queue_size=queue_size, overflow=overflow)
+
+  def depth_diff_stream(
+    self, *, resync_every: int = 1000,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ) -> AsyncContextManager[AsyncIterable[BookDiff]]:
+    return depth_diff_stream(self, resync_every=resync_every, queue_size=queue_size, overflow=overflow)
 
   @wrap_exceptions
   async def rules(self, *, refetch: bool = False) -> Rules:
     return await perps_rules(self, refetch=refetch)
 
-  @PaginatedResponse.lift
-  def trades_history(self, start: datetime, end: datetime) -> AsyncIterable[Sequence[Trade]]:
-    return trades_history(self, start, end)
+  def trades_history(self, start: datetime, end: datetime) -> PaginatedResponse[Trade]:
+    return PaginatedResponse.checkpointed(lambda t: trades_history(self, t, end), start, lambda trade: trade.time)
 
   async def open_orders(self) -> Sequence[OrderState]:
     return await open_orders(self)
@@ -106,12 +115,18 @@ class PerpMarket(PerpMarketMixin, _PerpMarket):
   async def place_order(self, order: Order, *, settings: Settings = {}) -> OrderResponse:
     return await place_order(self, order, settings=settings)
 
+  async def place_orders(self, orders: Sequence[Order], *, settings: Settings = {}) -> Sequence[OrderResponse]:
+    return await place_orders(self, orders, settings=settings)
+
   async def query_order(self, id: str) -> OrderState | None:
     return await query_order(self, id)
 
   async def cancel_order(self, id: str, *, settings: Settings = {}):
     return await cancel_order(self, id, settings=settings)
 
+  async def cancel_orders(self, ids: Sequence[str], *, settings: Settings = {}):
+    return await cancel_orders(self, ids, settings=settings)
+
   async def index(self, *, settings: Settings = {}) -> Decimal:
     return await index(self, settings=settings)
 
@@ -119,7 +134,7 @@ class PerpMarket(PerpMarketMixin, _PerpMarket):
     return await next_funding(self)
 
   def funding_rates(self, start: datetime | None = None, end: datetime | None = None) -> PaginatedResponse[FundingRate]:
-    return PaginatedResponse(funding_rates(self, start, end))
+    return PaginatedResponse.checkpointed(lambda t: funding_rates(self, t, end), start, lambda rate: rate.time)
 
   def funding_payments(self, start: datetime, end: datetime) -> PaginatedResponse[FundingPayment]:
-    return PaginatedResponse(funding_payments(self, start, end))
+    return PaginatedResponse.checkpointed(lambda t: funding_payments(self, t, end), start, lambda payment: payment.time)
@@ -7,6 +7,7 @@ from tribulnation.sdk.core import PaginatedResponse, LogicError, OverflowPolicy
 from tribulnation.sdk.market import (
   Market,
   Book,
+  BookDiff,
   Collateral,
   Order,
   OrderResponse,
@@ -23,6 +24,7 @@ from .impl import (
   SpotMarketMixin,
   depth,
   depth_stream,
+  depth_diff_stream,
   spot_rules,
   open_orders,
   query_order,
@@ -31,7 +33,9 @@ from .impl import (
   spot_position,
   spot_market_collateral,
   place_order,
+  place_orders,
   cancel_order,
+  cancel_orders,
 )
 
 
@@ -56,7 +60,13 @@ class SpotMarket(SpotMarketMixin, Market):
     self, *, levels: int | None = None,
     queue_size: int = 1, overflow: OverflowPolicy = 'latest',
   ) -> AsyncContextManager[AsyncIterable[Book]]:
-    return depth_stream(self, queue_size=queue_size, overflow=overflow)
+    return depth_stream(self, levels=levels, queue_size=queue_size, overflow=overflow)
+
+  def depth_diff_stream(
+    self, *, resync_every: int = 1000,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ) -> AsyncContextManager[AsyncIterable[BookDiff]]:
+    return depth_diff_stream(self, resync_every=resync_every, queue_size=queue_size, overflow=overflow)
 
   async def rules(self, *, refetch: bool = False) -> Rules:
     return await spot_rules(self, refetch=refetch)
@@ -88,7 +98,7 @@ class SpotMarket(SpotMarketMixin, Market):
     return Decimal(0)
 
   def trades_history(self, start: datetime, end: datetime) -> PaginatedResponse[Trade]:
-    return PaginatedResponse(trades_history(self, start, end))
+    return PaginatedResponse.checkpointed(lambda t: trades_history(self, t, end), start, lambda trade: trade.time)
 
   @wrap_exceptions
   async def query_order(self, id: str) -> OrderState | None:
@@ -98,6 +108,14 @@ class SpotMarket(SpotMarketMixin, Market):
   async def place_order(self, order: Order, *, settings: Settings = {}) -> OrderResponse:
     return await place_order(self, order, settings=settings)
 
+  @wrap_exceptions
+  async def place_orders(self, orders: Sequence[Order], *, settings: Settings = {}) -> Sequence[OrderResponse]:
+    return await place_orders(self, orders, settings=settings)
+
   @wrap_exceptions
   async def cancel_order(self, id: str, *, settings: Settings = {}):
     return await cancel_order(self, id, settings=settings)
+
+  @wrap_exceptions
+  async def cancel_orders(self, ids: Sequence[str], *, settings: Settings = {}):
+    return await cancel_orders(self, ids, settings=settings)
@@ -5,10 +5,11 @@ from datetime import datetime
 import asyncio
 
 from tribulnation.sdk import SDK
+from tribulnation.sdk.core import SingleFlight, managed_tasks
 from tribulnation.sdk.reporting import History as _History, Observation, HistoryRecord
 from tribulnation.sdk.reporting.util import source_id
 from hyperliquid.info import Info
-from tribulnation.hyperliquid.core import wrap_exceptions
+from tribulnation.hyperliquid.core import wrap_exceptions, rate_limited
 
 from .assets import Assets, USDC
 from .fills import AnyFill, discontinuities, parse_fills
@@ -44,6 +45,13 @@ class History(_History):
   for an account read regularly this may hold the only surviving copy of its
   early history. See `cache.py`.
   """
+  flights: SingleFlight = field(default_factory=SingleFlight, init=False, repr=False)
+  """Coalesces the lookups several sources need at once (settlement, assets)."""
+
+  def __post_init__(self):
+    # Sources fetch concurrently; the shared limiter keeps them under the IP's weight budget.
+    # A no-op for an `Info` already limited where it was built (e.g. by `Report.new`).
+    self.info = rate_limited(self.info)
 
   @classmethod
   def http(
@@ -72,7 +80,7 @@ class History(_History):
   async def resolve_assets(self) -> Assets:
     """Fetch and memoise the token index, needed to canonicalise asset ids."""
     if self.assets is None:
-      self.assets = await Assets.fetch(self.info)
+      self.assets = await self.flights.run('assets', lambda: Assets.fetch(self.info))
     return self.assets
 
   @SDK.method
@@ -87,6 +95,9 @@ class History(_History):
     markets would otherwise fall through to the USDC default at every lookup,
     misattributing their PnL to an asset they never settled in.
     """
+    return await self.flights.run('settlement', self.fetch_settlement)
+
+  async def fetch_settlement(self) -> dict[str, str]:
     dexes = await self.info.perp_dexs()
     out: dict[str, str] = {}
     for dex in dexes:
@@ -202,15 +213,21 @@ class History(_History):
   async def history(self, start: datetime | None = None, end: datetime | None = None):
     """Fetch the account's reporting history.
 
-    Sources run **sequentially**, unlike the concurrent fan-out other venue
-    implementations use. There, each source is a different service; here all
-    four hit the same rate-limited endpoint, and `userFillsByTime` charges
-    additional weight per 20 items returned. Sweeping them concurrently
-    multiplies that and reliably earns a 429 on an account of any size.
+    All four sources hit the same rate-limited endpoint, and `userFillsByTime`
+    charges additional weight per 20 items returned. They still run
+    concurrently: every request draws its weight from the process-wide
+    Hyperliquid limiter (see `rate_limits.py`), so the sweep proceeds at the
+    maximum safe rate instead of earning a 429.
+
+    Each source's records are yielded as soon as it completes, so records come
+    out by source in completion order. Sources still running when the consumer
+    stops are cancelled.
     """
-    for source in (self.trades, self.funding, self.ledger, self.staking):
-      for record in await source(start, end):
-        yield record
+    sources = (self.trades, self.funding, self.ledger, self.staking)
+    async with managed_tasks(source(start, end) for source in sources) as tasks:
+      for done in asyncio.as_completed(tasks):
+        for record in await done:
+          yield record
 
   @SDK.method
   @wrap_exceptions
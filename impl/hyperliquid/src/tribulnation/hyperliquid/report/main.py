@@ -5,6 +5,7 @@ from datetime import datetime
 
 from tribulnation.sdk.reporting import Report as _Report, SnapshotRecord
 from hyperliquid.info import Info
+from tribulnation.hyperliquid.core import rate_limited
 
 from .history import History
 from .snapshots import Snapshots
@@ -46,7 +47,8 @@ class Report(_Report):
       from .history.cache import HistoryCache
       cache = HistoryCache.connect(url, no_cache_reads=config.get('no_cache', False))
 
-    info = Info.http(validate=validate, mainnet=mainnet)
+    # Limited before it is shared, so snapshots draw from the same budget as history.
+    info = rate_limited(Info.http(validate=validate, mainnet=mainnet))
     return cls(
       history_impl=History(info, address, cache=cache),
       snapshots_impl=Snapshots(info, address),
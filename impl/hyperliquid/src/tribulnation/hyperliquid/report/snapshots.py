@@ -9,7 +9,7 @@ from tribulnation.sdk.reporting import (
   SubaccountSnapshot,
 )
 from hyperliquid.info import Info
-from tribulnation.hyperliquid.core import wrap_exceptions
+from tribulnation.hyperliquid.core import wrap_exceptions, rate_limited
 
 from .subaccounts import STAKING, UNIFIED
 
@@ -22,7 +22,7 @@ class Snapshots(_Snapshots):
 
   @classmethod
   def http(cls, address: str, *, validate: bool = True, mainnet: bool = True):
-    info = Info.http(validate=validate, mainnet=mainnet)
+    info = rate_limited(Info.http(validate=validate, mainnet=mainnet))
     return cls(info, address)
   
   @classmethod
@@ -1,7 +1,7 @@
 from .mixin import Shared, SharedMixin, ExchangeMixin, MarketMixin, Meta
-from .depth import depth, depth_stream
+from .depth import depth, depth_stream, depth_diff_stream
 from .rules import rules
-from .orders import open_orders, query_order, place_order, cancel_order
+from .orders import open_orders, query_order, place_order, place_orders, cancel_order, cancel_open_orders
 from .trades import trades_history, trades_stream
 from .position import position
 
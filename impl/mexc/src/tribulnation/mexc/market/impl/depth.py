@@ -4,7 +4,7 @@ from decimal import Decimal
 import asyncio
 from contextlib import asynccontextmanager, suppress
 
-from tribulnation.sdk.market import Book
+from tribulnation.sdk.market import Book, LiveBook
 from tribulnation.sdk.core import NetworkError, OverflowPolicy
 from tribulnation.mexc.core.exc import wrap_exceptions
 from mexc import MEXC
@@ -117,12 +117,16 @@ async def reconstruct_books(
   updates: AsyncIterable[PublicAggreDepthsV3Api],
   *,
   levels: int | None = None,
-) -> AsyncIterator[Book]:
+) -> AsyncIterator[LiveBook]:
   """Reconstruct a live order book from MEXC's snapshot + incremental diff feed.
 
   Runs once per shared subscription (not per consumer): the resulting full-book
   snapshots are fanned out by the `Subscription`, so each consumer's bounded
   inbox holds whole books rather than a growing backlog of raw diffs.
+
+  Yields the same `LiveBook` after every applied diff or resync; it is mutated
+  in place, so consumers must read it through a subscription view (`BookView`,
+  `DiffView`).
   """
   queue: asyncio.Queue[DepthUpdate] = asyncio.Queue(maxsize=100)
 
@@ -133,10 +137,15 @@ async def reconstruct_books(
       queue.put_nowait(parse_update(msg))
 
   collector = asyncio.create_task(collect())
+  live: LiveBook | None = None
   try:
     while True:
       version, book = await synchronized_book(client, symbol, queue, collector, levels=levels)
-      yield book.copy()
+      if live is None:
+        live = LiveBook(book)
+      else:
+        live.reset(book)
+      yield live
 
       while True:
         update = await receive_update(queue, collector)
@@ -144,9 +153,9 @@ async def reconstruct_books(
           continue
         if update.from_version != version + 1:
           break
-        book.update(update.book)
+        live.update(update.book)
         version = update.to_version
-        yield book.copy()
+        yield live
   finally:
     collector.cancel()
     with suppress(asyncio.CancelledError):
@@ -162,7 +171,20 @@ async def depth_stream(
   queue_size: int = 1,
   overflow: OverflowPolicy = 'latest',
 ):
-  # `levels` is accepted for API compatibility but does not size the shared
-  # streaming book (mirrors dYdX); use `depth(levels=...)` for a sized snapshot.
-  async with self.subscribe_depth(queue_size=queue_size, overflow=overflow) as stream:
+  # The shared streaming book is always full depth; `levels` truncates this
+  # subscriber's view of it.
+  async with self.subscribe_depth(levels=levels, queue_size=queue_size, overflow=overflow) as stream:
+    yield stream
+
+
+@asynccontextmanager
+@wrap_exceptions
+async def depth_diff_stream(
+  self: MarketMixin,
+  *,
+  resync_every: int = 1000,
+  queue_size: int = 1000,
+  overflow: OverflowPolicy = 'fail',
+):
+  async with self.subscribe_depth_diffs(resync_every=resync_every, queue_size=queue_size, overflow=overflow) as stream:
     yield stream
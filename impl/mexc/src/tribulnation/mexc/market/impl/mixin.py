@@ -1,13 +1,13 @@
-from typing_extensions import Any, AsyncContextManager, Iterable, TypedDict
+from typing_extensions import Any, AsyncContextManager, AsyncIterator, Iterable, TypedDict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-import asyncio
 
-from tribulnation.sdk.core import SDK, Subscription, OverflowPolicy
-from tribulnation.sdk.market import Book
+from tribulnation.sdk.core import SDK, SingleFlight, Subscription, OverflowPolicy
+from tribulnation.sdk.market import BookView, DiffView, LiveBook, OrderStore
 
 from mexc import MEXC
 from mexc.spot.market.exchange_info import SymbolInfo
-from mexc.spot.streams.core.proto import PrivateDealsV3Api
+from mexc.spot.streams.core.proto import PrivateDealsV3Api, PrivateOrdersV3Api
 
 from tribulnation.mexc.core.exc import wrap_exceptions
 
@@ -24,9 +24,14 @@ class Shared:
 
   spot_markets: dict[str, SpotInfo] | None = None
   my_trades_subscription: Subscription[PrivateDealsV3Api] | None = None
-  depth_subscriptions: dict[str, Subscription[Book]] = field(default_factory=dict)
+  my_orders_subscription: Subscription[PrivateOrdersV3Api] | None = None
+  depth_subscriptions: dict[str, Subscription[LiveBook]] = field(default_factory=dict)
 
-  _markets_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+  order_store: OrderStore | None = None
+  """Set while `SharedMixin.track_orders` is active."""
+
+  flights: SingleFlight = field(default_factory=SingleFlight, init=False, repr=False)
+  """Coalesces concurrent lazy loads. Refetches are keyed apart, so they never join a lazy load in flight."""
 
   @classmethod
   def new(
@@ -60,19 +65,14 @@ class Shared:
 
   @wrap_exceptions
   async def load_markets(self, *, refetch: bool = False) -> dict[str, SpotInfo]:
-    if not refetch and self.spot_markets is not None:
-      return self.spot_markets
-    async with self._markets_lock:
-      if not refetch and self.spot_markets is not None:
-        return self.spot_markets
-      info = await self.client.spot.market.exchange_info(validate=self.validate)
-      markets = {
+    if refetch or self.spot_markets is None:
+      info = await self.flights.run(('markets', refetch), lambda: self.client.spot.market.exchange_info(validate=self.validate))
+      self.spot_markets = {
         market['symbol']: market
         for market in info['symbols']
         if 'symbol' in market
       }
-      self.spot_markets = markets
-      return self.spot_markets
+    return self.spot_markets
 
   def depth_subscription(self, symbol: str):
     if symbol not in self.depth_subscriptions:
@@ -93,9 +93,18 @@ class Shared:
       async def subscribe():
         stream = await self.client.spot.streams.user.trades()
         return stream.stream, stream.unsubscribe
-      self.my_trades_subscription = Subscription.of(subscribe)
+      self.my_trades_subscription = Subscription.of(subscribe, batched=True)
     return self.my_trades_subscription
 
+  def my_orders_sub(self) -> Subscription[PrivateOrdersV3Api]:
+    if self.my_orders_subscription is None:
+      @wrap_exceptions
+      async def subscribe():
+        stream = await self.client.spot.streams.user.orders()
+        return stream.stream, stream.unsubscribe
+      self.my_orders_subscription = Subscription.of(subscribe, batched=True)
+    return self.my_orders_subscription
+
 @dataclass(frozen=True)
 class SharedMixin(SDK):
   shared: Shared
@@ -116,6 +125,26 @@ class SharedMixin(SDK):
     yield from super().resources()
     yield self.shared
 
+  def venue_identity(self) -> object:
+    return self.shared
+
+  @asynccontextmanager
+  async def track_orders(self, *, reconcile_every: float = 60, queue_size: int = 1000) -> AsyncIterator[OrderStore]:
+    """Answer `open_orders`/`query_order` of every market of the account from memory, kept
+    from the private orders stream, while in the context (see `OrderStore`)."""
+    if (store := self.shared.order_store) is not None and store.live:
+      yield store
+      return
+    # Local import avoids a circular import (orders.py imports MarketMixin).
+    from .orders import order_updates
+    async with self.shared.my_orders_sub().subscribe(queue_size=queue_size, overflow='fail') as updates:
+      async with OrderStore(reconcile_every=reconcile_every).following(order_updates(updates)) as store:
+        self.shared.order_store = store
+        try:
+          yield store
+        finally:
+          self.shared.order_store = None
+
 @dataclass(kw_only=True, frozen=True)
 class ExchangeMixin(SharedMixin):
   ...
@@ -135,8 +164,15 @@ class MarketMixin(ExchangeMixin):
       raise ValueError('MEXC spot market metadata is missing symbol')
     return symbol
 
-  def subscribe_depth(self, *, queue_size: int = 1, overflow: OverflowPolicy = 'latest'):
-    return self.shared.depth_subscription(self.instrument).subscribe(queue_size=queue_size, overflow=overflow)
+  def subscribe_depth(self, *, levels: int | None = None, queue_size: int = 1, overflow: OverflowPolicy = 'latest'):
+    return self.shared.depth_subscription(self.instrument).subscribe(
+      view=BookView(levels), queue_size=queue_size, overflow=overflow,
+    )
+
+  def subscribe_depth_diffs(self, *, resync_every: int = 1000, queue_size: int = 1000, overflow: OverflowPolicy = 'fail'):
+    return self.shared.depth_subscription(self.instrument).subscribe(
+      view=DiffView(resync_every), join=LiveBook.snapshot, queue_size=queue_size, overflow=overflow,
+    )
 
   def subscribe_my_trades(self, *, queue_size: int = 1000, overflow: OverflowPolicy = 'fail'):
     return self.shared.my_trades_sub().subscribe(queue_size=queue_size, overflow=overflow)
@@ -1,13 +1,16 @@
-from typing_extensions import Literal, NotRequired, Required, Sequence, TypedDict
+from typing_extensions import AsyncIterable, Literal, NotRequired, Required, Sequence, TypedDict
 from decimal import Decimal
 
 from mexc.spot.account.open_orders import OpenOrder
 from mexc.spot.account.order import OrderStatus as MexcOrderStatus
 from mexc.spot.trade.cancel_order import CancelOrderResponse
+from mexc.spot.trade.cancel_open_orders import CancelOpenOrdersItem
 from mexc.spot.trade.place_order import PlaceOrderResponse
+from mexc.spot.trade.batch_orders import BatchOrderRequest, BatchOrderResult
+from mexc.spot.streams.core.proto import PrivateOrdersV3Api
 
-from tribulnation.sdk.core import ValidationError
-from tribulnation.sdk.market import Order, OrderResponse, OrderState, Settings
+from tribulnation.sdk.core import ApiError, ValidationError
+from tribulnation.sdk.market import Order, OrderResponse, OrderState, OrderUpdate, Settings
 
 from tribulnation.mexc.core.exc import wrap_exceptions
 from .mixin import MarketMixin
@@ -16,6 +19,9 @@ OrderStatus = Literal['NEW', 'PARTIALLY_FILLED', 'FILLED', 'CANCELED', 'PARTIALL
 OrderSide = Literal['BUY', 'SELL']
 MexcOrderType = Literal['LIMIT', 'MARKET', 'LIMIT_MAKER']
 
+MAX_BATCH_ORDERS = 20
+"""Orders per `batchOrders` request (same symbol)."""
+
 class DumpedOrder(TypedDict):
   side: Required[OrderSide]
   type_: Required[MexcOrderType]
@@ -51,6 +57,36 @@ def _parse_order(order: OpenOrder | MexcOrderStatus) -> OrderState:
   )
 
 
+# Stream status codes: 1 NEW, 2 FILLED, 3 PARTIALLY_FILLED, 4 CANCELED, 5 PARTIALLY_CANCELED.
+STREAM_ACTIVE_STATUSES = {1, 3}
+
+def _parse_update(order: PrivateOrdersV3Api) -> OrderState:
+  sign = 1 if order.trade_type == 1 else -1
+  return OrderState(
+    id=order.id,
+    price=Decimal(order.price),
+    qty=Decimal(order.quantity) * sign,
+    filled_qty=Decimal(order.cumulative_quantity or 0) * sign,
+    active=order.status in STREAM_ACTIVE_STATUSES,
+    details=order,
+  )
+
+
+async def order_updates(updates: AsyncIterable[PrivateOrdersV3Api]) -> AsyncIterable[list[OrderUpdate]]:
+  """Private order stream messages as `OrderStore` updates. They carry no symbol, so
+  orders the store has not seen yet are picked up by the next reconciliation."""
+  async for order in updates:
+    yield [(None, _parse_update(order))]
+
+
+def _record_placement(self: MarketMixin, order: Order, id: str, details):
+  if (store := self.shared.order_store) is not None and order['type'] != 'MARKET':
+    store.add(self.instrument, OrderState(
+      id=id, price=Decimal(order['price']), qty=Decimal(order['qty']),
+      filled_qty=Decimal(0), active=True, details=details,
+    ))
+
+
 def _dump_order(order: Order) -> DumpedOrder:
   signed_qty = Decimal(order['qty'])
   side: OrderSide = 'BUY' if signed_qty >= 0 else 'SELL'
@@ -67,8 +103,7 @@ def _dump_order(order: Order) -> DumpedOrder:
       raise ValidationError(f"Unknown order type: {order['type']}")
 
 
-@wrap_exceptions
-async def open_orders(self: MarketMixin) -> Sequence[OrderState]:
+async def fetch_open_orders(self: MarketMixin) -> Sequence[OrderState]:
   orders = await self.client.spot.account.open_orders(
     symbol=self.instrument,
     recv_window=self.shared.recv_window,
@@ -78,7 +113,13 @@ async def open_orders(self: MarketMixin) -> Sequence[OrderState]:
 
 
 @wrap_exceptions
-async def query_order(self: MarketMixin, id: str) -> OrderState | None:
+async def open_orders(self: MarketMixin) -> Sequence[OrderState]:
+  if (store := self.shared.order_store) is not None:
+    return await store.open_orders(self.instrument, lambda: fetch_open_orders(self))
+  return await fetch_open_orders(self)
+
+
+async def fetch_order(self: MarketMixin, id: str) -> OrderState | None:
   order = await self.client.spot.account.order(
     symbol=self.instrument,
     order_id=id,
@@ -88,6 +129,15 @@ async def query_order(self: MarketMixin, id: str) -> OrderState | None:
   return _parse_order(order)
 
 
+@wrap_exceptions
+async def query_order(self: MarketMixin, id: str) -> OrderState | None:
+  if (store := self.shared.order_store) is not None:
+    return await store.query_order(
+      self.instrument, id, lambda: fetch_order(self, id), lambda: fetch_open_orders(self),
+    )
+  return await fetch_order(self, id)
+
+
 @wrap_exceptions
 async def place_order(self: MarketMixin, order: Order, *, settings: Settings = {}) -> OrderResponse:
   dumped = _dump_order(order)
@@ -100,7 +150,48 @@ async def place_order(self: MarketMixin, order: Order, *, settings: Settings = {
     recv_window=self.shared.recv_window,
     validate=self.shared.validate,
   )
-  return OrderResponse(id=str(r.get('orderId')), details=r)
+  response = OrderResponse(id=str(r.get('orderId')), details=r)
+  _record_placement(self, order, response.id, r)
+  return response
+
+
+def _batch_order(self: MarketMixin, order: Order) -> BatchOrderRequest:
+  dumped = _dump_order(order)
+  request: BatchOrderRequest = {
+    'symbol': self.instrument,
+    'side': dumped['side'],
+    'type': dumped['type_'],
+    'quantity': dumped['quantity'],
+  }
+  if (price := dumped.get('price')) is not None:
+    request['price'] = price
+  return request
+
+
+def _batch_response(result: BatchOrderResult) -> OrderResponse:
+  if (order_id := result.get('orderId')) is None:
+    raise ApiError(result)
+  return OrderResponse(id=str(order_id), details=result)
+
+
+@wrap_exceptions
+async def place_orders(self: MarketMixin, orders: Sequence[Order], *, settings: Settings = {}) -> Sequence[OrderResponse]:
+  """Place `orders` in one `batchOrders` request per `MAX_BATCH_ORDERS`. Raises on the first
+  rejected order, after the whole batch has been sent."""
+  requests = [_batch_order(self, order) for order in orders]
+  results: list[BatchOrderResult] = []
+  for start in range(0, len(requests), MAX_BATCH_ORDERS):
+    results.extend(await self.client.spot.trade.batch_orders(
+      batch_orders=requests[start:start+MAX_BATCH_ORDERS],
+      recv_window=self.shared.recv_window,
+      validate=self.shared.validate,
+    ))
+  if len(results) != len(requests):
+    raise ApiError({'error': f'expected {len(requests)} results', 'details': results})
+  for order, r in zip(orders, results):
+    if (order_id := r.get('orderId')) is not None:
+      _record_placement(self, order, str(order_id), r)
+  return [_batch_response(r) for r in results]
 
 
 @wrap_exceptions
@@ -111,3 +202,13 @@ async def cancel_order(self: MarketMixin, id: str, *, settings: Settings = {}) -
     recv_window=self.shared.recv_window,
     validate=self.shared.validate,
   )
+
+
+@wrap_exceptions
+async def cancel_open_orders(self: MarketMixin, *, settings: Settings = {}) -> list[CancelOpenOrdersItem]:
+  """Cancel every open order on the symbol in one request, without listing them first."""
+  return await self.client.spot.trade.cancel_open_orders(
+    symbol=self.instrument,
+    recv_window=self.shared.recv_window,
+    validate=self.shared.validate,
+  )
@@ -7,6 +7,7 @@ from tribulnation.sdk.core import PaginatedResponse, OverflowPolicy
 from tribulnation.sdk.market import (
   Market,
   Book,
+  BookDiff,
   Collateral,
   Order,
   OrderResponse,
@@ -22,6 +23,7 @@ from .impl import (
   MarketMixin,
   depth,
   depth_stream,
+  depth_diff_stream,
   rules,
   open_orders,
   query_order,
@@ -29,7 +31,9 @@ from .impl import (
   trades_stream,
   position,
   place_order,
+  place_orders,
   cancel_order,
+  cancel_open_orders,
 )
 
 @dataclass(frozen=True, kw_only=True)
@@ -56,6 +60,12 @@ class SpotMarket(MarketMixin, Market):
   ) -> AsyncContextManager[AsyncIterable[Book]]:
     return depth_stream(self, levels=levels, queue_size=queue_size, overflow=overflow)
 
+  def depth_diff_stream(
+    self, *, resync_every: int = 1000,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ) -> AsyncContextManager[AsyncIterable[BookDiff]]:
+    return depth_diff_stream(self, resync_every=resync_every, queue_size=queue_size, overflow=overflow)
+
   async def rules(self, *, refetch: bool = False) -> Rules:
     return await rules(self, refetch=refetch)
 
@@ -97,5 +107,11 @@ class SpotMarket(MarketMixin, Market):
   async def place_order(self, order: Order, *, settings: Settings = {}) -> OrderResponse:
     return await place_order(self, order, settings=settings)
 
+  async def place_orders(self, orders: Sequence[Order], *, settings: Settings = {}) -> Sequence[OrderResponse]:
+    return await place_orders(self, orders, settings=settings)
+
   async def cancel_order(self, id: str, *, settings: Settings = {}):
     return await cancel_order(self, id, settings=settings)
+
+  async def cancel_open_orders(self, *, settings: Settings = {}):
+    return await cancel_open_orders(self, settings=settings)
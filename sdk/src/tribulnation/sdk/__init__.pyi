@@ -1,7 +1,7 @@
 from .core import (
   SDK, Context, full_jitter,
   Error, NetworkError, ValidationError,
-  ApiError, BadRequest, AuthError, RateLimited, LogicError,
+  ApiError, BadRequest, AuthError, RateLimited, LogicError, DeadlineExceeded, CircuitOpen,
 )
 from .earn import Earn
 from .wallet import Wallet
@@ -16,7 +16,7 @@ from .impl import MarketSDK, EarnSDK, WalletSDK, ReportSDK, Account, accounts
 
 __all__ = [
   'SDK', 'Context', 'full_jitter',
-  'Error', 'NetworkError', 'ValidationError', 'ApiError', 'BadRequest', 'AuthError', 'RateLimited', 'LogicError',
+  'Error', 'NetworkError', 'ValidationError', 'ApiError', 'BadRequest', 'AuthError', 'RateLimited', 'LogicError', 'DeadlineExceeded', 'CircuitOpen',
   'Earn', 'Wallet', 'Report',
   'TradingMarkets', 'TradingVenue', 'Market', 'PerpMarket', 'Exchange', 'PerpExchange',
   'MarketSDK', 'EarnSDK', 'WalletSDK', 'ReportSDK', 'Account', 'accounts',
@@ -1,24 +1,30 @@
 from .exc import (
   Error, NetworkError, ValidationError,
   ApiError, BadRequest, AuthError, RateLimited,
-  LogicError,
+  LogicError, DeadlineExceeded, CircuitOpen,
 )
 from .invocations import (
   Context, Middleware, RetryJitter,
-  SDK, full_jitter, log, retry,
+  SDK, cache, circuit_breaker, full_jitter, hedge, log, metrics, rate_limit, retry, single_flight,
+  MetricsRegistry, MethodMetrics, Histogram, CachePolicy, ResponseCache,
+  BreakerPolicy, CircuitBreaker,
 )
-from .concurrency import managed_tasks
-from .lifecycle import AsyncResourceState, resource_state
-from .stream import Subscription, StreamInbox, OverflowPolicy
+from .concurrency import managed_tasks, SingleFlight
+from .lifecycle import AsyncResourceState, ResourcePool, resource_state
+from .ratelimit import RateLimiter, Weight
+from .stream import Subscription, StreamInbox, OverflowPolicy, InboxStats, PumpStats
 from .paging import PaginatedResponse
 
 __all__ = [
   'Error', 'NetworkError', 'ValidationError',
   'ApiError', 'BadRequest', 'AuthError', 'RateLimited',
-  'LogicError',
+  'LogicError', 'DeadlineExceeded', 'CircuitOpen',
   'Context', 'Middleware', 'RetryJitter',
-  'SDK', 'full_jitter', 'log', 'retry', 'managed_tasks',
-  'AsyncResourceState', 'resource_state',
-  'Subscription', 'StreamInbox', 'OverflowPolicy',
+  'SDK', 'cache', 'circuit_breaker', 'full_jitter', 'hedge', 'log', 'metrics', 'rate_limit', 'retry', 'single_flight',
+  'managed_tasks', 'SingleFlight',
+  'MetricsRegistry', 'MethodMetrics', 'Histogram', 'CachePolicy', 'ResponseCache',
+  'BreakerPolicy', 'CircuitBreaker',
+  'AsyncResourceState', 'ResourcePool', 'resource_state', 'RateLimiter', 'Weight',
+  'Subscription', 'StreamInbox', 'OverflowPolicy', 'InboxStats', 'PumpStats',
   'PaginatedResponse',
 ]
@@ -1,9 +1,10 @@
 """Utilities for owning groups of asynchronous tasks."""
 
-from collections.abc import AsyncGenerator, Awaitable, Iterable
+from collections.abc import AsyncGenerator, Awaitable, Callable, Hashable, Iterable
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 import asyncio
-from typing_extensions import TypeVar
+from typing_extensions import Any, TypeVar
 
 T = TypeVar('T')
 
@@ -20,3 +21,47 @@ async def managed_tasks(
       if not task.done():
         task.cancel()
     await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@dataclass
+class Flight:
+  task: asyncio.Future[Any]
+  waiters: int = 0
+
+
+@dataclass
+class SingleFlight:
+  """Coalesce concurrent calls with equal keys into one in-flight task.
+
+  ```python
+  markets = await flights.run('markets', client.get_markets)
+  ```
+
+  Callers arriving while a call for `key` is running await that call's result
+  (or exception) instead of starting their own. Once it finishes, the next call
+  starts afresh: this de-duplicates, it does not cache. The task is cancelled
+  only when every caller waiting on it has been cancelled.
+  """
+  flights: dict[Hashable, Flight] = field(default_factory=dict)
+
+  async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+    flight = self.flights.get(key)
+    if flight is None:
+      flight = self.flights[key] = Flight(asyncio.ensure_future(fn()))
+      flight.task.add_done_callback(lambda task: self.land(key, task))
+    flight.waiters += 1
+    try:
+      return await asyncio.shield(flight.task)
+    finally:
+      flight.waiters -= 1
+      if not flight.waiters and not flight.task.done():
+        # Drop it first: a caller arriving before it lands must start afresh, not join it.
+        if self.flights.get(key) is flight:
+          del self.flights[key]
+        flight.task.cancel()
+
+  def land(self, key: Hashable, task: asyncio.Future[Any]):
+    if (flight := self.flights.get(key)) is not None and flight.task is task:
+      del self.flights[key]
+    if not task.cancelled():
+      task.exception()  # Retrieved by the waiters, if any are left.
@@ -34,6 +34,16 @@ class RateLimited(ApiError):
   def __str__(self):
     return super().__str__()
 
+class DeadlineExceeded(Error):
+  """The call ran out of its `Context.within` time budget."""
+  def __str__(self):
+    return super().__str__()
+
+class CircuitOpen(Error):
+  """Failing fast: the endpoint's circuit breaker is open after repeated failures."""
+  def __str__(self):
+    return super().__str__()
+
 class LogicError(Error):
   """Logic error: invalid assumptions, logic, or other bugs on the SDK side."""
   def __str__(self):
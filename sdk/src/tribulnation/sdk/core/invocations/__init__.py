@@ -1,3 +1,6 @@
 from .context import Context
-from .middleware import Middleware, RetryJitter, RetryLogger, full_jitter, log, retry
+from .middleware import Middleware, RetryJitter, RetryLogger, cache, circuit_breaker, full_jitter, hedge, log, metrics, rate_limit, retry, single_flight
+from .telemetry import Histogram, MethodMetrics, MetricsRegistry, registry
 from .sdk import SDK
+from .caching import CachePolicy, ResponseCache
+from .resilience import BreakerPolicy, Circuit, CircuitBreaker, CircuitState, EndpointMap
@@ -0,0 +1,101 @@
+from typing_extensions import Any, Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from collections import OrderedDict
+import asyncio
+import time
+
+from ..concurrency import SingleFlight
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+  """How long a cached method result is served."""
+  ttl: float
+  """Seconds a result is fresh."""
+  stale: float = 0
+  """Seconds past `ttl` a result is still served while it is refreshed in the background."""
+
+
+@dataclass
+class CacheEntry:
+  value: Any
+  fetched: float
+  """`ResponseCache.clock()` when the value was fetched."""
+  owner: Any = None
+  """The SDK object the value was fetched for. Held so its `id()` in the key is not reused."""
+
+
+@dataclass
+class ResponseCache:
+  """LRU store of method results for the `cache` middleware.
+
+  Keys are `(Context.path, id(SDK object), arguments)`; at most `max_size` results
+  are kept, evicting the least recently used. Concurrent misses for one key
+  share a single call, and so do background refreshes.
+  """
+  max_size: int = 1024
+  entries: OrderedDict[Hashable, CacheEntry] = field(default_factory=OrderedDict)
+  generation: int = 0
+  """Bumped by `invalidate`: results of calls started before are not stored."""
+  flights: SingleFlight = field(default_factory=SingleFlight)
+  refreshes: set[asyncio.Future[Any]] = field(default_factory=set)
+  clock: Callable[[], float] = time.monotonic
+
+  def get(self, key: Hashable) -> CacheEntry | None:
+    entry = self.entries.get(key)
+    if entry is not None:
+      self.entries.move_to_end(key)
+    return entry
+
+  def put(self, key: Hashable, value: Any, owner: Any = None):
+    self.entries[key] = CacheEntry(value, self.clock(), owner)
+    self.entries.move_to_end(key)
+    while len(self.entries) > self.max_size:
+      self.entries.popitem(last=False)
+
+  async def fetch(self, key: Hashable, fn: Callable[[], Awaitable[Any]], owner: Any = None) -> Any:
+    """Call `fn` (once for concurrent callers) and store its result, unless
+    `invalidate` ran meanwhile."""
+    async def call():
+      generation = self.generation
+      value = await fn()
+      if generation == self.generation:
+        self.put(key, value, owner)
+      return value
+    return await self.flights.run(key, call)
+
+  def refresh(self, key: Hashable, fn: Callable[[], Awaitable[Any]], owner: Any = None):
+    """Fetch in the background. Failures leave the stale entry to expire."""
+    if key in self.flights.flights:
+      return
+    task = asyncio.ensure_future(self.fetch(key, fn, owner))
+    self.refreshes.add(task)
+    task.add_done_callback(self.refreshed)
+
+  def refreshed(self, task: asyncio.Future[Any]):
+    self.refreshes.discard(task)
+    if not task.cancelled():
+      task.exception()
+
+  def invalidate(self, path: str | None = None):
+    """Drop every result (`path=None`), or those whose `Context.path` contains the
+    dotted `path` as consecutive segments, at any depth. Calls in flight do not
+    store their (possibly stale) results.
+
+    ```python
+    cache.invalidate('rules')  # every `rules(...)` result, also `market.rules`
+    ```
+    """
+    self.generation += 1
+    if path is None:
+      self.entries.clear()
+      return
+    segments = tuple(path.split('.'))
+    for key in [k for k in self.entries if contains(k[0], segments)]: # type: ignore
+      del self.entries[key]
+
+
+def contains(path: tuple[str, ...], segments: tuple[str, ...]) -> bool:
+  """Whether `segments` appear consecutively in `path`."""
+  n = len(segments)
+  return any(path[i:i+n] == segments for i in range(len(path) - n + 1))
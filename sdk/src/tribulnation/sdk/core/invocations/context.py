@@ -1,10 +1,15 @@
-from typing_extensions import Any, Iterator, Callable, TypeVar, ParamSpec, Awaitable, overload
+from typing_extensions import Any, Iterable, Iterator, Callable, Mapping, TypeVar, ParamSpec, Awaitable, overload
 from contextlib import contextmanager
 from contextvars import ContextVar
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 import inspect
+import time
 
 from .middleware import Middleware, RetryJitter
+from .telemetry import MetricsRegistry
+from .caching import CachePolicy, ResponseCache
+from .resilience import CircuitBreaker
+from ..ratelimit import RateLimiter, Weight
 
 T = TypeVar('T', covariant=True)
 Ps = ParamSpec('Ps')
@@ -16,9 +21,67 @@ _current_ctx: ContextVar['Context | None'] = ContextVar('sdk_current_ctx', defau
 class Context:
   middleware: tuple[Middleware, ...] = ()
   path: tuple[str, ...] = ()
+  deadline: float | None = None
+  """`time.monotonic()` by which calls in this context must finish (see `within`)."""
+  children: dict[str, 'Context'] = field(default_factory=dict, init=False, compare=False, repr=False)
+  """Memoized `child` contexts (without a deadline), by name."""
+  compiled: dict[Callable[..., Any], Callable[..., Any]] = field(default_factory=dict, init=False, compare=False, repr=False)
+  """Memoized `bind` chains, by wrapped function."""
 
   def child(self, name: str) -> 'Context':
-    return replace(self, path=self.path + (name,))
+    """This context one level down `path`. Created once per name and reused."""
+    child = self.children.get(name)
+    if child is None:
+      child = self.children[name] = Context(middleware=self.middleware, path=self.path + (name,))
+    return child if self.deadline is None else child.with_deadline(self.deadline)
+
+  def with_deadline(self, deadline: float | None) -> 'Context':
+    """This context with `deadline`, sharing its memoized children and chains."""
+    ctx = replace(self, deadline=deadline)
+    object.__setattr__(ctx, 'children', self.children)
+    object.__setattr__(ctx, 'compiled', self.compiled)
+    return ctx
+
+  def bind(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """`fn` wrapped in this context's middleware, outermost first.
+
+    Compiled once per function and reused, also by contexts differing only in
+    `deadline`, so middleware must keep per-call state inside the wrapper it
+    returns, not in the binding step. Chains are bound to the context without a
+    deadline; middleware reads a call's deadline from `Context.current()`.
+    """
+    invoke = self.compiled.get(fn)
+    if invoke is None:
+      invoke = fn
+      ctx = self if self.deadline is None else self.with_deadline(None)
+      for middleware in reversed(self.middleware):
+        invoke = middleware(invoke, ctx)
+      self.compiled[fn] = invoke
+    return invoke
+
+  def within(self, seconds: float) -> 'Context':
+    """This context with calls due within `seconds` from now (or sooner, if already due).
+
+    The budget covers the whole call, retries and backoff included: a coroutine
+    method still running at the deadline is cancelled and raises `DeadlineExceeded`,
+    as is a page or item of an async generator or `PaginatedResponse` still being
+    fetched, and `retry` gives up rather than sleep past it. Nested calls share the budget.
+    Derive it right before the calls it bounds:
+
+    ```python
+    with ctx.within(0.3).use():
+      await sdk.place_order(...)
+    ```
+    """
+    deadline = time.monotonic() + seconds
+    if self.deadline is not None:
+      deadline = min(deadline, self.deadline)
+    return self.with_deadline(deadline)
+
+  @property
+  def remaining(self) -> float | None:
+    """Seconds left before `deadline`, if any (negative once it has passed)."""
+    return None if self.deadline is None else self.deadline - time.monotonic()
 
   def add(self, middleware: Middleware) -> 'Context':
     return replace(self, middleware=self.middleware + (middleware,))
@@ -27,6 +90,37 @@ class Context:
     from . import middleware
     return self.add(middleware.log(log_self=log_self))
 
+  def measured(self, registry: MetricsRegistry | None = None) -> 'Context':
+    from . import middleware
+    return self.add(middleware.metrics(registry))
+
+  def cached(
+    self, policies: Mapping[str, CachePolicy | float], *, store: ResponseCache | None = None,
+  ) -> 'Context':
+    from . import middleware
+    return self.add(middleware.cache(policies, store=store))
+
+  def guarded(self, breaker: CircuitBreaker | None = None) -> 'Context':
+    from . import middleware
+    return self.add(middleware.circuit_breaker(breaker))
+
+  def hedged(
+    self, methods: Iterable[str], *, quantile: float = 0.95, min_samples: int = 20, budget: float = 0.05,
+  ) -> 'Context':
+    from . import middleware
+    return self.add(middleware.hedge(methods, quantile=quantile, min_samples=min_samples, budget=budget))
+
+  def coalesced(self) -> 'Context':
+    from . import middleware
+    return self.add(middleware.single_flight())
+
+  def rate_limited(
+    self, limiter: RateLimiter, weights: Mapping[str, Weight | float] | None = None,
+    *, default: Weight | float = 1,
+  ) -> 'Context':
+    from . import middleware
+    return self.add(middleware.rate_limit(limiter, weights, default=default))
+
   def retried(
     self,
     *exceptions: type[Exception],
@@ -1,9 +1,18 @@
-from typing_extensions import TYPE_CHECKING, Any, Awaitable, Callable, Protocol, TypeVar, cast
+from typing_extensions import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Mapping, Protocol, TypeVar, cast
 import asyncio
 import functools
 import inspect
 import math
 import random
+import time
+
+from .telemetry import MetricsRegistry, registry as default_registry
+from ..ratelimit import RateLimiter, Weight
+from ..concurrency import SingleFlight
+from ..paging import PaginatedResponse
+from .caching import CachePolicy, ResponseCache
+from .resilience import CircuitBreaker, EndpointMap, HedgeStats
+from ..exc import CircuitOpen
 
 if TYPE_CHECKING:
   from .context import Context
@@ -23,6 +32,11 @@ def get_sdk_self(args: tuple[Any, ...]) -> Any | None:
     return args[0]
 
 
+def get_venue(args: tuple[Any, ...]) -> Any | None:
+  sdk = get_sdk_self(args)
+  return None if sdk is None else sdk.venue_identity()
+
+
 def exclude_sdk_self(args: tuple[Any, ...]) -> tuple[Any, ...]:
   return args[1:] if get_sdk_self(args) is not None else args
 
@@ -61,6 +75,286 @@ def log(*, log_self: bool = False) -> Middleware:
   return bind
 
 
+def metrics(registry: MetricsRegistry | None = None) -> Middleware:
+  """Record call counts, errors by type and latency per `Context.path` into `registry`
+  (default: the shared `telemetry.registry`). Async generators also record time to
+  their first item and the number of items."""
+  reg = registry if registry is not None else default_registry
+
+  def bind(fn: Fn, ctx: 'Context') -> Fn:
+    m = reg.get(ctx.path)
+
+    if inspect.isasyncgenfunction(fn):
+      @functools.wraps(fn)
+      async def asyncgen_wrapper(*args: Any, **kwargs: Any):
+        m.calls += 1
+        start = time.perf_counter()
+        first = True
+        try:
+          async for item in fn(*args, **kwargs):
+            if first:
+              m.first_item.observe(time.perf_counter() - start)
+              first = False
+            m.items += 1
+            yield item
+        except Exception as e:
+          m.error(e)
+          raise
+        finally:
+          m.latency.observe(time.perf_counter() - start)
+
+      return cast(Fn, asyncgen_wrapper)
+
+    if inspect.iscoroutinefunction(fn):
+      @functools.wraps(fn)
+      async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+        m.calls += 1
+        start = time.perf_counter()
+        try:
+          return await fn(*args, **kwargs)
+        except Exception as e:
+          m.error(e)
+          raise
+        finally:
+          m.latency.observe(time.perf_counter() - start)
+
+      return cast(Fn, coroutine_wrapper)
+
+    @functools.wraps(fn)
+    def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+      m.calls += 1
+      start = time.perf_counter()
+      try:
+        return fn(*args, **kwargs)
+      except Exception as e:
+        m.error(e)
+        raise
+      finally:
+        m.latency.observe(time.perf_counter() - start)
+
+    return cast(Fn, sync_wrapper)
+
+  return bind
+
+
+def rate_limit(
+  limiter: RateLimiter, weights: Mapping[str, Weight | float] | None = None, *, default: Weight | float = 1,
+) -> Middleware:
+  """Draw every call from `limiter`, weighted per method name (the last `Context.path` element).
+
+  Each step of an async generator that yields an item (e.g. fetching a page of a
+  paginated method) costs a full request weight; the final step, finding there are
+  no more, is refunded. `Weight.response` is charged per item.
+  """
+  def weight_of(ctx: 'Context') -> Weight:
+    w = (weights or {}).get(ctx.path[-1], default) if ctx.path else default
+    return w if isinstance(w, Weight) else Weight(w)
+
+  def bind(fn: Fn, ctx: 'Context') -> Fn:
+    weight = weight_of(ctx)
+
+    if inspect.isasyncgenfunction(fn):
+      @functools.wraps(fn)
+      async def asyncgen_wrapper(*args: Any, **kwargs: Any):
+        items = aiter(fn(*args, **kwargs))
+        while True:
+          await limiter.acquire(weight.request)
+          try:
+            item = await anext(items)
+          except StopAsyncIteration:
+            limiter.refund(weight.request)
+            return
+          if weight.response is not None:
+            limiter.charge(weight.response(item))
+          yield item
+
+      return cast(Fn, asyncgen_wrapper)
+
+    if inspect.iscoroutinefunction(fn):
+      @functools.wraps(fn)
+      async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+        await limiter.acquire(weight.request)
+        result = await fn(*args, **kwargs)
+        if weight.response is not None:
+          limiter.charge(weight.response(result))
+        return result
+
+      return cast(Fn, coroutine_wrapper)
+
+    return fn
+
+  return bind
+
+
+def single_flight() -> Middleware:
+  """Share one in-flight call among concurrent calls to the same coroutine method
+  (same `Context.path` and SDK object) with equal arguments.
+
+  Calls with unhashable arguments run on their own.
+  """
+  flights = SingleFlight()
+
+  def bind(fn: Fn, ctx: 'Context') -> Fn:
+    if not inspect.iscoroutinefunction(fn):
+      return fn
+
+    @functools.wraps(fn)
+    async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+      key = (ctx.path, id(get_sdk_self(args)), exclude_sdk_self(args), frozenset(kwargs.items()))
+      try:
+        hash(key)
+      except TypeError:
+        return await fn(*args, **kwargs)
+      return await flights.run(key, lambda: fn(*args, **kwargs))
+
+    return cast(Fn, coroutine_wrapper)
+
+  return bind
+
+
+def cache(
+  policies: Mapping[str, CachePolicy | float], *, store: ResponseCache | None = None,
+) -> Middleware:
+  """Serve coroutine method results from `store` (default: a new `ResponseCache`).
+
+  `policies` maps a dotted `Context.path` or a bare method name to a
+  `CachePolicy` (or just a TTL in seconds); other methods are not cached, and
+  neither are exceptions or calls with unhashable arguments. Pass your own
+  `store` to invalidate it.
+  """
+  results = store if store is not None else ResponseCache()
+
+  def policy_of(ctx: 'Context') -> CachePolicy | None:
+    if not ctx.path:
+      return None
+    p = policies.get('.'.join(ctx.path), policies.get(ctx.path[-1]))
+    return p if p is None or isinstance(p, CachePolicy) else CachePolicy(p)
+
+  def bind(fn: Fn, ctx: 'Context') -> Fn:
+    policy = policy_of(ctx)
+    if policy is None or not inspect.iscoroutinefunction(fn):
+      return fn
+
+    @functools.wraps(fn)
+    async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+      owner = get_sdk_self(args)
+      # Entries hold `owner`, so its `id()` is not reused while they are cached.
+      key = (ctx.path, id(owner), exclude_sdk_self(args), frozenset(kwargs.items()))
+      try:
+        hash(key)
+      except TypeError:
+        return await fn(*args, **kwargs)
+      call = lambda: fn(*args, **kwargs)
+      entry = results.get(key)
+      if entry is not None and entry.owner is owner:
+        age = results.clock() - entry.fetched
+        if age < policy.ttl:
+          return entry.value
+        if age < policy.ttl + policy.stale:
+          results.refresh(key, call, owner)
+          return entry.value
+      return await results.fetch(key, call, owner)
+
+    return cast(Fn, coroutine_wrapper)
+
+  return bind
+
+
+def circuit_breaker(breaker: CircuitBreaker | None = None) -> Middleware:
+  """Fail coroutine calls fast with `CircuitOpen` while their endpoint (`Context.path`
+  and venue) is unhealthy, per `breaker.policy` (default: a new `CircuitBreaker`).
+
+  Add it after `retry`, so each attempt is counted and, once the circuit opens, the
+  remaining attempts fail fast instead of sleeping and retrying a sick venue.
+  """
+  circuits = breaker if breaker is not None else CircuitBreaker()
+  policy = circuits.policy
+
+  def bind(fn: Fn, ctx: 'Context') -> Fn:
+    if not inspect.iscoroutinefunction(fn):
+      return fn
+
+    @functools.wraps(fn)
+    async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+      circuit = circuits.admit(ctx.path, get_venue(args))
+      if circuit is None:
+        raise CircuitOpen(f'{".".join(ctx.path)} is failing; retry after {policy.cooldown}s')
+      start = time.monotonic()
+      try:
+        result = await fn(*args, **kwargs)
+      except policy.errors:
+        circuits.record(circuit, ok=False)
+        raise
+      except BaseException:
+        circuits.release(circuit)
+        raise
+      circuits.record(circuit, ok=policy.slow is None or time.monotonic() - start < policy.slow)
+      return result
+
+    return cast(Fn, coroutine_wrapper)
+
+  return bind
+
+
+def hedge(
+  methods: Iterable[str], *, quantile: float = 0.95, min_samples: int = 20, budget: float = 0.05,
+) -> Middleware:
+  """Send a second, identical call when the first is slower than usual; the first to succeed wins.
+
+  Only for idempotent reads (e.g. `depth`, `tickers`, `open_orders`), listed in
+  `methods` by dotted `Context.path` or bare method name. A call is hedged once it
+  has run longer than the `quantile` latency of its endpoint, measured over at
+  least `min_samples` calls, and only while hedges stay within `budget` (a
+  fraction) of calls, so a slow venue gets at most a few extra requests.
+  """
+  names = set(methods)
+  stats = EndpointMap[HedgeStats]()
+
+  def settle(task: asyncio.Future[Any]):
+    if not task.cancelled():
+      task.exception()
+
+  def bind(fn: Fn, ctx: 'Context') -> Fn:
+    if not ctx.path or not ({'.'.join(ctx.path), ctx.path[-1]} & names) or not inspect.iscoroutinefunction(fn):
+      return fn
+
+    @functools.wraps(fn)
+    async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+      s = stats.get(ctx.path, get_venue(args), HedgeStats)
+      s.calls += 1
+      start = time.perf_counter()
+      delay = s.latency.quantile(quantile) if s.latency.count >= min_samples else None
+      if delay is None or math.isinf(delay) or s.hedges >= budget * s.calls:
+        result = await fn(*args, **kwargs)
+        s.latency.observe(time.perf_counter() - start)
+        return result
+
+      tasks = [asyncio.ensure_future(fn(*args, **kwargs))]
+      try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+          s.hedges += 1
+          tasks.append(asyncio.ensure_future(fn(*args, **kwargs)))
+        pending = set(tasks)
+        while True:
+          done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+          for task in done:
+            if task.exception() is None:
+              s.latency.observe(time.perf_counter() - start)
+              return task.result()
+          if not pending:
+            return tasks[0].result()  # every call failed: raise the first one's error
+      finally:
+        for task in tasks:
+          if not task.done():
+            task.cancel()
+          task.add_done_callback(settle)
+
+    return cast(Fn, coroutine_wrapper)
+
+  return bind
+
+
 class RetryLogger(Protocol):
   def __call__(
     self,
@@ -105,11 +399,91 @@ def retry(
   jitter: RetryJitter | None = full_jitter,
   log: RetryLogger | None = default_retry_logger,
 ) -> Middleware:
+  """Retry calls failing with one of `exceptions` (default: any), with exponential backoff.
+
+  Retries stop early, re-raising the error, when the backoff would outlast the
+  context's deadline (see `Context.within`).
+
+  Async generators are retried until their first item; a `PaginatedResponse`
+  carries on from its last delivered page if it can `resume`, and otherwise is
+  also only retried until its first page.
+  """
   handled = exceptions or (Exception,)
 
+  def backoff(retries: int) -> float:
+    delay = base_delay * 2**retries
+    if max_delay is not None and delay > max_delay:
+      delay = max_delay
+    if jitter is not None:
+      cap = delay
+      delay = jitter(cap)
+      if not math.isfinite(delay) or not 0 <= delay <= cap:
+        raise ValueError(
+          f'Retry jitter returned {delay!r}; expected a finite delay between 0 and {cap}',
+        )
+    return delay
+
   def bind(fn: Fn, ctx: 'Context') -> Fn:
+    from .context import Context
+
+    async def wait(e: Exception, retries: int, args: tuple[Any, ...], kwargs: dict[str, Any]):
+      if max_retries is not None and retries > max_retries:
+        raise e
+      delay = backoff(retries)
+      # The call's deadline: chains are bound once, to the context without one.
+      current = Context.current()
+      remaining = current.remaining if current is not None else None
+      if remaining is not None and delay >= remaining:
+        raise e
+      if log is not None:
+        log(fn, ctx, args=args, kwargs=kwargs, exception=e, retries=retries, delay=delay)
+      await asyncio.sleep(delay)
+
+    async def pages(response: PaginatedResponse[Any], args: tuple[Any, ...], kwargs: dict[str, Any]):
+      retries = 0
+      started = False
+      while True:
+        try:
+          async for page in response:
+            started = True
+            retries = 0
+            yield page
+          return
+        except handled as e:
+          if started and response.resume is None:
+            raise
+          retries += 1
+          await wait(e, retries, args, kwargs)
+        response = response.resume() if response.resume is not None else fn(*args, **kwargs)
+
+    if inspect.isasyncgenfunction(fn):
+      @functools.wraps(fn)
+      async def asyncgen_wrapper(*args: Any, **kwargs: Any):
+        retries = 0
+        while True:
+          started = False
+          try:
+            async for item in fn(*args, **kwargs):
+              started = True
+              yield item
+            return
+          except handled as e:
+            if started:
+              raise
+            retries += 1
+            await wait(e, retries, args, kwargs)
+
+      return cast(Fn, asyncgen_wrapper)
+
     if not inspect.iscoroutinefunction(fn):
-      return fn
+      @functools.wraps(fn)
+      def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = fn(*args, **kwargs)
+        if isinstance(result, PaginatedResponse):
+          return PaginatedResponse(pages(result, args, kwargs))
+        return result
+
+      return cast(Fn, sync_wrapper)
 
     @functools.wraps(fn)
     async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -118,22 +492,8 @@ def retry(
         try:
           return await fn(*args, **kwargs)
         except handled as e:
-          if max_retries is not None and retries >= max_retries:
-            raise
           retries += 1
-          delay = base_delay * 2**retries
-          if max_delay is not None and delay > max_delay:
-            delay = max_delay
-          if jitter is not None:
-            cap = delay
-            delay = jitter(cap)
-            if not math.isfinite(delay) or not 0 <= delay <= cap:
-              raise ValueError(
-                f'Retry jitter returned {delay!r}; expected a finite delay between 0 and {cap}',
-              )
-          if log is not None:
-            log(fn, ctx, args=args, kwargs=kwargs, exception=e, retries=retries, delay=delay)
-          await asyncio.sleep(delay)
+          await wait(e, retries, args, kwargs)
 
     return cast(Fn, coroutine_wrapper)
 
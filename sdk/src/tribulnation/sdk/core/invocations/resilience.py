@@ -0,0 +1,123 @@
+from typing_extensions import Any, Callable, Generic, Iterator, Literal, TypeVar
+from dataclasses import dataclass, field
+import time
+import weakref
+
+from ..exc import NetworkError, RateLimited, DeadlineExceeded
+from .telemetry import Histogram
+
+CircuitState = Literal['closed', 'open', 'half-open']
+V = TypeVar('V')
+
+
+@dataclass
+class EndpointMap(Generic[V]):
+  """Values by endpoint: `Context.path` and venue object (`SDK.venue_identity`).
+
+  Venues are tracked by identity, so they need not be hashable. A venue's values are
+  dropped once the object is garbage collected, so a new object reusing its `id()`
+  starts afresh.
+  """
+  values: dict[int, dict[tuple[str, ...], V]] = field(default_factory=dict)
+  """Values by `id(venue)`, then path."""
+  pinned: dict[int, Any] = field(default_factory=dict)
+  """Venues that can't be weakly referenced (e.g. `None`), kept alive so their `id()` isn't reused."""
+
+  def get(self, path: tuple[str, ...], venue: Any, new: Callable[[], V]) -> V:
+    paths = self.values.get(id(venue))
+    if paths is None:
+      paths = self.values[id(venue)] = {}
+      try:
+        weakref.finalize(venue, self.values.pop, id(venue), None)
+      except TypeError:
+        self.pinned[id(venue)] = venue
+    value = paths.get(path)
+    if value is None:
+      value = paths[path] = new()
+    return value
+
+  def items(self) -> Iterator[tuple[tuple[tuple[str, ...], int], V]]:
+    for venue, paths in list(self.values.items()):
+      for path, value in list(paths.items()):
+        yield (path, venue), value
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+  """When a circuit opens, and for how long."""
+  failures: int = 5
+  """Consecutive failed (or slow) calls that open the circuit."""
+  cooldown: float = 30
+  """Seconds the circuit stays open before letting a single probe call through."""
+  slow: float | None = None
+  """Seconds past which a successful call still counts as a failure."""
+  errors: tuple[type[BaseException], ...] = (NetworkError, RateLimited, DeadlineExceeded)
+  """Exceptions counting as failures. Others (e.g. `BadRequest`) say nothing about the venue's health."""
+
+
+@dataclass
+class Circuit:
+  """Health of one endpoint: `closed` (calls pass), `open` (calls fail fast) or
+  `half-open` (one probe call decides whether to close again)."""
+  failures: int = 0
+  """Consecutive failures so far."""
+  opened: float | None = None
+  """`CircuitBreaker.clock()` when the circuit last opened."""
+  probing: bool = False
+
+  def state(self, policy: BreakerPolicy, now: float) -> CircuitState:
+    if self.opened is None:
+      return 'closed'
+    return 'open' if self.probing or now - self.opened < policy.cooldown else 'half-open'
+
+
+@dataclass
+class CircuitBreaker:
+  """Circuits of the `circuit_breaker` middleware, one per endpoint: `Context.path` and
+  venue (`SDK.venue_identity`), so every market of a venue shares its circuits.
+
+  ```python
+  breaker = CircuitBreaker(BreakerPolicy(failures=3, cooldown=10, slow=2))
+  ctx = Context().retried(NetworkError).guarded(breaker)
+  ```
+  """
+  policy: BreakerPolicy = field(default_factory=BreakerPolicy)
+  circuits: EndpointMap[Circuit] = field(default_factory=EndpointMap)
+  clock: Callable[[], float] = time.monotonic
+
+  def admit(self, path: tuple[str, ...], venue: Any) -> Circuit | None:
+    """The circuit of `(path, venue)` if a call may go through now, `None` to fail fast."""
+    circuit = self.circuits.get(path, venue, Circuit)
+    state = circuit.state(self.policy, self.clock())
+    if state == 'open':
+      return None
+    if state == 'half-open':
+      circuit.probing = True
+    return circuit
+
+  def record(self, circuit: Circuit, ok: bool):
+    if ok:
+      circuit.failures = 0
+      circuit.opened = None
+    else:
+      circuit.failures += 1
+      if circuit.opened is not None or circuit.failures >= self.policy.failures:
+        circuit.opened = self.clock()
+    circuit.probing = False
+
+  def release(self, circuit: Circuit):
+    """Forget an admitted call that ended without an outcome (e.g. cancelled)."""
+    circuit.probing = False
+
+  def states(self) -> dict[tuple[tuple[str, ...], int], CircuitState]:
+    """State of each circuit, by `(path, id(venue))`."""
+    now = self.clock()
+    return {key: c.state(self.policy, now) for key, c in self.circuits.items()}
+
+
+@dataclass
+class HedgeStats:
+  """Latency and hedging counts of one endpoint (`Context.path` and venue), for the `hedge` middleware."""
+  latency: Histogram = field(default_factory=Histogram)
+  calls: int = 0
+  hedges: int = 0
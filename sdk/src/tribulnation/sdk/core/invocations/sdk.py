@@ -1,14 +1,92 @@
-from typing_extensions import Any, AsyncContextManager, Callable, Iterable, ParamSpec, TypeVar, overload
+from typing_extensions import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Iterable, ParamSpec, TypeVar, overload
+from contextlib import aclosing
+from contextvars import ContextVar
+import asyncio
 import functools
 import inspect
+import sys
+import time
 
 from .context import Context
+from ..exc import DeadlineExceeded
 from ..lifecycle import resource_state
+from ..paging import PaginatedResponse
 
 T = TypeVar('T', covariant=True)
 Ps = ParamSpec('Ps')
 Fn = TypeVar('Fn', bound=Callable[..., Any])
 
+_enforced_deadline: ContextVar[float | None] = ContextVar('sdk_enforced_deadline', default=None)
+
+
+async def _within_deadline(ctx: Context, deadline: float, call: Callable[[], Awaitable[Any]]) -> Any:
+  """Run `call`, cancelling it at `deadline`.
+
+  Only the outermost call under a deadline sets the timer; nested calls under the
+  same deadline run inside it.
+  """
+  if _enforced_deadline.get() == deadline:
+    return await call()
+  token = _enforced_deadline.set(deadline)
+  try:
+    return await asyncio.wait_for(call(), deadline - time.monotonic())
+  except asyncio.TimeoutError as e:
+    if time.monotonic() < deadline:
+      raise
+    raise DeadlineExceeded(f'{".".join(ctx.path)} ran out of its time budget') from e
+  finally:
+    _enforced_deadline.reset(token)
+
+
+_DONE = object()
+
+
+async def _next_within_deadline(ctx: Context, deadline: float, items: AsyncIterator[Any]) -> Any:
+  """The next item of `items` (`_DONE` once exhausted), cancelling the step at `deadline`.
+
+  The step runs in the consumer's task, cancelled by a timer, rather than in a task
+  of its own as `_within_deadline` does: a generator's steps must share one task
+  (and `contextvars` context), or spans opened in one step can't close in the next.
+  """
+  if _enforced_deadline.get() == deadline:
+    return await anext(items, _DONE)
+  task = asyncio.current_task()
+  assert task is not None
+  expired = False
+
+  def expire():
+    nonlocal expired
+    expired = True
+    task.cancel()
+
+  handle = asyncio.get_running_loop().call_later(deadline - time.monotonic(), expire)
+  token = _enforced_deadline.set(deadline)
+  try:
+    return await anext(items, _DONE)
+  except asyncio.CancelledError as e:
+    if not expired:
+      raise
+    if sys.version_info >= (3, 11):
+      task.uncancel()
+    raise DeadlineExceeded(f'{".".join(ctx.path)} ran out of its time budget') from e
+  finally:
+    handle.cancel()
+    _enforced_deadline.reset(token)
+
+
+def _paginated_within_deadline(ctx: Context, deadline: float, response: PaginatedResponse[Any]) -> PaginatedResponse[Any]:
+  """`response` with every page fetched by `deadline`, as is its `resume`."""
+  async def pages():
+    items = aiter(response)
+    while (page := await _next_within_deadline(ctx, deadline, items)) is not _DONE:
+      yield page
+
+  resume = response.resume
+  return PaginatedResponse(
+    pages(), resume=None if resume is None else lambda: _paginated_within_deadline(ctx, deadline, resume()),
+  )
+
+
 class Method:
   def __init__(self, name: str):
     self.name = name
@@ -26,28 +104,31 @@ def _decorate_method(
 
   def prepare():
     parent = Context.current()
-    active = parent and parent.child(name)
-    invoke = fn
-
-    if active is None:
-      return None, invoke
-
-    for middleware in reversed(active.middleware):
-      invoke = middleware(invoke, active)
-    return active, invoke
+    if parent is None:
+      return None, fn
+    active = parent.child(name)
+    return active, active.bind(fn)
 
   if inspect.isasyncgenfunction(fn):
     @functools.wraps(fn)
     async def asyncgen_wrapper(*args, **kwargs):
+      # `aclosing`: a consumer closing the wrapper closes `fn`'s generator now, not at GC.
       active, invoke = prepare()
       if active is None:
-        async for item in invoke(*args, **kwargs):
-          yield item
+        async with aclosing(invoke(*args, **kwargs)) as items:
+          async for item in items:
+            yield item
         return
       token = Context.set_current(active)
       try:
-        async for item in invoke(*args, **kwargs):
-          yield item
+        async with aclosing(invoke(*args, **kwargs)) as items:
+          if active.deadline is None:
+            async for item in items:
+              yield item
+          else:
+            # The budget spans the whole iteration; each step is cancelled once it runs out.
+            while (item := await _next_within_deadline(active, active.deadline, items)) is not _DONE:
+              yield item
       finally:
         Context.reset_current(token)
 
@@ -61,7 +142,9 @@ def _decorate_method(
         return await invoke(*args, **kwargs)
       token = Context.set_current(active)
       try:
-        return await invoke(*args, **kwargs)
+        if active.deadline is None:
+          return await invoke(*args, **kwargs)
+        return await _within_deadline(active, active.deadline, lambda: invoke(*args, **kwargs))
       finally:
         Context.reset_current(token)
 
@@ -75,9 +158,12 @@ def _decorate_method(
         return invoke(*args, **kwargs)
       token = Context.set_current(active)
       try:
-        return invoke(*args, **kwargs)
+        result = invoke(*args, **kwargs)
       finally:
         Context.reset_current(token)
+      if active.deadline is not None and isinstance(result, PaginatedResponse):
+        return _paginated_within_deadline(active, active.deadline, result)
+      return result
 
     wrapper = sync_wrapper
 
@@ -120,6 +206,15 @@ class SDK:
     """
     return ()
 
+  def venue_identity(self) -> object:
+    """The object standing for the venue connection this object talks through.
+
+    Endpoint state of the `circuit_breaker` and `hedge` middleware is kept per venue
+    identity, so every market of one venue shares it. Defaults to the object itself;
+    implementations whose objects share a client return that shared state.
+    """
+    return self
+
   @_decorate_method
   async def __aenter__(self):
     await resource_state(self).enter(self.resources())
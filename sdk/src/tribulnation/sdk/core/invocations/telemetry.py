@@ -0,0 +1,113 @@
+from typing_extensions import Any
+from dataclasses import dataclass, field
+from bisect import bisect_left
+
+LATENCY_BUCKETS: tuple[float, ...] = (
+  0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+)
+"""Default histogram bucket upper bounds, in seconds (plus an implicit `+inf`)."""
+
+
+@dataclass
+class Histogram:
+  """Counts of observations per bucket, with their sum and max."""
+  bounds: tuple[float, ...] = LATENCY_BUCKETS
+  """Bucket upper bounds, ascending. Observations above the last one go to a final `+inf` bucket."""
+  counts: list[int] = field(init=False)
+  count: int = field(init=False, default=0)
+  sum: float = field(init=False, default=0)
+  max: float = field(init=False, default=0)
+
+  def __post_init__(self):
+    self.counts = [0] * (len(self.bounds) + 1)
+
+  def observe(self, value: float):
+    self.counts[bisect_left(self.bounds, value)] += 1
+    self.count += 1
+    self.sum += value
+    if value > self.max:
+      self.max = value
+
+  @property
+  def mean(self) -> float | None:
+    return self.sum / self.count if self.count else None
+
+  def quantile(self, q: float) -> float | None:
+    """Upper bound of the bucket holding the `q`-quantile (`inf` past the last bound)."""
+    if not self.count:
+      return None
+    rank = q * self.count
+    seen = 0
+    for bound, n in zip(self.bounds + (float('inf'),), self.counts):
+      seen += n
+      if seen >= rank:
+        return bound
+    return float('inf')
+
+  def dump(self) -> dict[str, Any]:
+    return {
+      'count': self.count, 'sum': self.sum, 'max': self.max,
+      'buckets': dict(zip([*map(str, self.bounds), '+inf'], self.counts)),
+    }
+
+
+@dataclass
+class MethodMetrics:
+  """Metrics of one `Context.path`."""
+  calls: int = 0
+  errors: dict[str, int] = field(default_factory=dict)
+  """Failed calls by exception type name."""
+  latency: Histogram = field(default_factory=Histogram)
+  """Seconds per call; for async generators, until exhausted or closed."""
+  first_item: Histogram = field(default_factory=Histogram)
+  """Seconds to an async generator's first item."""
+  items: int = 0
+  """Items yielded by async generators."""
+
+  def error(self, exc: BaseException):
+    name = type(exc).__name__
+    self.errors[name] = self.errors.get(name, 0) + 1
+
+  def dump(self) -> dict[str, Any]:
+    out: dict[str, Any] = {'calls': self.calls, 'errors': dict(self.errors), 'latency': self.latency.dump()}
+    if self.first_item.count:
+      out['first_item'] = self.first_item.dump()
+      out['items'] = self.items
+    return out
+
+
+@dataclass
+class MetricsRegistry:
+  """In-process store of `MethodMetrics` by `Context.path`, filled by the `metrics` middleware.
+
+  ```python
+  ctx = Context().measured()
+  ...
+  for path, m in registry.slowest(5):
+    print(path, m.latency.mean)
+  ```
+  """
+  methods: dict[tuple[str, ...], MethodMetrics] = field(default_factory=dict)
+
+  def get(self, path: tuple[str, ...]) -> MethodMetrics:
+    """Metrics of `path`, created empty on first use."""
+    metrics = self.methods.get(path)
+    if metrics is None:
+      metrics = self.methods[path] = MethodMetrics()
+    return metrics
+
+  def slowest(self, n: int = 10) -> list[tuple[str, MethodMetrics]]:
+    """The `n` paths with the highest mean latency."""
+    ranked = sorted(self.methods.items(), key=lambda kv: kv[1].latency.mean or 0, reverse=True)
+    return [('.'.join(path), m) for path, m in ranked[:n]]
+
+  def dump(self) -> dict[str, dict[str, Any]]:
+    """A JSON-serializable snapshot, keyed by dotted path."""
+    return {'.'.join(path): m.dump() for path, m in self.methods.items()}
+
+  def reset(self):
+    self.methods.clear()
+
+
+registry = MetricsRegistry()
+"""The default registry of `metrics()` / `Context.measured()`."""
@@ -9,9 +9,14 @@ SDK subclass -- which is exactly what used to force venue mixins into a single f
 State therefore lives in `__dict__`, written directly so frozen instances can own it.
 """
 
-from typing_extensions import Any, AsyncContextManager, Iterable
-from dataclasses import dataclass
-from contextlib import AsyncExitStack
+from typing_extensions import Any, AsyncContextManager, AsyncIterator, Callable, Generic, Hashable, Iterable, TypeVar
+from dataclasses import dataclass, field
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from .concurrency import SingleFlight
+
+K = TypeVar('K', bound=Hashable)
+R = TypeVar('R', bound=AsyncContextManager[Any])
 
 
 @dataclass
@@ -67,3 +72,54 @@ def resource_state(obj: object) -> AsyncResourceState:
     state = obj.__dict__['_resource_state'] = AsyncResourceState()
   return state
 
+
+@dataclass
+class ResourcePool(Generic[K, R]):
+  """Resources by key, created on first use and shared by every later caller.
+
+  Concurrent first uses of a key build one resource. An owner yields `active()`
+  from its `resources()`: while it is entered, resources are entered as they are
+  created, and on exit they are exited and the pool emptied, since a closed client
+  cannot be reused. Outside `active()` nothing is pooled: `get` returns a new
+  resource the caller owns, as nothing would ever close a pooled one.
+
+  ```python
+  def resources(self):
+    yield self.clients.active()
+
+  async def client(self, id: str):
+    return await self.clients.get(id, lambda: Client.new(id))
+  ```
+  """
+  members: dict[K, R] = field(default_factory=dict)
+  flights: SingleFlight = field(default_factory=SingleFlight)
+  stack: AsyncExitStack | None = None
+
+  async def get(self, key: K, create: Callable[[], R]) -> R:
+    """The resource for `key`, from `create()` if there is none yet (or if the pool is not active)."""
+    if self.stack is None:
+      return create()
+    member = self.members.get(key)
+    if member is None:
+      member = await self.flights.run(key, lambda: self.add(key, create))
+    return member
+
+  async def add(self, key: K, create: Callable[[], R]) -> R:
+    if self.stack is None:
+      return create()  # the pool was closed while this flight waited
+    member = create()
+    await self.stack.enter_async_context(member)
+    self.members[key] = member
+    return member
+
+  @asynccontextmanager
+  async def active(self) -> AsyncIterator['ResourcePool[K, R]']:
+    if self.stack is not None:
+      raise RuntimeError('Resource pool is already active')
+    async with AsyncExitStack() as stack:
+      self.stack = stack
+      try:
+        yield self
+      finally:
+        self.stack = None
+        self.members.clear()
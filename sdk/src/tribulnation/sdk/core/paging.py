@@ -1,14 +1,18 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing_extensions import AsyncIterable, Sequence, TypeVar, Generic, Awaitable, Callable, ParamSpec
 from functools import wraps
 
 T = TypeVar('T')
 U = TypeVar('U')
+C = TypeVar('C')
 P = ParamSpec('P')
 
 @dataclass
 class PaginatedResponse(AsyncIterable[Sequence[T]], Awaitable[Sequence[T]], Generic[T]):
   stream: AsyncIterable[Sequence[T]]
+  resume: 'Callable[[], PaginatedResponse[T]] | None' = None
+  """The rest of the response after the pages consumed so far, if the source can
+  pick up where it failed (see `cursored` and `checkpointed`). Used by `retry`."""
 
   async def flatten(self) -> AsyncIterable[T]:
     async for page in self.stream:
@@ -32,4 +36,70 @@ class PaginatedResponse(AsyncIterable[Sequence[T]], Awaitable[Sequence[T]], Gene
     @wraps(fn)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> PaginatedResponse[U]:
       return cls(fn(*args, **kwargs)) # type: ignore
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+  @classmethod
+  def cursored(
+    cls, fetch: Callable[[C], Awaitable[tuple[Sequence[U], C | None]]], cursor: C,
+  ) -> 'PaginatedResponse[U]':
+    """Pages from `page, cursor = await fetch(cursor)` until the cursor is `None`.
+
+    Resumes from the cursor of the first page not yet delivered.
+    """
+    return CursorPages(fetch, cursor).response()
+
+  @classmethod
+  def checkpointed(
+    cls, fetch: Callable[[C], AsyncIterable[Sequence[U]]], start: C, checkpoint: Callable[[U], C],
+  ) -> 'PaginatedResponse[U]':
+    """Pages from `fetch(start)`, resumable from the `checkpoint` (e.g. time) of the last item delivered.
+
+    `fetch(checkpoint)` must list items from that checkpoint on, inclusive; those
+    already delivered are dropped on resume. Suits time-ranged history endpoints:
+
+    ```python
+    PaginatedResponse.checkpointed(lambda t: fills(start=t, end=end), start, lambda trade: trade.time)
+    ```
+    """
+    return CheckpointPages(fetch, start, checkpoint).response()
+
+
+@dataclass
+class CursorPages(Generic[C, T]):
+  fetch: Callable[[C], Awaitable[tuple[Sequence[T], C | None]]]
+  cursor: C | None
+
+  async def pages(self):
+    while self.cursor is not None:
+      page, self.cursor = await self.fetch(self.cursor)
+      if page:
+        yield page
+
+  def response(self) -> PaginatedResponse[T]:
+    return PaginatedResponse(self.pages(), resume=self.response)
+
+
+@dataclass
+class CheckpointPages(Generic[C, T]):
+  fetch: Callable[[C], AsyncIterable[Sequence[T]]]
+  cursor: C
+  checkpoint: Callable[[T], C]
+  seen: list[T] = field(default_factory=list)
+  """Items delivered at `cursor`, which a resumed fetch lists again."""
+
+  async def pages(self):
+    skip = list(self.seen)
+    async for page in self.fetch(self.cursor):
+      if skip:
+        page = [x for x in page if x not in skip]
+      if not page:
+        continue
+      last = self.checkpoint(page[-1])
+      if last != self.cursor:
+        self.cursor = last
+        self.seen = []
+      self.seen.extend(x for x in page if self.checkpoint(x) == last)
+      yield page
+
+  def response(self) -> PaginatedResponse[T]:
+    return PaginatedResponse(self.pages(), resume=self.response)
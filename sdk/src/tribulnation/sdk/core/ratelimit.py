@@ -0,0 +1,89 @@
+"""Weighted token-bucket rate limiting, shared by every client of one venue."""
+
+from typing_extensions import Any, Callable, ClassVar
+from dataclasses import dataclass, field
+import asyncio
+import time
+
+
+@dataclass(frozen=True)
+class Weight:
+  """What one call to an endpoint costs."""
+  request: float = 1
+  """Charged before the request is sent."""
+  response: Callable[[Any], float] | None = None
+  """Extra weight charged once the response is in, from the response (e.g. per N items)."""
+
+
+@dataclass(eq=False)
+class RateLimiter:
+  """A token bucket: `capacity` weight, refilled in full every `per` seconds.
+
+  Callers reserve weight on arrival and wait until the bucket has refilled to
+  cover it, so concurrent callers are served in arrival order at the maximum
+  sustained rate, without a lock. Weight charged after a response (`charge`)
+  puts the bucket into debt, delaying later callers instead of failing them.
+
+  ```python
+  limiter = RateLimiter.shared('hyperliquid', capacity=1200, per=60)
+  await limiter.acquire(20)
+  response = await fetch()
+  limiter.charge(len(response) // 20)
+  ```
+  """
+  capacity: float
+  per: float
+  tokens: float = field(init=False)
+  updated: float = field(init=False, default_factory=time.monotonic)
+
+  registry: ClassVar[dict[str, 'RateLimiter']] = {}
+
+  def __post_init__(self):
+    if self.capacity <= 0 or self.per <= 0:
+      raise ValueError('capacity and per must be positive')
+    self.tokens = self.capacity
+
+  @classmethod
+  def shared(cls, name: str, *, capacity: float, per: float) -> 'RateLimiter':
+    """The process-wide limiter called `name`, created on first use.
+
+    Share one per venue rate limit (e.g. per IP), so every SDK object talking to
+    that venue draws from the same budget.
+    """
+    limiter = cls.registry.get(name)
+    if limiter is None:
+      limiter = cls.registry[name] = cls(capacity, per)
+    return limiter
+
+  @property
+  def rate(self) -> float:
+    """Weight refilled per second."""
+    return self.capacity / self.per
+
+  def refill(self):
+    now = time.monotonic()
+    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+    self.updated = now
+
+  def charge(self, weight: float):
+    """Charge `weight` without waiting (e.g. weight known only from a response)."""
+    self.refill()
+    self.tokens -= weight
+
+  def refund(self, weight: float):
+    """Give back `weight` reserved for a request that was never sent."""
+    self.refill()
+    self.tokens = min(self.capacity, self.tokens + weight)
+
+  async def acquire(self, weight: float = 1):
+    """Reserve `weight`, waiting until the bucket covers it.
+
+    A caller cancelled while waiting gets its reservation back.
+    """
+    self.charge(weight)
+    if self.tokens < 0:
+      try:
+        await asyncio.sleep(-self.tokens / self.rate)
+      except asyncio.CancelledError:
+        self.refund(weight)
+        raise
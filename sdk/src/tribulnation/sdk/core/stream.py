@@ -1,17 +1,19 @@
 from typing_extensions import (
-  AsyncIterable, AsyncIterator, AsyncGenerator, Awaitable,
-  Generic, Literal, TypeVar, Callable
+  Any, AsyncContextManager, AsyncIterable, AsyncIterator, AsyncGenerator, Awaitable,
+  Generic, Hashable, Literal, Sequence, TypeVar, Callable, overload
 )
 from contextlib import asynccontextmanager, suppress
 from dataclasses import dataclass, field
+from collections import deque
 import asyncio
+import time
 
 from .exc import NetworkError
 
 T = TypeVar('T')
 U = TypeVar('U')
 
-OverflowPolicy = Literal['fail', 'latest']
+OverflowPolicy = Literal['fail', 'latest', 'conflate']
 """What a `StreamInbox` does when it can't keep up with its producer.
 
 - `fail`: the inbox is failed loudly (a `NetworkError` is raised on its
@@ -21,6 +23,12 @@ OverflowPolicy = Literal['fail', 'latest']
   dropped to make room for the newest. Intended for state streams (order book /
   depth / ticker) where an old snapshot is worthless once a newer one exists --
   use `queue_size=1` and each new item simply replaces the stale one.
+- `conflate`: keeps the newest item per `key` (e.g. per order id or coin). A
+  full inbox overwrites the queued item with the incoming item's key, in place;
+  an item with a new key is still queued. Intended for per-entity state streams
+  (orders / positions), where a stale state of one entity is worthless but
+  another entity's update must not be lost. The buffer holds at most
+  `queue_size` items plus one per live key.
 """
 
 @dataclass
@@ -32,6 +40,57 @@ class _Failed:
   """Sentinel marking an errored end of stream (`StreamInbox.fail`)."""
   exc: Exception
 
+@dataclass
+class _Deferred(Generic[T]):
+  """A data item built only when dequeued: `view(item)` (see `Subscription.subscribe`)."""
+  view: Callable[[Any], T]
+  item: Any
+
+  def build(self) -> T:
+    return self.view(self.item)
+
+@dataclass
+class _Keyed(Generic[T]):
+  """A queued data item of a `conflate` inbox, overwritten in place by newer items with its `key`."""
+  key: Hashable
+  item: T
+
+@dataclass
+class InboxStats:
+  """Live delivery counters of one `StreamInbox` (one subscriber)."""
+  pushed: int = 0
+  """Data items offered while open, including ones later dropped."""
+  dropped: int = 0
+  """Items discarded unread: displaced under `latest`, overwritten under `conflate`."""
+  high_water: int = 0
+  """Most data items ever buffered at once. Compare with `queue_size`."""
+  dequeued: int = 0
+  """Data items taken by the consumer."""
+  latency_total: float = 0
+  """Seconds from upstream receipt to consumer dequeue, summed over `dequeued`."""
+  latency_max: float = 0
+  """Longest single wait from upstream receipt to consumer dequeue, in seconds."""
+
+  @property
+  def latency_mean(self) -> float | None:
+    return self.latency_total / self.dequeued if self.dequeued else None
+
+@dataclass
+class PumpStats:
+  """Live counters of a `Subscription`'s upstream pump."""
+  items: int = 0
+  """Upstream items read."""
+  batches: int = 0
+  """Fan-out iterations (one per item, or per ready batch when `batched`)."""
+  iteration_total: float = 0
+  """Seconds spent fanning batches out to every subscriber, summed over `batches`."""
+  iteration_max: float = 0
+  """Longest single fan-out of a batch, in seconds."""
+
+  @property
+  def iteration_mean(self) -> float | None:
+    return self.iteration_total / self.batches if self.batches else None
+
 @dataclass
 class StreamInbox(Generic[T]):
   """A bounded, closeable async inbox: push items in, iterate them out.
@@ -51,36 +110,76 @@ class StreamInbox(Generic[T]):
   stream therefore never has to drop buffered data to make room (which would
   violate the "no silent drops" guarantee of the `fail` policy).
   """
-  queue: asyncio.Queue['T | _Failed | _Closed']
+  queue: asyncio.Queue['T | _Deferred[T] | _Keyed[T] | _Failed | _Closed']
   queue_size: int
   overflow: OverflowPolicy
+  view: Callable[[Any], T] | None = None
+  """Maps upstream items to this inbox's items. Applied by the owning `Subscription`."""
+  key: Callable[[T], Hashable] | None = None
+  """Conflation key of this inbox's items (`conflate` policy only)."""
+  keyed: dict[Hashable, _Keyed[T]] = field(init=False, default_factory=dict)
+  """Newest queued item per key (`conflate` policy only)."""
+  stats: InboxStats = field(init=False, default_factory=InboxStats)
+  received: deque[float] = field(init=False, default_factory=deque)
+  """Upstream receipt times (`time.monotonic`) of the buffered data items, oldest first."""
   _closed: bool = field(init=False, default=False)
   _end: '_Closed | _Failed | None' = field(init=False, default=None)
 
   @classmethod
-  def new(cls, queue_size: int = 1000, overflow: OverflowPolicy = 'fail') -> 'StreamInbox[T]':
+  def new(
+    cls, queue_size: int = 1000, overflow: OverflowPolicy = 'fail', *,
+    view: Callable[[Any], T] | None = None, key: Callable[[T], Hashable] | None = None,
+  ) -> 'StreamInbox[T]':
     if queue_size < 1:
       raise ValueError('queue_size must be >= 1')
+    if (overflow == 'conflate') != (key is not None):
+      raise ValueError('a key is required with (and only with) the conflate overflow policy')
+    if overflow == 'conflate':
+      # Bounded by the live keys rather than `maxsize`.
+      return cls(asyncio.Queue(), queue_size, overflow, view, key)
     # +1 slot reserved for the terminal marker (see class docstring).
-    return cls(asyncio.Queue(maxsize=queue_size + 1), queue_size, overflow)
+    return cls(asyncio.Queue(maxsize=queue_size + 1), queue_size, overflow, view)
+
+  @property
+  def deferred(self) -> bool:
+    """Whether a viewed item is built on dequeue rather than on push.
+
+    Only a `latest` inbox holding a single item qualifies: whatever it holds is
+    always the newest upstream item, so building its view late never exposes an
+    older state than the one pushed.
+    """
+    return self.view is not None and self.overflow == 'latest' and self.queue_size == 1
+
+  @property
+  def depth(self) -> int:
+    """Data items currently buffered."""
+    return len(self.received)
 
   @property
   def closed(self) -> bool:
     """Whether the inbox has been closed or failed (no more items accepted)."""
     return self._closed
 
-  def push(self, item: 'T') -> bool:
+  def push(self, item: 'T | _Deferred[T]', received: float | None = None) -> bool:
     """Offer a data `item`, applying the overflow policy when the buffer is full.
 
+    `received` is when the item arrived upstream (`time.monotonic()`; default:
+    now), for the `stats` latency.
+
     Returns `False` if the inbox is closed and cannot accept the item: either it
     was already closed/failed, or a `fail`-policy inbox just overflowed (in which
     case it has been failed and will accept nothing further).
     """
     if self._closed:
       return False
-    q = self.queue
-    if q.qsize() < self.queue_size:
-      q.put_nowait(item)
+    if received is None:
+      received = time.monotonic()
+    self.stats.pushed += 1
+    if self.overflow == 'conflate':
+      self._conflate(item, received) # type: ignore
+      return True
+    if len(self.received) < self.queue_size:
+      self._put(item, received)
       return True
     # Data buffer full; the reserved slot is still free.
     if self.overflow == 'fail':
@@ -88,10 +187,83 @@ class StreamInbox(Generic[T]):
       return False
     # latest: drop the oldest queued item to make room for the newest. At the
     # intended queue_size=1 this is simply "newest replaces stale".
-    q.get_nowait()
-    q.put_nowait(item)
+    self._drop()
+    self._put(item, received)
     return True
 
+  def push_batch(self, items: 'Sequence[T | _Deferred[T]]', received: float | None = None) -> bool:
+    """Offer several data items, oldest first, applying the overflow policy once.
+
+    Equivalent to pushing each item in turn (same return value and `stats`), but
+    a `latest` inbox only enqueues the newest `queue_size` items: the older ones
+    would be dropped straight away. Every item counts as `pushed`, including those
+    a `fail` inbox refuses once it overflows, as the whole batch was offered at once.
+    """
+    if self._closed:
+      return False
+    if received is None:
+      received = time.monotonic()
+    if self.overflow == 'conflate':
+      self.stats.pushed += len(items)
+      for item in items:
+        self._conflate(item, received) # type: ignore
+      return True
+    if self.overflow == 'latest':
+      self.stats.pushed += len(items)
+      self.stats.dropped += max(0, len(items) - self.queue_size)
+      items = items[-self.queue_size:]
+      for _ in range(len(self.received) + len(items) - self.queue_size):
+        self._drop()
+      for item in items:
+        self._put(item, received)
+      return True
+    room = self.queue_size - len(self.received)
+    self.stats.pushed += len(items)
+    for item in items[:room]:
+      self._put(item, received)
+    if len(items) > room:
+      self.fail(NetworkError('stream subscriber fell behind'))
+      return False
+    return True
+
+  def _put(self, item: 'T | _Deferred[T] | _Keyed[T]', received: float):
+    self.queue.put_nowait(item)
+    self.received.append(received)
+    if len(self.received) > self.stats.high_water:
+      self.stats.high_water = len(self.received)
+
+  def _drop(self):
+    """Discard the oldest buffered data item."""
+    self.queue.get_nowait()
+    self.received.popleft()
+    self.stats.dropped += 1
+
+  def _conflate(self, item: T, received: float):
+    key = self.key(item) # type: ignore
+    queued = self.keyed.get(key)
+    if queued is not None and len(self.received) >= self.queue_size:
+      # Keeps the queue position (and receipt time) of the item it overwrites.
+      queued.item = item
+      self.stats.dropped += 1
+    else:
+      self.keyed[key] = queued = _Keyed(key, item)
+      self._put(queued, received)
+
+  def _value(self, item: 'T | _Deferred[T] | _Keyed[T]') -> T:
+    """The data item a dequeued queue entry stands for."""
+    latency = time.monotonic() - self.received.popleft()
+    self.stats.dequeued += 1
+    self.stats.latency_total += latency
+    if latency > self.stats.latency_max:
+      self.stats.latency_max = latency
+    if isinstance(item, _Deferred):
+      return item.build()
+    if isinstance(item, _Keyed):
+      if self.keyed.get(item.key) is item:
+        del self.keyed[item.key]
+      return item.item
+    return item
+
   def close(self):
     """Signal a clean end of stream; the iterator stops after buffered items."""
     self._terminate(_Closed())
@@ -115,7 +287,7 @@ class StreamInbox(Generic[T]):
     if self._end is None:
       item = await self.queue.get()
       if not isinstance(item, (_Closed, _Failed)):
-        return item
+        return self._value(item)
       # Latch the terminal so re-iterating keeps raising rather than hanging on
       # a now-empty queue.
       self._end = item
@@ -123,6 +295,78 @@ class StreamInbox(Generic[T]):
       raise self._end.exc
     raise StopAsyncIteration
 
+  async def batches(self, max_items: int | None = None, max_wait: float = 0) -> AsyncIterator[list[T]]:
+    """Iterate items in lists of everything buffered, one wakeup per list.
+
+    ```python
+    async for trades in inbox.batches(max_items=500):
+      ...
+    ```
+
+    - `max_items`: cap on a list's length (`None`: no cap).
+    - `max_wait`: seconds to keep collecting after the first item, while the
+      list is short of `max_items` (`0`: only what is already buffered).
+
+    Ends like iterating the inbox: items buffered before a `close`/`fail` are
+    yielded first, then the iteration stops (or raises the failure).
+    """
+    if max_items is not None and max_items < 1:
+      raise ValueError('max_items must be >= 1')
+    q = self.queue
+    loop = asyncio.get_running_loop()
+    while self._end is None:
+      batch: list[T] = []
+      item = await q.get()
+      deadline = loop.time() + max_wait
+      while True:
+        if isinstance(item, (_Closed, _Failed)):
+          self._end = item
+          break
+        batch.append(self._value(item))
+        if max_items is not None and len(batch) >= max_items:
+          break
+        if not q.empty():
+          item = q.get_nowait()
+          continue
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+          break
+        try:
+          item = await asyncio.wait_for(q.get(), remaining)
+        except asyncio.TimeoutError:
+          break
+      if batch:
+        yield batch
+    if isinstance(self._end, _Failed):
+      raise self._end.exc
+
+async def ready_batches(iterator: AsyncIterator[T]) -> AsyncIterator[list[T]]:
+  """Group `iterator`'s items into batches: the next item, plus every further
+  item the iterator produces without having to wait.
+
+  The iterator is read ahead of the consumer, so it must yield independent items
+  (not one object mutated in place).
+  """
+  pending = asyncio.ensure_future(anext(iterator))
+  try:
+    while True:
+      try:
+        batch = [await pending]
+      except StopAsyncIteration:
+        return
+      while True:
+        pending = asyncio.ensure_future(anext(iterator))
+        # One loop turn: enough for `pending` to finish if an item is ready.
+        await asyncio.sleep(0)
+        if not pending.done() or pending.exception() is not None:
+          break
+        batch.append(pending.result())
+      yield batch
+  finally:
+    if not pending.done():
+      pending.cancel()
+      await asyncio.wait([pending])
+
 @dataclass
 class Subscription(Generic[T]):
   """Fan out a stream to multiple subscribers.
@@ -140,6 +384,18 @@ class Subscription(Generic[T]):
 
   Each subscriber's inbox is bounded (see `StreamInbox` / `OverflowPolicy`): a
   slow or dead consumer can never accumulate unbounded depth/trade backlog.
+
+  Subscribers may also ask for a `view` of each upstream item (e.g. an
+  independent copy of a book the upstream keeps mutating). Each distinct view is
+  built at most once per item and shared by every subscriber asking for it. A
+  `join` view of the latest upstream item is delivered first to subscribers
+  joining a running stream (e.g. the book a diff stream's first diff applies to).
+
+  With `batched`, the pump drains every item the upstream has ready (see
+  `ready_batches`) and hands each inbox the whole batch in one `push_batch`, so
+  bursts cost one delivery per subscriber rather than one per item. It reads the
+  upstream ahead of delivery, so it is only for upstreams of independent items
+  (trades, account messages), never for one live object mutated in place.
   """
   @dataclass
   class Context(Generic[U]):
@@ -147,32 +403,79 @@ class Subscription(Generic[T]):
     unsubscribe: Callable[[], Awaitable]
 
   subscribe_stream: Callable[[], Awaitable[Context[T]]]
+  batched: bool = False
 
   lock: asyncio.Lock = field(init=False, default_factory=asyncio.Lock)
   ctx: Context[T] | None = field(init=False, default=None)
   pump: 'asyncio.Task[None] | None' = field(init=False, default=None)
-  subscribers: list[StreamInbox[T]] = field(init=False, default_factory=list)
+  subscribers: list[StreamInbox[Any]] = field(init=False, default_factory=list)
+  latest: T | None = field(init=False, default=None)
+  """The last item read from the running upstream (`None` before the first)."""
+  stats: PumpStats = field(init=False, default_factory=PumpStats)
+  """Upstream counters, across restarts. Per-subscriber ones are each inbox's `stats`."""
 
   @classmethod
   def of(
-    cls, subscribe: Callable[[], Awaitable[tuple[AsyncIterable[T], Callable[[], Awaitable]]]]
+    cls, subscribe: Callable[[], Awaitable[tuple[AsyncIterable[T], Callable[[], Awaitable]]]],
+    *, batched: bool = False,
   ) -> 'Subscription[T]':
     """Build a `Subscription` from a callback returning `(iterable, unsubscribe)`."""
     async def subscribe_stream():
       iterable, unsubscribe = await subscribe()
       return cls.Context(aiter(iterable), unsubscribe)
-    return cls(subscribe_stream)
+    return cls(subscribe_stream, batched)
 
   async def start(self):
     async with self.lock:
       if self.pump is None or self.pump.done():
         self.ctx = await self.subscribe_stream()
+        self.latest = None
         self.pump = asyncio.create_task(self._pump(self.ctx))
 
-  def _discard(self, inbox: StreamInbox[T]):
+  def _discard(self, inbox: StreamInbox[Any]):
     with suppress(ValueError):
       self.subscribers.remove(inbox)
 
+  def _deliver(self, batch: list[T], received: float):
+    """Push `batch` to every subscriber in one call, building each distinct view
+    at most once per item."""
+    built: dict[Hashable, dict[int, Any]] = {}
+    deferred: dict[Hashable, _Deferred] = {}
+    for inbox in list(self.subscribers):
+      view = inbox.view
+      # A `latest` inbox keeps only the newest `queue_size` items: skip the rest.
+      start = max(0, len(batch) - inbox.queue_size) if inbox.overflow == 'latest' else 0
+      if start and not inbox.closed:
+        inbox.stats.pushed += start
+        inbox.stats.dropped += start
+      if view is None:
+        values = batch[start:]
+      elif inbox.deferred:
+        if view not in deferred:
+          deferred[view] = _Deferred(view, batch[-1])
+        values = [deferred[view]]
+      else:
+        cache = built.setdefault(view, {})
+        values = []
+        for i in range(start, len(batch)):
+          if i not in cache:
+            cache[i] = view(batch[i])
+          values.append(cache[i])
+      if not inbox.push_batch(values, received):
+        # `fail` overflow: the inbox failed itself; stop delivering to it.
+        self._discard(inbox)
+
+  def _fan_out(self, batch: list[T]):
+    received = time.monotonic()
+    self.latest = batch[-1]
+    self._deliver(batch, received)
+    elapsed = time.monotonic() - received
+    self.stats.items += len(batch)
+    self.stats.batches += 1
+    self.stats.iteration_total += elapsed
+    if elapsed > self.stats.iteration_max:
+      self.stats.iteration_max = elapsed
+
   async def _pump(self, ctx: 'Subscription.Context[T]'):
     """Read `ctx.iterator` and fan out items to every subscriber.
 
@@ -189,11 +492,12 @@ class Subscription(Generic[T]):
     canceller in `subscribe()` owns the teardown instead.
     """
     try:
-      async for item in ctx.iterator:
-        for inbox in list(self.subscribers):
-          if not inbox.push(item):
-            # `fail` overflow: the inbox failed itself; stop delivering to it.
-            self._discard(inbox)
+      if self.batched:
+        async for batch in ready_batches(ctx.iterator):
+          self._fan_out(batch)
+      else:
+        async for item in ctx.iterator:
+          self._fan_out([item])
       # Ended on its own (e.g. a dropped connection) rather than being
       # cancelled below -- report it instead of leaking a bare
       # `StopAsyncIteration` as an opaque `RuntimeError`.
@@ -210,23 +514,52 @@ class Subscription(Generic[T]):
         with suppress(Exception):
           await ctx.unsubscribe()
         self.ctx = self.pump = None
+        self.latest = None
     for inbox in list(self.subscribers):
       inbox.fail(exc)
 
-  @asynccontextmanager
-  async def subscribe(
-    self,
-    *,
-    queue_size: int = 1000,
-    overflow: OverflowPolicy = 'fail',
-  ) -> AsyncGenerator[AsyncIterable[T], None]:
+  @overload
+  def subscribe(
+    self, *, queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+    key: Callable[[T], Hashable] | None = None,
+  ) -> AsyncContextManager[StreamInbox[T]]:
+    ...
+  @overload
+  def subscribe(
+    self, *, view: Callable[[T], U], join: Callable[[T], U] | None = None,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+    key: Callable[[U], Hashable] | None = None,
+  ) -> AsyncContextManager[StreamInbox[U]]:
+    ...
+  def subscribe(
+    self, *, view: Callable[[T], Any] | None = None, join: Callable[[T], Any] | None = None,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+    key: Callable[[Any], Hashable] | None = None,
+  ) -> AsyncContextManager[StreamInbox[Any]]:
     """Subscribe to the shared upstream with a bounded delivery inbox.
 
+    - `view`: hashable function mapping each upstream item to what this
+      subscriber receives. Equal views are built once per item and shared. A
+      `latest` inbox with `queue_size=1` builds its view only when the item is
+      dequeued, so items it drops unread cost nothing; for an upstream that
+      mutates one live object in place, the view then reflects its newest state.
+    - `join`: if the upstream is already running, deliver `join(latest)` as this
+      subscriber's first item, consistent with the `view`s that follow it.
     - `queue_size`: max data items buffered for this subscriber before the
       `overflow` policy kicks in.
     - `overflow`: what happens when the buffer is full (see `OverflowPolicy`).
+    - `key`: conflation key of the (viewed) items, required by `conflate`.
     """
-    inbox: StreamInbox[T] = StreamInbox.new(queue_size, overflow)
+    return self._subscribe(StreamInbox.new(queue_size, overflow, view=view, key=key), join)
+
+  @asynccontextmanager
+  async def _subscribe(
+    self, inbox: StreamInbox[Any], join: Callable[[T], Any] | None = None,
+  ) -> AsyncGenerator[StreamInbox[Any], None]:
+    if join is not None and self.latest is not None:
+      # No await between this and joining `subscribers`: the next delivered
+      # item is exactly the one following `latest`.
+      inbox.push(join(self.latest))
     self.subscribers.append(inbox)
     await self.start()
 
@@ -239,6 +572,7 @@ class Subscription(Generic[T]):
           return
         pump, ctx = self.pump, self.ctx
         self.pump = self.ctx = None
+        self.latest = None
       pump.cancel()
       with suppress(asyncio.CancelledError):
         await pump
@@ -1,6 +1,7 @@
 from typing_extensions import Mapping, Sequence
 from dataclasses import dataclass, field
 
+from tribulnation.sdk.core import ResourcePool
 from tribulnation.sdk.market import TradingMarkets, TradingVenue
 from .accounts import Account, Dydx, Hyperliquid, Mexc
 
@@ -12,7 +13,18 @@ DEFAULT_ACCOUNTS: Mapping[str, Account] = {
 
 @dataclass(frozen=True)
 class MarketSDK(TradingMarkets):
+  """Venues of your accounts, built on first use and reused afterwards.
+
+  Enter the SDK (`async with sdk:`) to own their connections: venues are entered
+  as they are built and closed on exit. Outside the context each call builds a
+  new venue.
+  """
   accounts: Mapping[str, Account] = field(default_factory=dict)
+  pool: ResourcePool[str, TradingVenue] = field(default_factory=ResourcePool, init=False, compare=False, repr=False)
+
+  def resources(self):
+    yield from super().resources()
+    yield self.pool.active()
 
   @property
   def all_accounts(self) -> Mapping[str, Account]:
@@ -40,6 +52,9 @@ class MarketSDK(TradingMarkets):
     return MexcMarket.new(api_key=account.resolved_api_key, api_secret=account.resolved_api_secret, validate=account.validate)
 
   async def venue(self, id: str, /) -> TradingVenue:
+    return await self.pool.get(id, lambda: self.new_venue(id))
+
+  def new_venue(self, id: str, /) -> TradingVenue:
     if (account := self.all_accounts.get(id)) is None:
       raise ValueError(f'No account found for venue id: {id}')
     match account.venue:
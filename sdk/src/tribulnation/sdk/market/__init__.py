@@ -1,13 +1,17 @@
 from .types import (
-  Book, Collateral, PerpCollateral,
+  Book, BookView, BookDiff, LiveBook, DiffView, book_diffs, Ladder, FloatLadder,
+  Collateral, PerpCollateral,
   FundingRate, NextFunding, FundingPayment,
   Order, OrderResponse, OrderState,
   Position, PerpPosition,
   PerpStats, Ticker,
   Trade, Rules,
+  TickBook, TickLiveBook, Grid,
 )
 from .settings import Settings
 from .market import Market, PerpMarket
 from .exchange import Exchange, PerpExchange
 from .venue import TradingVenue, ExchangeDescription
-from .markets import TradingMarkets
\ No newline at end of file
+from .markets import TradingMarkets, MarketHandles
+from .order_store import OrderStore, OrderUpdate
+from .consolidated_book import ConsolidatedBook, VenueEntry
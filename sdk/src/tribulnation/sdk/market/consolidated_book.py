@@ -0,0 +1,165 @@
+from typing_extensions import AsyncIterable, AsyncIterator, Hashable, Mapping
+from contextlib import asynccontextmanager, AsyncExitStack
+from dataclasses import dataclass, field
+from decimal import Decimal
+import asyncio
+import heapq
+
+from tribulnation.sdk.core import managed_tasks
+from .types import Book, BookDiff
+from .types.book import level_index
+from .market import Market
+
+
+@dataclass(frozen=True)
+class VenueEntry(Book.Entry):
+  """A price level of one venue. `price` includes the venue's fee."""
+  venue: Hashable
+  venue_price: Decimal
+  """The price quoted by the venue, before fees."""
+
+
+@dataclass(kw_only=True)
+class ConsolidatedBook(Book):
+  """Fee-adjusted order books of several venues, merged into one ladder kept up to
+  date diff by diff, with each level tagged with its venue (`VenueEntry`).
+
+  As a `Book`, it answers the same execution-cost queries (`market_buy_price`,
+  `sellable_at`, ...) on the merged ladder. Each diff touches only the levels it
+  changes, as in `Book.update`: `k` changed levels cost `k` binary searches, plus an
+  `O(n)` list insert or delete (a memmove) for each level added or removed.
+
+  A venue whose stream ends or fails is dropped from the book and recorded in `ended`,
+  so callers can tell a thin book from a dead feed.
+
+  ```python
+  async with ConsolidatedBook.following_markets({'mexc': m1, 'dydx': m2}) as book:
+    book.market_buy_price(qty=Decimal(1))
+    book.buy_route(qty=Decimal(1))  # {'mexc': ..., 'dydx': ...}
+  ```
+  """
+  fees: dict[Hashable, Decimal] = field(default_factory=dict)
+  """Fee of each venue, as a fraction: bids are lowered, asks raised by it (as `Book.with_fees`)."""
+  seqs: dict[Hashable, int] = field(default_factory=dict)
+  """`BookDiff.seq` last applied, by venue. Venues missing are not in the book."""
+  ended: dict[Hashable, BaseException | None] = field(default_factory=dict)
+  """Venues whose stream ended, with the exception it failed with (`None` if it just ended)."""
+
+  def entry(self, venue: Hashable, e: Book.Entry, *, bid: bool) -> VenueEntry:
+    fee = self.fees.get(venue, Decimal(0))
+    price = e.price * (1 - fee) if bid else e.price * (1 + fee)
+    return VenueEntry(price, e.qty, venue, e.price)
+
+  def set_level(self, venue: Hashable, e: Book.Entry, *, bid: bool):
+    """Replace, insert or (if `e.qty <= 0`) remove the level of `venue` at `e.price`."""
+    entries = self.bids if bid else self.asks
+    entry = self.entry(venue, e, bid=bid)
+    i = level_index(entries, entry.price, descending=bid)
+    # Levels of several venues may share a price: find this venue's among them.
+    while i < len(entries) and entries[i].price == entry.price and entries[i].venue != venue: # type: ignore
+      i += 1
+    found = i < len(entries) and entries[i].price == entry.price
+    if entry.qty > 0:
+      if found:
+        entries[i] = entry
+      else:
+        entries.insert(i, entry)
+    elif found:
+      del entries[i]
+
+  def remove_venue(self, venue: Hashable):
+    """Drop every level of `venue`."""
+    self.bids = [e for e in self.bids if e.venue != venue] # type: ignore
+    self.asks = [e for e in self.asks if e.venue != venue] # type: ignore
+    self.seqs.pop(venue, None)
+
+  def replace_venue(self, venue: Hashable, book: Book):
+    """Replace the levels of `venue` with (sorted) `book`, in one merge pass."""
+    bids = [e for e in self.bids if e.venue != venue] # type: ignore
+    asks = [e for e in self.asks if e.venue != venue] # type: ignore
+    price = lambda e: e.price
+    self.bids = list(heapq.merge(bids, [self.entry(venue, e, bid=True) for e in book.bids], key=price, reverse=True))
+    self.asks = list(heapq.merge(asks, [self.entry(venue, e, bid=False) for e in book.asks], key=price))
+
+  def apply(self, venue: Hashable, diff: BookDiff):
+    """Apply a diff of `venue`'s `depth_diff_stream`.
+
+    After a `seq` gap the venue's levels are stale, so they are dropped until its next snapshot.
+    """
+    if diff.snapshot:
+      self.replace_venue(venue, diff.book)
+    elif self.seqs.get(venue) != diff.seq - 1:
+      self.remove_venue(venue)
+      return
+    else:
+      for e in diff.book.bids:
+        self.set_level(venue, e, bid=True)
+      for e in diff.book.asks:
+        self.set_level(venue, e, bid=False)
+    self.seqs[venue] = diff.seq
+
+  def buy_route(self, *, qty: Decimal) -> dict[Hashable, Decimal] | None:
+    """Quantity to buy on each venue to fill `qty` at `market_buy_price`; `None` if the book is too thin."""
+    return venue_route(self.asks, qty)
+
+  def sell_route(self, *, qty: Decimal) -> dict[Hashable, Decimal] | None:
+    """Quantity to sell on each venue to fill `qty` at `market_sell_price`; `None` if the book is too thin."""
+    return venue_route(self.bids, qty)
+
+  async def follow(self, venue: Hashable, diffs: AsyncIterable[BookDiff]):
+    """Apply `venue`'s `diffs` until they end or fail, then drop its levels and record it in `ended`."""
+    self.ended.pop(venue, None)
+    try:
+      async for diff in diffs:
+        self.apply(venue, diff)
+    except Exception as e:
+      self.ended[venue] = e
+      raise
+    else:
+      self.ended[venue] = None
+    finally:
+      self.remove_venue(venue)
+
+  @asynccontextmanager
+  async def following(self, streams: Mapping[Hashable, AsyncIterable[BookDiff]]) -> AsyncIterator['ConsolidatedBook']:
+    """Follow each venue's diff stream in the background while in the context."""
+    async with managed_tasks([self.follow(venue, diffs) for venue, diffs in streams.items()]):
+      yield self
+
+  @classmethod
+  @asynccontextmanager
+  async def following_markets(
+    cls, markets: Mapping[Hashable, Market], *, fees: Mapping[Hashable, Decimal] | None = None,
+    resync_every: int = 1000, queue_size: int = 1000,
+  ) -> AsyncIterator['ConsolidatedBook']:
+    """Consolidate the `depth_diff_stream`s of `markets`, by venue key.
+
+    - `fees`: fee per venue key. Defaults to each market's taker fee (from `rules()`).
+    """
+    if fees is None:
+      venues = list(markets)
+      rules = await asyncio.gather(*(markets[v].rules() for v in venues))
+      fees = {v: r.taker_fee for v, r in zip(venues, rules)}
+    book = cls(fees=dict(fees))
+    async with AsyncExitStack() as stack:
+      streams = {
+        venue: await stack.enter_async_context(market.depth_diff_stream(
+          resync_every=resync_every, queue_size=queue_size, overflow='fail',
+        ))
+        for venue, market in markets.items()
+      }
+      async with book.following(streams):
+        yield book
+
+
+def venue_route(entries: list[Book.Entry], qty: Decimal) -> dict[Hashable, Decimal] | None:
+  """Quantity taken from each venue when filling `qty` down a side of venue entries."""
+  remaining = qty
+  route: dict[Hashable, Decimal] = {}
+  for e in entries:
+    if remaining <= 0:
+      break
+    q = min(e.qty, remaining)
+    route[e.venue] = route.get(e.venue, Decimal(0)) + q # type: ignore
+    remaining -= q
+  return route if remaining <= 0 else None
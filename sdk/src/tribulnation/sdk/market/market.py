@@ -1,12 +1,13 @@
 from typing_extensions import Any, AsyncContextManager, AsyncIterable, AsyncIterator, Sequence
 from abc import abstractmethod
+from contextlib import asynccontextmanager
 from datetime import datetime
 from decimal import Decimal
 import asyncio
 
 from tribulnation.sdk.core import SDK, PaginatedResponse, OverflowPolicy
 from .types import (
-  Book,
+  Book, BookDiff, book_diffs,
   Collateral, PerpCollateral,
   FundingRate, NextFunding, FundingPayment,
   Order, OrderResponse, OrderState,
@@ -61,6 +62,25 @@ class Market(SDK):
     """
     ...
 
+  @SDK.method
+  @asynccontextmanager
+  async def depth_diff_stream(
+    self, *, resync_every: int = 1000,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ) -> AsyncIterator[AsyncIterable[BookDiff]]:
+    """Subscribe to sequence-numbered order book diffs.
+
+    The first diff is a full snapshot, as is every `resync_every`-th one; apply
+    them in order with `BookDiff.apply`. A `seq` gap means diffs were skipped and
+    the local book is stale until the next snapshot, so the default `'fail'`
+    overflow fails the subscriber rather than skipping diffs silently.
+
+    Venues derive diffs from their native incremental feeds; this default diffs
+    consecutive books of `depth_stream`.
+    """
+    async with self.depth_stream(queue_size=queue_size, overflow=overflow) as books:
+      yield book_diffs(books, resync_every=resync_every)
+
   @SDK.method
   @abstractmethod
   async def rules(self, *, refetch: bool = False) -> Rules:
@@ -151,7 +171,10 @@ class Market(SDK):
 
   @SDK.method
   async def place_orders(self, orders: Sequence[Order], *, settings: Settings = {}) -> Sequence[OrderResponse]:
-    """Place multiple orders in the market."""
+    """Place multiple orders in the market.
+
+    Venues with a native batch endpoint override this to send them in as few requests as the venue allows.
+    """
     return await asyncio.gather(*[self.place_order(order, settings=settings) for order in orders])
 
   @SDK.method
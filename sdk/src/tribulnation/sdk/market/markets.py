@@ -1,11 +1,14 @@
-from typing_extensions import Any, AsyncIterable, AsyncIterator, Sequence, Literal, TypedDict
+from typing_extensions import Any, AsyncIterable, AsyncIterator, Mapping, Sequence, Literal, TypedDict
 from abc import abstractmethod
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
+from decimal import Decimal
+import asyncio
 
 from tribulnation.sdk.core import SDK, PaginatedResponse, OverflowPolicy
 from .types import (
-  Book,
+  Book, BookDiff,
   Collateral, PerpCollateral,
   FundingRate, NextFunding, FundingPayment,
   Order, OrderResponse, OrderState,
@@ -14,12 +17,72 @@ from .types import (
   Rules,
 )
 from .settings import Settings
-from .market import Market
+from .market import Market, PerpMarket
 from .exchange import Exchange, PerpExchange
 from .venue import TradingVenue
+from .consolidated_book import ConsolidatedBook
+
+@dataclass
+class MarketHandles:
+  """Markets resolved by `TradingMarkets`, by full market id."""
+  markets: dict[str, Market] = field(default_factory=dict)
+  perp_markets: dict[str, PerpMarket] = field(default_factory=dict)
+
+  def invalidate(self, id: str | None = None):
+    """Forget every market (`None`), one market id, or those under an
+    `<account_id>` or `<account_id>:<exchange_id>` prefix."""
+    for handles in (self.markets, self.perp_markets):
+      if id is None:
+        handles.clear()
+      else:
+        for key in [k for k in handles if k == id or k.startswith(id + ':')]:
+          del handles[key]
+
+
+@asynccontextmanager
+async def forgetting(handles: MarketHandles):
+  """Forget resolved markets on entry, as they were resolved against venues the owner
+  did not own, and on exit, as their venues are closed."""
+  handles.invalidate()
+  try:
+    yield handles
+  finally:
+    handles.invalidate()
+
 
 class TradingMarkets(SDK):
-  """A collection of all venues supported by the SDK."""
+  """A collection of all venues supported by the SDK.
+
+  Markets resolved by the methods taking a `market_id` are kept in `handles`, so
+  later calls go straight to the market. `rules(..., refetch=True)` resolves the
+  market afresh; call `handles.invalidate` after other metadata changes.
+  """
+
+  @property
+  def handles(self) -> MarketHandles:
+    """Resolved markets. Kept in `__dict__`, so frozen subclasses can own them."""
+    handles = self.__dict__.get('_market_handles')
+    if handles is None:
+      handles = self.__dict__['_market_handles'] = MarketHandles()
+    return handles
+
+  def resources(self):
+    yield from super().resources()
+    yield forgetting(self.handles)
+
+  async def handle(self, market_id: str, /) -> Market:
+    """`market(market_id)`, resolved once and then served from `handles`."""
+    market = self.handles.markets.get(market_id)
+    if market is None:
+      market = self.handles.markets[market_id] = await self.market(market_id)
+    return market
+
+  async def perp_handle(self, market_id: str, /) -> PerpMarket:
+    """`perp_market(market_id)`, resolved once and then served from `handles`."""
+    market = self.handles.perp_markets.get(market_id)
+    if market is None:
+      market = self.handles.perp_markets[market_id] = await self.perp_market(market_id)
+    return market
 
   @SDK.method
   @abstractmethod
@@ -63,7 +126,7 @@ class TradingMarkets(SDK):
     return await exchange.market(market_id)
 
   @SDK.method
-  async def perp_market(self, id: str, /):
+  async def perp_market(self, id: str, /) -> PerpMarket:
     """Fetch a perpetual market by ID.
 
     - `market_id`: `<account_id>:<exchange_id>:<market_id>`
@@ -76,7 +139,7 @@ class TradingMarkets(SDK):
   @SDK.method
   async def depth(self, market_id: str, /, *, levels: int | None = None) -> Book:
     """Fetch the market order book."""
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.depth(levels=levels)
 
   @SDK.method
@@ -90,36 +153,67 @@ class TradingMarkets(SDK):
     See `Market.depth_stream` for `queue_size`/`overflow` (e.g. `overflow='fail'`
     with a larger `queue_size` to capture every book).
     """
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     async with market.depth_stream(levels=levels, queue_size=queue_size, overflow=overflow) as stream:
       yield stream
+
+  @SDK.method
+  @asynccontextmanager
+  async def depth_diff_stream(
+    self, market_id: str, /, *, resync_every: int = 1000,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ) -> AsyncIterator[AsyncIterable[BookDiff]]:
+    """Subscribe to sequence-numbered order book diffs. See `Market.depth_diff_stream`."""
+    market = await self.handle(market_id)
+    async with market.depth_diff_stream(resync_every=resync_every, queue_size=queue_size, overflow=overflow) as stream:
+      yield stream
   
+  @SDK.method
+  @asynccontextmanager
+  async def consolidated_depth(
+    self, market_ids: Sequence[str], /, *, fees: Mapping[str, Decimal] | None = None,
+    resync_every: int = 1000, queue_size: int = 1000,
+  ) -> AsyncIterator[ConsolidatedBook]:
+    """Merge the order books of `market_ids` into one fee-adjusted `ConsolidatedBook`,
+    kept up to date from their diff streams, with levels tagged by market id.
+
+    - `fees`: fee per market id. Defaults to each market's taker fee.
+    """
+    markets = await asyncio.gather(*(self.handle(id) for id in market_ids))
+    async with ConsolidatedBook.following_markets(
+      dict(zip(market_ids, markets)), fees=fees, resync_every=resync_every, queue_size=queue_size,
+    ) as book:
+      yield book
+
   @SDK.method
   async def rules(self, market_id: str, /, *, refetch: bool = False) -> Rules:
     """Fetch the market rules.
     
-    - `refetch`: if `True`, fetch the rules even if they are already cached.
+    - `refetch`: if `True`, fetch the rules even if they are already cached, and
+      resolve the market afresh.
     """
-    market = await self.market(market_id)
+    if refetch:
+      self.handles.invalidate(market_id)
+    market = await self.handle(market_id)
     return await market.rules(refetch=refetch)
 
   @SDK.method
   async def query_order(self, market_id: str, /, id: str) -> OrderState | None:
     """Fetch the state of the order with the given ID."""
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.query_order(id)
 
   @SDK.method
   async def open_orders(self, market_id: str, /) -> Sequence[OrderState]:
     """Fetch your currently open orders."""
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.open_orders()
 
   @SDK.method
   @PaginatedResponse.lift
   async def trades_history(self, market_id: str, /, start: datetime, end: datetime):
     """Fetch your trades history."""
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     async for page in market.trades_history(start, end):
       yield page
 
@@ -132,14 +226,14 @@ class TradingMarkets(SDK):
 
     See `Market.trades_stream` for `queue_size`/`overflow`.
     """
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     async with market.trades_stream(queue_size=queue_size, overflow=overflow) as stream:
       yield stream
 
   @SDK.method
   async def position(self, market_id: str, /) -> Position:
     """Fetch your open position in the market."""
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.position()
 
   @SDK.method
@@ -167,7 +261,7 @@ class TradingMarkets(SDK):
     - For spot, returns the free quote token balance
     - For futures, returns the available collateral times the maximum leverage
     """
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.available_notional()
 
   @SDK.method
@@ -176,32 +270,32 @@ class TradingMarkets(SDK):
 
     See ``Market.place_order`` for SDK order type semantics.
     """
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.place_order(order, settings=settings)
 
   @SDK.method
   async def cancel_order(self, market_id: str, /, id: str, *, settings: Settings = {}) -> Any:
     """Cancel an order in the market."""
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.cancel_order(id, settings=settings)
 
   @SDK.method
   async def cancel_orders(self, market_id: str, /, ids: Sequence[str], *, settings: Settings = {}) -> Any:
     """Cancel multiple orders in the market."""
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.cancel_orders(ids, settings=settings)
 
   @SDK.method
   async def cancel_open_orders(self, market_id: str, /, *, settings: Settings = {}) -> Any:
     """Cancel all open orders in the market."""
-    market = await self.market(market_id)
+    market = await self.handle(market_id)
     return await market.cancel_open_orders(settings=settings)
 
 
   @SDK.method
   async def perp_position(self, market_id: str, /) -> PerpPosition:
     """Fetch your open position in the perpetual market."""
-    market = await self.perp_market(market_id)
+    market = await self.perp_handle(market_id)
     return await market.perp_position()
 
   @SDK.method
@@ -225,13 +319,13 @@ class TradingMarkets(SDK):
   @SDK.method
   async def index(self, market_id: str, /):
     """Fetch the market index price."""
-    market = await self.perp_market(market_id)
+    market = await self.perp_handle(market_id)
     return await market.index()
   
   @SDK.method
   async def next_funding(self, market_id: str, /) -> NextFunding:
     """Fetch the next funding rate and time."""
-    market = await self.perp_market(market_id)
+    market = await self.perp_handle(market_id)
     return await market.next_funding()
 
   @SDK.method
@@ -244,7 +338,7 @@ class TradingMarkets(SDK):
       start: Start of the window (inclusive). `None` fetches from the earliest available.
       end: End of the window (inclusive). `None` means everything since `start`.
     """
-    market = await self.perp_market(market_id)
+    market = await self.perp_handle(market_id)
     async for page in market.funding_rates(start, end):
       yield page
 
@@ -252,6 +346,6 @@ class TradingMarkets(SDK):
   @PaginatedResponse.lift
   async def funding_payments(self, market_id: str, /, start: datetime, end: datetime) -> AsyncIterable[Sequence[FundingPayment]]:
     """Fetch your funding payments history."""
-    market = await self.perp_market(market_id)
+    market = await self.perp_handle(market_id)
     async for page in market.funding_payments(start, end):
       yield page
@@ -0,0 +1,140 @@
+from typing_extensions import AsyncIterable, AsyncIterator, Awaitable, Callable, Hashable, Iterable, Sequence
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+import time
+
+from tribulnation.sdk.core import SingleFlight, managed_tasks
+from .types import OrderState
+
+OrderUpdate = tuple[Hashable | None, OrderState]
+"""`(market, state)` from a private order stream. `market=None` keeps the market already on record."""
+
+
+@dataclass
+class OrderStore:
+  """Order states of one venue account, kept in memory from its private order stream.
+
+  Each market is seeded from REST the first time it is asked for, and again every
+  `reconcile_every` seconds, to catch anything the stream missed. In between,
+  `open_orders` and `query_order` answer from memory. Once the stream ends or
+  fails (`live = False`, with the failure in `error`), every call goes back to REST.
+
+  ```python
+  async with venue.track_orders() as store:
+    await market.open_orders()  # REST once, then from memory
+  ```
+  """
+  reconcile_every: float = 60
+  max_done: int = 10_000
+  """Inactive (filled or cancelled) orders kept for `query_order`; the oldest are forgotten."""
+  orders: dict[str, OrderState] = field(default_factory=dict)
+  markets: dict[str, Hashable] = field(default_factory=dict)
+  """Market of each order, by id."""
+  updated: dict[str, int] = field(default_factory=dict)
+  """`version` at each order's last stream update."""
+  done: OrderedDict[str, None] = field(default_factory=OrderedDict)
+  reconciled: dict[Hashable, float] = field(default_factory=dict)
+  """`clock()` at each market's last reconciliation."""
+  version: int = 0
+  live: bool = True
+  error: BaseException | None = None
+  """The exception the stream failed with, if it failed."""
+  flights: SingleFlight = field(default_factory=SingleFlight)
+  clock: Callable[[], float] = time.monotonic
+
+  def fresh(self, market: Hashable) -> bool:
+    at = self.reconciled.get(market)
+    return self.live and at is not None and self.clock() - at < self.reconcile_every
+
+  def get(self, id: str) -> OrderState | None:
+    return self.orders.get(id)
+
+  def put(self, market: Hashable, order: OrderState):
+    self.orders[order.id] = order
+    self.markets[order.id] = market
+    if order.active:
+      self.done.pop(order.id, None)
+    else:
+      self.done[order.id] = None
+      self.done.move_to_end(order.id)
+      while len(self.done) > self.max_done:
+        id, _ = self.done.popitem(last=False)
+        for index in (self.orders, self.markets, self.updated):
+          index.pop(id, None)
+
+  def update(self, order: OrderState, market: Hashable | None = None):
+    """Apply a stream update. Orders of unknown market are left to the next reconciliation."""
+    if market is None and (market := self.markets.get(order.id)) is None:
+      return
+    self.version += 1
+    self.updated[order.id] = self.version
+    self.put(market, order)
+
+  def add(self, market: Hashable, order: OrderState):
+    """Record a placement acknowledged by the venue, unless the stream got there first.
+    Versioned like a stream update, so a listing fetched before it does not drop it."""
+    if order.id not in self.orders:
+      self.update(order, market)
+
+  def reconcile(self, market: Hashable, open_orders: Sequence[OrderState], since: int):
+    """Adopt `open_orders`, fetched over REST from `version == since` on.
+
+    Orders updated by the stream meanwhile keep their newer state. Those of `market`
+    still on record as active but no longer listed are marked inactive.
+    """
+    listed = {order.id for order in open_orders}
+    for id, order in list(self.orders.items()):
+      if self.markets.get(id) == market and order.active and id not in listed and self.updated.get(id, 0) <= since:
+        self.put(market, replace(order, active=False))
+    for order in open_orders:
+      if self.updated.get(order.id, 0) <= since:
+        self.put(market, order)
+    self.reconciled[market] = self.clock()
+
+  async def open_orders(self, market: Hashable, fetch: Callable[[], Awaitable[Sequence[OrderState]]]) -> Sequence[OrderState]:
+    """Active orders of `market` from memory while fresh; otherwise `fetch()` them and reconcile."""
+    if self.fresh(market):
+      return [o for id, o in self.orders.items() if o.active and self.markets[id] == market]
+    async def reconcile():
+      since = self.version
+      orders = await fetch()
+      self.reconcile(market, orders, since)
+      return orders
+    return await self.flights.run(('open_orders', market), reconcile)
+
+  async def query_order(
+    self, market: Hashable, id: str,
+    fetch: Callable[[], Awaitable[OrderState | None]],
+    fetch_open: Callable[[], Awaitable[Sequence[OrderState]]],
+  ) -> OrderState | None:
+    """The order from memory, reconciling `market` first (with `fetch_open`, as
+    `open_orders`) unless fresh. Orders of other markets are `None`, as over REST.
+    Orders still unknown (e.g. filled before tracking began) are `fetch()`ed."""
+    if not self.live:
+      return await fetch()
+    if not self.fresh(market):
+      await self.open_orders(market, fetch_open)
+    order = self.orders.get(id)
+    if order is None:
+      return await fetch()
+    return order if self.markets[id] == market else None
+
+  async def follow(self, updates: AsyncIterable[Iterable[OrderUpdate]]):
+    """Apply `updates` until they end or fail, then stop answering from memory and
+    record the failure, if any, in `error`."""
+    try:
+      async for batch in updates:
+        for market, order in batch:
+          self.update(order, market)
+    except Exception as e:
+      self.error = e
+      raise
+    finally:
+      self.live = False
+
+  @asynccontextmanager
+  async def following(self, updates: AsyncIterable[Iterable[OrderUpdate]]) -> AsyncIterator['OrderStore']:
+    """Follow `updates` in the background while in the context."""
+    async with managed_tasks([self.follow(updates)]):
+      yield self
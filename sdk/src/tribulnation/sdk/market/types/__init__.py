@@ -1,4 +1,4 @@
-from .book import Book
+from .book import Book, BookView, BookDiff, LiveBook, DiffView, book_diffs, Ladder, FloatLadder
 from .collateral import Collateral, PerpCollateral
 from .funding import FundingRate, NextFunding, FundingPayment
 from .orders import Order, OrderResponse, OrderState
@@ -6,4 +6,5 @@ from .position import Position, PerpPosition
 from .stats import PerpStats
 from .ticker import Ticker
 from .trades import Trade
-from .rules import Rules
\ No newline at end of file
+from .rules import Rules
+from .tick_book import TickBook, TickLiveBook, Grid
\ No newline at end of file
@@ -1,12 +1,17 @@
-from typing_extensions import Sequence, overload
+from typing_extensions import TYPE_CHECKING, AsyncIterable, AsyncIterator, Sequence, overload
 from dataclasses import dataclass, field
 from decimal import Decimal
 
+if TYPE_CHECKING:
+  import numpy as np
+  from .tick_book import TickLiveBook
+
 @dataclass(kw_only=True)
 class Book:
   
-  @dataclass
+  @dataclass(frozen=True)
   class Entry:
+    """A price level. Immutable, so copies of a book can share entries."""
     price: Decimal
     qty: Decimal
     """Quantity in base units."""
@@ -66,6 +71,28 @@ class Book:
     else:
       raise ValueError("Either qty or notional must be provided")
 
+  @overload
+  def market_buy_prices(self, *, qtys: Sequence[Decimal]) -> list[Decimal | None]:
+    """Average fill prices for market orders buying each of `qtys` base units."""
+  @overload
+  def market_buy_prices(self, *, notionals: Sequence[Decimal]) -> list[Decimal | None]:
+    """Average fill prices for market orders buying each of `notionals` value."""
+  def market_buy_prices(
+    self, *, qtys: Sequence[Decimal] | None = None, notionals: Sequence[Decimal] | None = None,
+  ) -> list[Decimal | None]:
+    return Ladder.of(self.asks, descending=False).prices(qtys=qtys, notionals=notionals)
+
+  @overload
+  def market_sell_prices(self, *, qtys: Sequence[Decimal]) -> list[Decimal | None]:
+    """Average fill prices for market orders selling each of `qtys` base units."""
+  @overload
+  def market_sell_prices(self, *, notionals: Sequence[Decimal]) -> list[Decimal | None]:
+    """Average fill prices for market orders selling each of `notionals` value."""
+  def market_sell_prices(
+    self, *, qtys: Sequence[Decimal] | None = None, notionals: Sequence[Decimal] | None = None,
+  ) -> list[Decimal | None]:
+    return Ladder.of(self.bids, descending=True).prices(qtys=qtys, notionals=notionals)
+
   def sellable_at(self, price: Decimal) -> Decimal:
     """Max. sellable quantity that will fill at average price >= `price`."""
     return sellable_qty(self.bids, price)
@@ -74,6 +101,16 @@ class Book:
     """Max. buyable quantity that will fill at average price <= `price`."""
     return buyable_qty(self.asks, price)
 
+  def sellable_at_prices(self, prices: Sequence[Decimal]) -> list[Decimal]:
+    """`sellable_at` for each of `prices`, sharing one pass over the book."""
+    ladder = Ladder.of(self.bids, descending=True)
+    return [ladder.fillable_qty(p) for p in prices]
+
+  def buyable_at_prices(self, prices: Sequence[Decimal]) -> list[Decimal]:
+    """`buyable_at` for each of `prices`, sharing one pass over the book."""
+    ladder = Ladder.of(self.asks, descending=False)
+    return [ladder.fillable_qty(p) for p in prices]
+
   def buy(self, *, qty: Decimal) -> Decimal | None:
     """Buy `qty` base units at the best price, returning the average fill price.
     
@@ -119,31 +156,337 @@ class Book:
     return fmt_book(self, fmt)
 
   def copy(self) -> 'Book':
+    """Independent snapshot of the book.
+
+    Only the level lists are copied; the (frozen) entries are shared, so a
+    snapshot costs one pointer copy per level and no `Entry`/`Decimal` allocations.
+    """
     import copy
-    return copy.deepcopy(self)
+    book = copy.copy(self)
+    book.bids = self.bids.copy()
+    book.asks = self.asks.copy()
+    return book
   
   def update(self, updates: 'Book'):
     """Update the local book with an incoming update.
     - Matching entries are replaced with the new values.
     - New entries are added to the book.
     - Entries with zero quantity are removed from the book.
+
+    Each level change is located by binary search on the (already sorted) sides
+    instead of re-sorting the whole book. Replacing a level is `O(log n)`; adding or
+    removing one also shifts the list tail (`list.insert`/`del`, `O(n)` pointer moves),
+    so `k` changed levels cost `O(k n)` in the worst case. With book-sized sides that
+    memmove is cheap next to building the `Decimal`s.
     """
-    bids = {e.price: e for e in self.bids}
-    asks = {e.price: e for e in self.asks}
     for e in updates.bids:
-      if e.qty > 0:
-        bids[e.price] = e
-      else:
-        bids.pop(e.price, None)
+      set_level(self.bids, e, descending=True)
     for e in updates.asks:
-      if e.qty > 0:
-        asks[e.price] = e
+      set_level(self.asks, e, descending=False)
+
+
+@dataclass(kw_only=True)
+class BookDiff:
+  """A sequence-numbered change to an order book.
+
+  `seq` increases by one per diff of a stream; a gap means diffs were skipped
+  (e.g. by `overflow='latest'`), so the local book is stale until the next
+  snapshot.
+  """
+  seq: int
+  book: Book
+  """Changed levels (zero quantity: removed), or the full book if `snapshot`."""
+  snapshot: bool = False
+  """Whether `book` is the full book, replacing any local state."""
+
+  def apply(self, book: Book | None = None) -> Book:
+    """Apply the diff to a local `book`, returning the updated (or, for snapshots, new) book."""
+    if self.snapshot:
+      return self.book.copy()
+    if book is None:
+      raise ValueError('A non-snapshot diff needs a book to apply to')
+    book.update(self.book)
+    return book
+
+
+@dataclass
+class LiveBook:
+  """A book maintained in place by a venue stream, plus the change that produced it.
+
+  The upstream item of shared depth subscriptions. Subscribers read it through
+  views (`BookView` for books, `DiffView` for diffs), never directly.
+  """
+  book: Book
+  seq: int = 0
+  changes: Book | None = None
+  """Levels changed by the last update (`None`: the book was reset)."""
+
+  def update(self, changes: Book):
+    """Apply an incremental diff."""
+    self.book.update(changes)
+    self.seq += 1
+    self.changes = changes
+
+  def reset(self, book: Book):
+    """Replace the book after a resync; diff subscribers get a snapshot."""
+    self.book = book
+    self.seq += 1
+    self.changes = None
+
+  def replace(self, book: Book):
+    """Replace the book with a newer full snapshot, recording the changed levels."""
+    changes = diff_books(self.book, book)
+    self.book = book
+    self.seq += 1
+    self.changes = changes
+
+  def top(self, levels: int | None = None) -> Book:
+    """Independent snapshot of the book, or of its top `levels` per side."""
+    if levels is None:
+      return self.book.copy()
+    return Book(bids=self.book.bids[:levels], asks=self.book.asks[:levels])
+
+  def snapshot(self) -> BookDiff:
+    """The current state as a snapshot diff."""
+    return BookDiff(seq=self.seq, book=self.book.copy(), snapshot=True)
+
+
+@dataclass(frozen=True)
+class BookView:
+  """Subscription view (see `Subscription.subscribe`) snapshotting a live book.
+
+  Views are hashable, so subscribers asking for the same `levels` share one
+  snapshot per update.
+  """
+  levels: int | None = None
+  """Keep only the top `levels` levels per side (`None`: the full book)."""
+
+  def __call__(self, live: 'LiveBook | TickLiveBook') -> Book:
+    return live.top(self.levels)
+
+
+@dataclass(frozen=True)
+class DiffView:
+  """Subscription view turning a live book's updates into `BookDiff`s.
+
+  Every `resync_every`-th diff (and every diff after a reset) is a full snapshot,
+  so consumers that skipped diffs recover without resubscribing.
+  """
+  resync_every: int = 1000
+
+  def __call__(self, live: 'LiveBook | TickLiveBook') -> BookDiff:
+    if live.seq % self.resync_every == 0 or (changes := live.changes) is None:
+      return live.snapshot()
+    return BookDiff(seq=live.seq, book=changes)
+
+
+async def book_diffs(books: AsyncIterable[Book], *, resync_every: int = 1000) -> AsyncIterator[BookDiff]:
+  """Diff consecutive (independent) book snapshots, for venues without a native diff feed."""
+  view = DiffView(resync_every)
+  live: LiveBook | None = None
+  async for book in books:
+    if live is None:
+      live = LiveBook(book)
+    else:
+      live.replace(book)
+    yield view(live)
+
+
+def level_index(entries: Sequence[Book.Entry], price: Decimal, *, descending: bool) -> int:
+  """Index of the first entry not better than `price` in a sorted book side."""
+  lo, hi = 0, len(entries)
+  while lo < hi:
+    mid = (lo + hi) // 2
+    p = entries[mid].price
+    if (p > price) if descending else (p < price):
+      lo = mid + 1
+    else:
+      hi = mid
+  return lo
+
+def set_level(entries: list[Book.Entry], entry: Book.Entry, *, descending: bool):
+  """Replace, insert or (if `entry.qty <= 0`) remove `entry`'s price level in a sorted book side.
+
+  `O(log n)` to find and replace a level; `O(n)` to insert or remove one, which shifts the tail.
+  """
+  i = level_index(entries, entry.price, descending=descending)
+  found = i < len(entries) and entries[i].price == entry.price
+  if entry.qty > 0:
+    if found:
+      entries[i] = entry
+    else:
+      entries.insert(i, entry)
+  elif found:
+    del entries[i]
+
+
+def diff_side(old: Sequence[Book.Entry], new: Sequence[Book.Entry], *, descending: bool) -> list[Book.Entry]:
+  """Level changes turning sorted side `old` into `new` (zero quantity: removed)."""
+  changes: list[Book.Entry] = []
+  i = j = 0
+  while i < len(old) and j < len(new):
+    a, b = old[i], new[j]
+    if a.price == b.price:
+      if a.qty != b.qty:
+        changes.append(b)
+      i += 1
+      j += 1
+    elif (a.price > b.price) if descending else (a.price < b.price):
+      changes.append(Book.Entry(a.price, Decimal(0)))
+      i += 1
+    else:
+      changes.append(b)
+      j += 1
+  changes.extend(Book.Entry(a.price, Decimal(0)) for a in old[i:])
+  changes.extend(new[j:])
+  return changes
+
+def diff_books(old: Book, new: Book) -> Book:
+  """Levels changed from `old` to `new`, such that `old.update(diff_books(old, new))` equals `new`."""
+  return Book(
+    bids=diff_side(old.bids, new.bids, descending=True),
+    asks=diff_side(old.asks, new.asks, descending=False),
+  )
+
+
+@dataclass(frozen=True)
+class Ladder:
+  """Cumulative quantity and notional of a sorted book side.
+
+  Built once in `O(n)`; each execution-cost query is then a binary search, so
+  pricing `k` order sizes costs `O(n + k log n)` instead of `O(k n)`. Results
+  match the single-query functions (`market_price_qty`, `buyable_qty`, ...).
+  """
+  entries: Sequence[Book.Entry]
+  descending: bool
+  """Whether `entries` are bids (best price highest)."""
+  qty: list[Decimal]
+  """`qty[i]`: total quantity of `entries[:i+1]`."""
+  notional: list[Decimal]
+  """`notional[i]`: total notional of `entries[:i+1]`."""
+
+  @classmethod
+  def of(cls, entries: Sequence[Book.Entry], *, descending: bool) -> 'Ladder':
+    qty: list[Decimal] = []
+    notional: list[Decimal] = []
+    Q = N = Decimal(0)
+    for e in entries:
+      Q += e.qty
+      N += e.price * e.qty
+      qty.append(Q)
+      notional.append(N)
+    return cls(entries, descending, qty, notional)
+
+  def prices(
+    self, *, qtys: Sequence[Decimal] | None = None, notionals: Sequence[Decimal] | None = None,
+  ) -> list[Decimal | None]:
+    """Average fill price for each of `qtys` (or `notionals`), `None` where the side is too thin."""
+    if qtys is not None:
+      return [self.price_qty(q) for q in qtys]
+    elif notionals is not None:
+      return [self.price_notional(n) for n in notionals]
+    else:
+      raise ValueError("Either qtys or notionals must be provided")
+
+  def price_qty(self, qty: Decimal) -> Decimal | None:
+    """Average fill price for a market order consuming `qty` base units."""
+    i = first_at_least(self.qty, qty)
+    if i == len(self.entries):
+      return None
+    Q, N = (self.qty[i-1], self.notional[i-1]) if i > 0 else (Decimal(0), Decimal(0))
+    rest = qty - Q
+    return (N + self.entries[i].price * rest) / (Q + rest)
+
+  def price_notional(self, notional: Decimal) -> Decimal | None:
+    """Average fill price for a market order consuming `notional` value."""
+    i = first_at_least(self.notional, notional)
+    if i == len(self.entries):
+      return None
+    Q, N = (self.qty[i-1], self.notional[i-1]) if i > 0 else (Decimal(0), Decimal(0))
+    price = self.entries[i].price
+    rest = (notional - N) / price
+    return (N + price * rest) / (Q + rest)
+
+  def fillable_qty(self, price: Decimal) -> Decimal:
+    """Max. fillable quantity with average fill price no worse than `price`."""
+    # Levels fill whole while the running average stays within `price`: for asks
+    # `N - P*Q` falls then rises, for bids it rises then falls, so the fully
+    # filled prefix is found by binary search.
+    sign = -1 if self.descending else 1
+    lo, hi = 0, len(self.entries)
+    while lo < hi:
+      mid = (lo + hi) // 2
+      if sign * (self.notional[mid] - price * self.qty[mid]) <= 0:
+        lo = mid + 1
       else:
-        asks.pop(e.price, None)
+        hi = mid
+    Q, N = (self.qty[lo-1], self.notional[lo-1]) if lo > 0 else (Decimal(0), Decimal(0))
+    if lo == len(self.entries):
+      return Q
+    e = self.entries[lo]
+    return Q + min((N - price*Q) / (price - e.price), e.qty)
+
+
+def first_at_least(values: Sequence[Decimal], x: Decimal) -> int:
+  """Index of the first of the (ascending) `values` that is `>= x`."""
+  lo, hi = 0, len(values)
+  while lo < hi:
+    mid = (lo + hi) // 2
+    if values[mid] < x:
+      lo = mid + 1
+    else:
+      hi = mid
+  return lo
 
-    self.bids = [bids[p] for p in sorted(bids.keys(), reverse=True)]
-    self.asks = [asks[p] for p in sorted(asks.keys())]
-    
+
+@dataclass(frozen=True)
+class FloatLadder:
+  """`Ladder` on NumPy `float64` arrays, answering whole batches of queries at once.
+
+  An approximation of the exact `Decimal` path, for hot sizing loops: results
+  have a relative error of roughly `n * 1e-16` for `n` levels (cumulative sums
+  dominate), so compare them with a tolerance (e.g. `1e-9` relative), never
+  exactly. Requires `numpy` (`pip install tribulnation-sdk[numpy]`).
+  """
+  price: 'np.ndarray'
+  qty: 'np.ndarray'
+  """Cumulative quantity (see `Ladder.qty`)."""
+  notional: 'np.ndarray'
+  """Cumulative notional (see `Ladder.notional`)."""
+
+  @classmethod
+  def of(cls, entries: Sequence[Book.Entry]) -> 'FloatLadder':
+    try:
+      import numpy as np
+    except ImportError as e:
+      raise ImportError('numpy is not installed. Please install it with `pip install tribulnation-sdk[numpy]`.') from e
+    price = np.array([float(e.price) for e in entries])
+    qty = np.array([float(e.qty) for e in entries])
+    return cls(price, np.cumsum(qty), np.cumsum(price * qty))
+
+  def prices_qty(self, qtys: 'Sequence[float] | np.ndarray') -> 'np.ndarray':
+    """Average fill price for each of `qtys` (NaN where the side is too thin)."""
+    import numpy as np
+    return self._prices(np.asarray(qtys, dtype=float), self.qty, by_notional=False)
+
+  def prices_notional(self, notionals: 'Sequence[float] | np.ndarray') -> 'np.ndarray':
+    """Average fill price for each of `notionals` (NaN where the side is too thin)."""
+    import numpy as np
+    return self._prices(np.asarray(notionals, dtype=float), self.notional, by_notional=True)
+
+  def _prices(self, xs: 'np.ndarray', cum: 'np.ndarray', *, by_notional: bool) -> 'np.ndarray':
+    import numpy as np
+    if len(cum) == 0:
+      return np.full(len(xs), np.nan)
+    i = np.searchsorted(cum, xs, side='left')
+    level = np.minimum(i, len(cum) - 1)
+    Q = np.where(level > 0, self.qty[level - 1], 0.0)
+    N = np.where(level > 0, self.notional[level - 1], 0.0)
+    price = self.price[level]
+    rest = (xs - N) / price if by_notional else xs - Q
+    with np.errstate(divide='ignore', invalid='ignore'):
+      out = (N + price * rest) / (Q + rest)
+    return np.where(i < len(cum), out, np.nan)
 
 
 def avg_price(entries: Sequence['Book.Entry']) -> Decimal:
@@ -239,7 +582,7 @@ def fill(entries: list[Book.Entry], *, qty: Decimal) -> Decimal | None:
       notional += e.qty*e.price
       qty -= e.qty
     else:
-      e.qty -= qty
+      entries[0] = Book.Entry(e.price, e.qty - qty)
       notional += qty*e.price
       qty = Decimal(0)
 
@@ -0,0 +1,230 @@
+from typing_extensions import Iterable, Sequence
+from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_left
+from decimal import Decimal
+
+from .book import Book, BookDiff
+
+@dataclass(frozen=True)
+class Grid:
+  """Converts decimal values to integer multiples of `unit` and back.
+
+  Parsed strings are memoized: feeds repeat the same price (and often size)
+  strings from message to message, and a dict hit is much cheaper than parsing.
+  """
+  unit: Decimal
+  inverse: float
+  """`1 / unit`, for parsing through `float`."""
+  cache_size: int = 65536
+  """Parsed strings to keep before the memo is cleared."""
+  cache: dict[str, int] = field(default_factory=dict, compare=False, repr=False)
+
+  @classmethod
+  def of(cls, unit: Decimal, *, cache_size: int = 65536) -> 'Grid':
+    if unit <= 0:
+      raise ValueError(f'Grid unit must be positive, got {unit}')
+    return cls(unit, float(1 / unit), cache_size)
+
+  def parse(self, value: str) -> int:
+    """Count of units in a decimal string.
+
+    Parsed through `float`, which is exact for counts below `2**40`. Raises
+    `ValueError` if `value` is off the grid by more than a thousandth of a unit.
+    """
+    try:
+      return self.cache[value]
+    except KeyError:
+      pass
+    x = float(value) * self.inverse
+    count = round(x)
+    if abs(x - count) > 1e-3:
+      raise ValueError(f'{value} is not a multiple of {self.unit}')
+    if len(self.cache) >= self.cache_size:
+      self.cache.clear()
+    self.cache[value] = count
+    return count
+
+  def decimal(self, count: int) -> Decimal:
+    """The value of `count` units."""
+    return count * self.unit
+
+  def refined(self, values: Iterable[str]) -> 'Grid':
+    """A grid whose unit divides `unit` and every one of `values`: the power of ten of
+    the finest decimal among them."""
+    exponent = min([self.unit.as_tuple().exponent, *(Decimal(v).as_tuple().exponent for v in values)]) # type: ignore
+    return Grid.of(Decimal(1).scaleb(exponent), cache_size=self.cache_size)
+
+
+@dataclass
+class TickSide:
+  """One side of a `TickBook`: levels sorted best first, in parallel integer arrays."""
+  sign: int
+  """`1` for asks, `-1` for bids: `keys` hold `sign * ticks`, so both sides sort ascending."""
+  keys: array = field(default_factory=lambda: array('q'))
+  steps: array = field(default_factory=lambda: array('q'))
+
+  def __len__(self) -> int:
+    return len(self.keys)
+
+  def ticks(self, i: int) -> int:
+    return self.sign * self.keys[i]
+
+  def set(self, ticks: int, steps: int) -> bool:
+    """Replace, insert or (if `steps <= 0`) remove a level. Returns whether the side changed."""
+    key = self.sign * ticks
+    i = bisect_left(self.keys, key)
+    found = i < len(self.keys) and self.keys[i] == key
+    if steps > 0:
+      if not found:
+        self.keys.insert(i, key)
+        self.steps.insert(i, steps)
+      elif self.steps[i] != steps:
+        self.steps[i] = steps
+      else:
+        return False
+      return True
+    elif found:
+      del self.keys[i]
+      del self.steps[i]
+      return True
+    return False
+
+  def reset(self, levels: Iterable[tuple[int, int]]):
+    """Replace every level."""
+    pairs = sorted((self.sign * ticks, steps) for ticks, steps in levels if steps > 0)
+    self.keys = array('q', [k for k, _ in pairs])
+    self.steps = array('q', [s for _, s in pairs])
+
+
+@dataclass
+class TickBook:
+  """Order book holding prices as tick counts and quantities as step counts.
+
+  A compact alternative to `Book` for maintaining a venue feed: levels live in
+  integer arrays (16 bytes per level rather than two `Decimal` objects), strings
+  are parsed once per distinct value, and sorting and diffing are integer operations. `Decimal` values are only
+  built at the API boundary: `to_book`, and the changes `update`/`replace` return.
+
+  Prices and quantities must lie on the `tick_size`/`step_size` grid (see `Grid`),
+  and their counts must fit in a signed 64-bit integer.
+  """
+  price: Grid
+  qty: Grid
+  bids: TickSide = field(default_factory=lambda: TickSide(-1))
+  asks: TickSide = field(default_factory=lambda: TickSide(1))
+
+  def parse(self, levels: Iterable[tuple[str, str]]) -> list[tuple[int, int]]:
+    """Parse `(price, qty)` strings into `(ticks, steps)`."""
+    price, qty = self.price.parse, self.qty.parse
+    prices, qtys = self.price.cache, self.qty.cache
+    return [(prices.get(p) or price(p), qtys.get(q) or qty(q)) for p, q in levels]
+
+  def entry(self, ticks: int, steps: int) -> Book.Entry:
+    return Book.Entry(self.price.decimal(ticks), self.qty.decimal(steps))
+
+  def update(self, *, bids: Iterable[tuple[str, str]] = (), asks: Iterable[tuple[str, str]] = ()) -> Book:
+    """Apply an incremental diff of `(price, qty)` strings (zero quantity: remove).
+
+    Returns the levels that actually changed, as a `Book` diff.
+    """
+    return Book(
+      bids=[self.entry(t, s) for t, s in self.parse(bids) if self.bids.set(t, s)],
+      asks=[self.entry(t, s) for t, s in self.parse(asks) if self.asks.set(t, s)],
+    )
+
+  def replace(self, *, bids: Iterable[tuple[str, str]], asks: Iterable[tuple[str, str]]) -> Book:
+    """Replace the book with a full snapshot of `(price, qty)` strings.
+
+    Returns the levels that changed against the previous state (zero quantity:
+    removed), as a `Book` diff.
+    """
+    bid_changes, ask_changes = self.replace_counts(bids=bids, asks=asks)
+    return self.diff(bid_changes, ask_changes)
+
+  def replace_counts(
+    self, *, bids: Iterable[tuple[str, str]], asks: Iterable[tuple[str, str]],
+  ) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    """`replace`, returning the changed levels as `(ticks, steps)` counts. Both sides
+    are parsed before either changes, so an off-grid level leaves the book as it was."""
+    bids, asks = self.parse(bids), self.parse(asks)
+    return self.replace_side(self.bids, bids), self.replace_side(self.asks, asks)
+
+  def replace_side(self, side: TickSide, levels: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    sign = side.sign
+    old = dict(zip(side.keys, side.steps))
+    new = {sign * ticks: steps for ticks, steps in levels if steps > 0}
+    changes = [(sign * key, steps) for key, steps in new.items() if old.pop(key, None) != steps]
+    changes.extend((sign * key, 0) for key in old)
+    keys = sorted(new)
+    side.keys = array('q', keys)
+    side.steps = array('q', map(new.__getitem__, keys))
+    return changes
+
+  def diff(self, bids: Iterable[tuple[int, int]], asks: Iterable[tuple[int, int]]) -> Book:
+    """Changed `(ticks, steps)` levels as a `Book` diff."""
+    return Book(bids=[self.entry(t, s) for t, s in bids], asks=[self.entry(t, s) for t, s in asks])
+
+  def refined(self, levels: Sequence[tuple[str, str]]) -> 'TickBook':
+    """An empty book on grids fine enough for `levels`."""
+    return TickBook(self.price.refined(p for p, _ in levels), self.qty.refined(q for _, q in levels))
+
+  def to_book(self, levels: int | None = None) -> Book:
+    """The book (or its top `levels` per side) as a `Book`."""
+    def side(s: TickSide) -> list[Book.Entry]:
+      n = len(s) if levels is None else min(levels, len(s))
+      return [self.entry(s.ticks(i), s.steps[i]) for i in range(n)]
+    return Book(bids=side(self.bids), asks=side(self.asks))
+
+
+@dataclass
+class TickLiveBook:
+  """A `LiveBook` stored as a `TickBook`, for venues sending full snapshots.
+
+  Only integer counts are kept. `Decimal` levels are built when a subscription
+  view reads them (`top`, `changes`, `snapshot`), and only for the levels it reads.
+  """
+  ticks: TickBook
+  seq: int = 0
+  counts: tuple[list[tuple[int, int]], list[tuple[int, int]]] | None = None
+  """`(ticks, steps)` levels changed by the last snapshot (`None`: the book was reset)."""
+
+  @property
+  def book(self) -> Book:
+    return self.ticks.to_book()
+
+  @property
+  def changes(self) -> Book | None:
+    """Levels changed by the last snapshot (`None`: the book was reset)."""
+    return None if self.counts is None else self.ticks.diff(*self.counts)
+
+  def top(self, levels: int | None = None) -> Book:
+    return self.ticks.to_book(levels)
+
+  def replace(self, *, bids: Sequence[tuple[str, str]], asks: Sequence[tuple[str, str]]):
+    """Replace the book with a newer full snapshot, recording the changed levels.
+
+    A level off the book's grids moves the book to grids fine enough for the
+    snapshot, and resets it (diff subscribers get a snapshot).
+    """
+    try:
+      counts = self.ticks.replace_counts(bids=bids, asks=asks)
+    except ValueError:
+      self.reset(bids=bids, asks=asks)
+      return
+    self.seq += 1
+    self.counts = counts
+
+  def reset(self, *, bids: Sequence[tuple[str, str]], asks: Sequence[tuple[str, str]]):
+    """Replace the book without recording changes (diff subscribers get a snapshot)."""
+    try:
+      self.ticks.replace_counts(bids=bids, asks=asks)
+    except ValueError:
+      self.ticks = self.ticks.refined([*bids, *asks])
+      self.ticks.replace_counts(bids=bids, asks=asks)
+    self.seq += 1
+    self.counts = None
+
+  def snapshot(self) -> BookDiff:
+    """The current state as a snapshot diff."""
+    return BookDiff(seq=self.seq, book=self.ticks.to_book(), snapshot=True)
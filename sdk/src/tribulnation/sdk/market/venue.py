@@ -5,7 +5,7 @@ from datetime import datetime
 
 from tribulnation.sdk.core import SDK, PaginatedResponse, OverflowPolicy
 from .types import (
-  Book,
+  Book, BookDiff,
   Collateral, PerpCollateral,
   NextFunding,
   Order, OrderResponse, OrderState,
@@ -74,6 +74,17 @@ class TradingVenue(SDK):
     market = await self.market(market_id)
     async with market.depth_stream(levels=levels, queue_size=queue_size, overflow=overflow) as stream:
       yield stream
+
+  @SDK.method
+  @asynccontextmanager
+  async def depth_diff_stream(
+    self, market_id: str, /, *, resync_every: int = 1000,
+    queue_size: int = 1000, overflow: OverflowPolicy = 'fail',
+  ) -> AsyncIterator[AsyncIterable[BookDiff]]:
+    """Subscribe to sequence-numbered order book diffs. See `Market.depth_diff_stream`."""
+    market = await self.market(market_id)
+    async with market.depth_diff_stream(resync_every=resync_every, queue_size=queue_size, overflow=overflow) as stream:
+      yield stream
   
   @SDK.method
   async def rules(self, market_id: str, /, *, refetch: bool = False) -> Rules:
@@ -0,0 +1,134 @@
+"""Tests for the stream-maintained dYdX position and collateral state."""
+
+import asyncio
+from decimal import Decimal
+
+from tribulnation.dydx.market.impl import AccountState
+
+
+def market(ticker: str, price: str) -> dict:
+  return {
+    'ticker': ticker, 'oraclePrice': Decimal(price), 'openInterest': Decimal(0),
+    'initialMarginFraction': Decimal('0.05'), 'maintenanceMarginFraction': Decimal('0.03'),
+  }
+
+
+def position(n: int, ticker: str, size: str, entry: str, status: str = 'OPEN') -> dict:
+  side = 'LONG' if Decimal(size) > 0 else 'SHORT'
+  return {'market': ticker, 'status': status, 'side': side, 'size': Decimal(size), 'entryPrice': Decimal(entry), 'subaccountNumber': n}
+
+
+def snapshot(*subaccounts: tuple[int, str, list[dict]]) -> dict:
+  return {'childSubaccounts': [
+    {
+      'subaccountNumber': n,
+      'openPerpetualPositions': {p['market']: p for p in positions},
+      'assetPositions': {'USDC': {'symbol': 'USDC', 'side': 'LONG', 'size': Decimal(usdc), 'subaccountNumber': n}},
+    }
+    for n, usdc, positions in subaccounts
+  ]}
+
+
+class Rest:
+  """Parent subaccount endpoint counting its calls."""
+  def __init__(self, snapshot: dict):
+    self.snapshot = snapshot
+    self.calls = 0
+
+  async def fetch(self):
+    self.calls += 1
+    return self.snapshot
+
+
+async def test_positions_and_collateral_follow_the_streams():
+  now = [0.0]
+  state = AccountState(reconcile_every=10, clock=lambda: now[0])
+  state.markets = {'BTC-USD': market('BTC-USD', '100'), 'ETH-USD': market('ETH-USD', '10')} # type: ignore
+  rest = Rest(snapshot(
+    (0, '1000', [position(0, 'BTC-USD', '2', '90')]),
+    (128, '50', [position(128, 'BTC-USD', '-1', '110')]),
+  ))
+  await state.synced(rest.fetch)
+  assert state.perp_position('BTC-USD').size == 1
+  assert state.perp_position('BTC-USD', 0).entry_price == 90
+  collateral = state.perp_collateral(0)
+  assert (collateral.equity, collateral.initial_margin) == (Decimal(1200), Decimal(10))
+
+  # A fill: long 1 ETH for 10 USDC, then BTC's oracle price moves.
+  state.apply({
+    'perpetualPositions': [position(0, 'ETH-USD', '1', '10')],
+    'assetPositions': [{'symbol': 'USDC', 'side': 'LONG', 'size': Decimal(990), 'subaccountNumber': 0}], # type: ignore
+    'blockHeight': '7',
+  })
+  account_at = state.updated_at
+  state.apply_markets({'oraclePrices': {'BTC-USD': {'oraclePrice': Decimal(110)}}}) # type: ignore
+  # Prices moving says nothing about whether the account stream is still current.
+  assert state.updated_at == account_at and state.prices_at is not None
+  await state.synced(rest.fetch)
+  collateral = state.perp_collateral(0)
+  assert collateral.equity == 990 + 2*110 + 10
+  assert collateral.free_collateral == collateral.equity - Decimal('0.05') * (2*110 + 10)
+  assert state.height == 7 and state.updated_at is not None
+  assert rest.calls == 1
+
+  state.apply({'perpetualPositions': [position(0, 'ETH-USD', '1', '10', status='CLOSED')]})
+  assert state.perp_position('ETH-USD').size == 0
+
+
+async def test_stream_updates_during_a_reconciliation_win():
+  now = [0.0]
+  state = AccountState(reconcile_every=10, clock=lambda: now[0])
+  state.markets = {'BTC-USD': market('BTC-USD', '100')} # type: ignore
+  fetching = asyncio.Event()
+  release = asyncio.Event()
+
+  async def fetch():
+    fetching.set()
+    await release.wait()
+    return snapshot((0, '1000', [position(0, 'BTC-USD', '1', '100')]))  # before the close
+
+  task = asyncio.ensure_future(state.synced(fetch))
+  await fetching.wait()
+  state.apply({'perpetualPositions': [position(0, 'BTC-USD', '1', '100', status='CLOSED')]})
+  release.set()
+  await task
+  assert state.perp_position('BTC-USD').size == 0
+  assert state.perp_collateral(0).equity == 1000
+
+  now[0] = 10  # stale: the next snapshot no longer lists the balance
+  await state.synced(Rest(snapshot()).fetch)
+  assert state.perp_collateral(0).equity == 0
+
+
+async def test_stream_end_falls_back_to_rest():
+  state = AccountState()
+
+  async def notifications():
+    yield {'blockHeight': '1'}
+
+  async def markets():
+    await asyncio.Event().wait()
+    yield {}
+
+  async with state.following(notifications(), markets(), initial_markets={'BTC-USD': market('BTC-USD', '1')}): # type: ignore
+    await asyncio.sleep(0)
+    assert not state.live and not state.fresh()
+    assert state.ended == {'account': None}
+
+
+async def test_stream_failure_is_recorded_with_its_stream():
+  state = AccountState()
+
+  async def notifications():
+    await asyncio.Event().wait()
+    yield {}
+
+  async def markets():
+    yield {}
+    raise ConnectionError('dropped')
+
+  async with state.following(notifications(), markets(), initial_markets={}): # type: ignore
+    await asyncio.sleep(0)
+    assert not state.live
+    assert list(state.ended) == ['markets']
+    assert isinstance(state.ended['markets'], ConnectionError)
@@ -0,0 +1,210 @@
+"""Deterministic tests for the `Book` order-book type."""
+
+from decimal import Decimal
+import dataclasses
+import random
+
+import pytest
+
+from tribulnation.sdk.market import Book, BookDiff, DiffView, FloatLadder, Grid, LiveBook, TickBook
+from tribulnation.sdk.market.types.book import diff_books
+
+
+def entries(*levels: tuple[str, str]) -> list[Book.Entry]:
+  """Build book entries from `(price, qty)` string pairs."""
+  return [Book.Entry(Decimal(p), Decimal(q)) for p, q in levels]
+
+
+def levels(side: list[Book.Entry]) -> list[tuple[Decimal, Decimal]]:
+  """Flatten a book side into comparable `(price, qty)` pairs."""
+  return [(e.price, e.qty) for e in side]
+
+
+def test_update_replaces_inserts_and_removes_levels():
+  """Apply a diff that touches existing, new and removed levels on both sides."""
+  book = Book(
+    bids=entries(('99', '1'), ('98', '2'), ('97', '3')),
+    asks=entries(('101', '1'), ('102', '2'), ('103', '3')),
+  )
+  book.update(Book(
+    bids=entries(('98', '5'), ('97.5', '1'), ('99', '0'), ('90', '0')),
+    asks=entries(('100.5', '4'), ('103', '0'), ('102', '7')),
+  ))
+
+  assert levels(book.bids) == [(Decimal('98'), Decimal('5')), (Decimal('97.5'), Decimal('1')), (Decimal('97'), Decimal('3'))]
+  assert levels(book.asks) == [(Decimal('100.5'), Decimal('4')), (Decimal('101'), Decimal('1')), (Decimal('102'), Decimal('7'))]
+  assert book.best_bid.price == Decimal('98')
+  assert book.market_buy_price(qty=Decimal('5')) == (Decimal('100.5') * 4 + Decimal('101')) / 5
+
+
+def test_update_matches_full_rebuild():
+  """Incremental updates agree with rebuilding the book from a price map."""
+  rng = random.Random(7)
+  book = Book()
+  bids: dict[Decimal, Decimal] = {}
+  asks: dict[Decimal, Decimal] = {}
+  for _ in range(300):
+    diff = Book(
+      bids=[Book.Entry(Decimal(rng.randint(80, 99)), Decimal(rng.randint(0, 3))) for _ in range(rng.randint(0, 5))],
+      asks=[Book.Entry(Decimal(rng.randint(101, 120)), Decimal(rng.randint(0, 3))) for _ in range(rng.randint(0, 5))],
+    )
+    for side, e in [(bids, e) for e in diff.bids] + [(asks, e) for e in diff.asks]:
+      if e.qty > 0:
+        side[e.price] = e.qty
+      else:
+        side.pop(e.price, None)
+    book.update(diff)
+
+    assert levels(book.bids) == sorted(bids.items(), reverse=True)
+    assert levels(book.asks) == sorted(asks.items())
+
+
+def test_copy_shares_entries_but_not_levels():
+  """A copy is unaffected by later updates and fills of the original."""
+  book = Book(bids=entries(('99', '1'), ('98', '2')), asks=entries(('101', '3')))
+  snapshot = book.copy()
+  assert snapshot.bids[0] is book.bids[0]
+
+  book.update(Book(bids=entries(('99', '0'), ('98.5', '4'))))
+  book.buy(qty=Decimal('1'))
+
+  assert levels(snapshot.bids) == [(Decimal('99'), Decimal('1')), (Decimal('98'), Decimal('2'))]
+  assert levels(snapshot.asks) == [(Decimal('101'), Decimal('3'))]
+  assert levels(book.asks) == [(Decimal('101'), Decimal('2'))]
+
+
+def random_book(rng: random.Random) -> Book:
+  """A random book with up to 10 levels per side."""
+  return Book(
+    bids=[Book.Entry(Decimal(p), Decimal(rng.randint(1, 3))) for p in rng.sample(range(80, 100), rng.randint(0, 10))],
+    asks=[Book.Entry(Decimal(p), Decimal(rng.randint(1, 3))) for p in rng.sample(range(101, 121), rng.randint(0, 10))],
+  )
+
+
+def test_diffs_replay_consecutive_snapshots():
+  """Replaying `DiffView` diffs of a replaced live book reproduces every snapshot."""
+  rng = random.Random(11)
+  view = DiffView(resync_every=7)
+  live = LiveBook(random_book(rng))
+  first = view(live)
+  assert first.snapshot and first.seq == 0
+  local = first.apply()
+
+  for _ in range(50):
+    book = random_book(rng)
+    live.replace(book)
+    diff = view(live)
+    assert diff.snapshot == (diff.seq % 7 == 0)
+    local = diff.apply(local)
+    assert levels(local.bids) == levels(book.bids)
+    assert levels(local.asks) == levels(book.asks)
+
+
+def test_diff_books_only_lists_changed_levels():
+  """Unchanged levels are omitted; removed levels come back with zero quantity."""
+  old = Book(bids=entries(('99', '1'), ('98', '2')), asks=entries(('101', '1')))
+  new = Book(bids=entries(('99', '1'), ('97', '2')), asks=entries(('101', '3')))
+  changes = diff_books(old, new)
+  assert levels(changes.bids) == [(Decimal('98'), Decimal('0')), (Decimal('97'), Decimal('2'))]
+  assert levels(changes.asks) == [(Decimal('101'), Decimal('3'))]
+
+  live = LiveBook(old)
+  live.reset(new)
+  assert DiffView()(live).snapshot
+  assert not BookDiff(seq=1, book=changes).snapshot
+
+
+def ragged_book(rng: random.Random, levels: int) -> Book:
+  """A book with uneven prices and quantities, `levels` per side."""
+  return Book(
+    bids=[Book.Entry(Decimal(100 - i) - Decimal(rng.randint(0, 9)) / 10, Decimal(rng.randint(1, 50)) / 10) for i in range(levels)],
+    asks=[Book.Entry(Decimal(101 + i) + Decimal(rng.randint(0, 9)) / 10, Decimal(rng.randint(1, 50)) / 10) for i in range(levels)],
+  )
+
+
+def test_batch_queries_match_single_queries():
+  """Batch cost queries return exactly what one query per size returns."""
+  rng = random.Random(3)
+  for levels in (0, 1, 25):
+    book = ragged_book(rng, levels)
+    qtys = [Decimal(rng.randint(1, 1000)) / 10 for _ in range(30)]
+    notionals = [Decimal(rng.randint(1, 100_000)) / 10 for _ in range(30)]
+    prices = [Decimal(rng.randint(700, 1300)) / 10 for _ in range(30)]
+
+    assert book.market_buy_prices(qtys=qtys) == [book.market_buy_price(qty=q) for q in qtys]
+    assert book.market_sell_prices(qtys=qtys) == [book.market_sell_price(qty=q) for q in qtys]
+    assert book.market_buy_prices(notionals=notionals) == [book.market_buy_price(notional=n) for n in notionals]
+    assert book.market_sell_prices(notionals=notionals) == [book.market_sell_price(notional=n) for n in notionals]
+    assert book.buyable_at_prices(prices) == [book.buyable_at(p) for p in prices]
+    assert book.sellable_at_prices(prices) == [book.sellable_at(p) for p in prices]
+
+
+def test_float_ladder_within_tolerance():
+  """The NumPy path agrees with the `Decimal` reference to the documented tolerance."""
+  np = pytest.importorskip('numpy')
+  book = ragged_book(random.Random(5), 200)
+  qtys = [Decimal(q) / 10 for q in range(1, 7000, 37)]
+  exact = book.market_buy_prices(qtys=qtys)
+  approx = FloatLadder.of(book.asks).prices_qty([float(q) for q in qtys])
+
+  for x, ref in zip(approx, exact):
+    if ref is None:
+      assert np.isnan(x)
+    else:
+      assert x == pytest.approx(float(ref), rel=1e-9)
+
+
+def test_grid_parses_strings_to_unit_counts():
+  """Grid counts are exact integers and round-trip through `decimal`."""
+  grid = Grid.of(Decimal('0.05'))
+  assert grid.parse('1.25') == 25
+  assert grid.parse('3') == 60
+  assert grid.parse('0.100') == 2
+  assert grid.parse('1e-1') == 2
+  assert grid.decimal(25) == Decimal('1.25')
+  with pytest.raises(ValueError):
+    grid.parse('1.26')
+  assert Grid.of(Decimal('10')).parse('120') == 12
+
+
+def test_tick_book_tracks_decimal_book():
+  """Integer updates and snapshot replacement agree with a `Decimal` book."""
+  rng = random.Random(13)
+  ticks = TickBook(Grid.of(Decimal('0.1')), Grid.of(Decimal('0.01')))
+  book = Book()
+  for i in range(100):
+    snapshot = i % 10 == 0
+    diff = Book(
+      bids=[Book.Entry(Decimal(rng.randint(800, 999)) / 10, Decimal(rng.randint(0 if not snapshot else 1, 300)) / 100) for _ in range(rng.randint(0, 8))],
+      asks=[Book.Entry(Decimal(rng.randint(1001, 1200)) / 10, Decimal(rng.randint(0 if not snapshot else 1, 300)) / 100) for _ in range(rng.randint(0, 8))],
+    )
+    raw = {
+      'bids': [(str(e.price), str(e.qty)) for e in diff.bids],
+      'asks': [(str(e.price), str(e.qty)) for e in diff.asks],
+    }
+    if snapshot:
+      full = Book(bids=list({e.price: e for e in diff.bids}.values()), asks=list({e.price: e for e in diff.asks}.values()))
+      raw = {
+        'bids': [(str(e.price), str(e.qty)) for e in full.bids],
+        'asks': [(str(e.price), str(e.qty)) for e in full.asks],
+      }
+      changes = ticks.replace(**raw)
+      book.update(changes)
+      expected = full
+    else:
+      changes = ticks.update(**raw)
+      book.update(diff)
+      expected = book
+    assert levels(ticks.to_book().bids) == levels(expected.bids)
+    assert levels(ticks.to_book().asks) == levels(expected.asks)
+    assert levels(book.bids) == levels(expected.bids)
+  assert levels(ticks.to_book(3).bids) == levels(book.bids[:3])
+
+
+def test_entries_are_frozen_so_copies_cannot_corrupt_each_other():
+  book = Book(asks=[Book.Entry(Decimal(100), Decimal(1))])
+  snapshot = book.copy()
+  with pytest.raises(dataclasses.FrozenInstanceError):
+    book.asks[0].qty = Decimal(0) # type: ignore
+  book.buy(qty=Decimal('0.5'))
+  assert snapshot.asks == [Book.Entry(Decimal(100), Decimal(1))]
@@ -0,0 +1,166 @@
+"""Venue-native bulk order placement and cancellation, against fake typed clients."""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from dydx.protos.dydxprotocol import clob
+from dydx.node.orders import PlacedOrder, PlacedOrders
+import pytest
+
+from tribulnation.sdk.core import ApiError
+from tribulnation.sdk.market import Order
+from tribulnation.hyperliquid.market.impl import orders as hyperliquid
+from tribulnation.mexc.market.impl import orders as mexc
+from tribulnation.dydx.market.impl import orders as dydx
+
+
+def ladder(n: int, type: str = 'LIMIT') -> list[Order]:
+  return [{'type': type, 'qty': Decimal(1), 'price': Decimal(100 - i)} for i in range(n)] # type: ignore
+
+
+@dataclass
+class FakeHyperliquidExchange:
+  actions: list[int] = field(default_factory=list)
+  oid: int = 0
+
+  async def order(self, *orders):
+    self.actions.append(len(orders))
+    statuses = []
+    for o in orders:
+      self.oid += 1
+      statuses.append({'error': 'price too far'} if o['p'] == '0' else {'resting': {'oid': self.oid}})
+    return {'status': 'ok', 'response': {'type': 'order', 'data': {'statuses': statuses}}}
+
+  async def cancel(self, *cancels):
+    self.actions.append(len(cancels))
+    return {'status': 'ok', 'response': {'type': 'cancel', 'data': {'statuses': ['success'] * len(cancels)}}}
+
+
+async def test_hyperliquid_ladder_is_one_action():
+  exchange = FakeHyperliquidExchange()
+  market = SimpleNamespace(asset_id=3, client=SimpleNamespace(exchange=exchange), shared=SimpleNamespace(order_store=None))
+  responses = await hyperliquid.place_orders(market, ladder(20)) # type: ignore
+  assert exchange.actions == [20]
+  assert [r.id for r in responses] == [str(i) for i in range(1, 21)]
+
+  await hyperliquid.place_orders(market, ladder(90)) # type: ignore
+  assert exchange.actions[1:] == [40, 40, 10]
+
+
+async def test_hyperliquid_rejection_raises_after_sending_the_batch():
+  exchange = FakeHyperliquidExchange()
+  market = SimpleNamespace(asset_id=3, client=SimpleNamespace(exchange=exchange), shared=SimpleNamespace(order_store=None))
+  with pytest.raises(ApiError):
+    await hyperliquid.place_orders(market, [*ladder(3), {'type': 'LIMIT', 'qty': 1, 'price': 0}]) # type: ignore
+  assert exchange.actions == [4]
+
+
+async def test_hyperliquid_cancels_are_one_action():
+  exchange = FakeHyperliquidExchange()
+  market = SimpleNamespace(asset_id=3, client=SimpleNamespace(exchange=exchange), shared=SimpleNamespace(order_store=None))
+  assert await hyperliquid.cancel_orders(market, [str(i) for i in range(20)]) == ['success'] * 20 # type: ignore
+  assert exchange.actions == [20]
+
+
+@dataclass
+class FakeMexcTrade:
+  requests: list[list[dict]] = field(default_factory=list)
+
+  async def batch_orders(self, *, batch_orders, recv_window=None, validate=None):
+    self.requests.append(batch_orders)
+    return [{'symbol': o['symbol'], 'orderId': f'{len(self.requests)}-{i}'} for i, o in enumerate(batch_orders)]
+
+  async def cancel_open_orders(self, *, symbol, recv_window=None, validate=None):
+    self.requests.append([{'cancel': symbol}])
+    return []
+
+
+async def test_mexc_ladder_is_chunked_to_the_batch_limit():
+  trade = FakeMexcTrade()
+  market = SimpleNamespace(
+    instrument='BTCUSDT',
+    client=SimpleNamespace(spot=SimpleNamespace(trade=trade)),
+    shared=SimpleNamespace(recv_window=None, validate=False, order_store=None),
+  )
+  responses = await mexc.place_orders(market, [*ladder(20), *ladder(5, 'POST_ONLY')]) # type: ignore
+  assert [len(r) for r in trade.requests] == [20, 5]
+  assert trade.requests[0][0] == {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT', 'quantity': '1', 'price': '100'}
+  assert trade.requests[1][0]['type'] == 'LIMIT_MAKER'
+  assert [r.id for r in responses][19:21] == ['1-19', '2-0']
+
+  await mexc.cancel_open_orders(market) # type: ignore
+  assert trade.requests[-1] == [{'cancel': 'BTCUSDT'}]
+
+
+@dataclass
+class FakeDydxNode:
+  txs: list[int] = field(default_factory=list)
+  client_id: int = 0
+  batch_cancels: list[int] = field(default_factory=list)
+
+  def build(self, params) -> clob.Order:
+    self.client_id += 1
+    flags = 0 if params['flags'] == 'SHORT_TERM' else 64
+    return clob.Order(order_id=clob.OrderId(client_id=self.client_id, order_flags=flags))
+
+  async def place_orders(self, orders):
+    assert all('good_til_block_time' in o['order'] for o in orders)
+    self.txs.append(len(orders))
+    return PlacedOrders(tx=None, orders=[self.build(o['order']) for o in orders]) # type: ignore
+
+  async def place_order(self, market, *, order, subaccount=0):
+    self.txs.append(1)
+    return PlacedOrder(tx=None, order=self.build(order)) # type: ignore
+
+  async def batch_cancel_orders(self, order_ids):
+    self.batch_cancels.append(len(order_ids))
+
+  @property
+  def tx(self):
+    return self
+
+  async def sign_and_broadcast(self, messages):
+    assert all(m.good_til_block_time for m in messages)
+    self.txs.append(len(messages))
+
+
+@dataclass
+class FakeTendermint:
+  calls: int = 0
+
+  async def get_latest_block(self):
+    self.calls += 1
+    header = SimpleNamespace(height=10, time=datetime(2026, 1, 1, tzinfo=timezone.utc))
+    return SimpleNamespace(block=SimpleNamespace(header=header))
+
+
+async def test_dydx_batches_stateful_orders_and_sends_short_term_alone():
+  node = FakeDydxNode()
+  tendermint = FakeTendermint()
+  market = SimpleNamespace(
+    perpetual_market={}, subaccount=0,
+    client=SimpleNamespace(node=node, chain=SimpleNamespace(tendermint=tendermint)),
+  )
+  responses = await dydx.place_orders(market, [*ladder(20), *ladder(2, 'MARKET')]) # type: ignore
+  assert node.txs == [20, 1, 1]
+  assert tendermint.calls == 1
+  ids = [dydx.parse_id(r.id) for r in responses]
+  assert [i.client_id for i in ids] == list(range(1, 23))
+  assert [i.order_flags for i in ids[-3:]] == [64, 0, 0]
+
+
+async def test_dydx_cancels_stateful_orders_in_multi_message_txs():
+  node = FakeDydxNode()
+  tendermint = FakeTendermint()
+  market = SimpleNamespace(client=SimpleNamespace(node=node, chain=SimpleNamespace(tendermint=tendermint)))
+  ids = [
+    dydx.serialize_id(clob.OrderId(client_id=i, order_flags=0 if i < 3 else 64))
+    for i in range(25)
+  ]
+  results = await dydx.cancel_orders(market, ids) # type: ignore
+  assert node.batch_cancels == [3]
+  assert node.txs == [20, 2]
+  assert tendermint.calls == 1
+  assert set(results) == {'short_term', 'long_term'}
@@ -0,0 +1,95 @@
+"""Tests for the incrementally maintained cross-venue `ConsolidatedBook`."""
+
+from decimal import Decimal
+import asyncio
+import random
+
+from tribulnation.sdk.market import Book, BookDiff, ConsolidatedBook, DiffView, LiveBook
+
+
+def entries(*levels: tuple[str, str]) -> list[Book.Entry]:
+  return [Book.Entry(Decimal(p), Decimal(q)) for p, q in levels]
+
+
+def levels(side: list[Book.Entry]) -> list[tuple[Decimal, Decimal]]:
+  return sorted((e.price, e.qty) for e in side)
+
+
+def random_book(rng: random.Random) -> Book:
+  return Book(
+    bids=[Book.Entry(Decimal(p), Decimal(rng.randint(1, 3))) for p in rng.sample(range(80, 100), rng.randint(0, 10))],
+    asks=[Book.Entry(Decimal(p), Decimal(rng.randint(1, 3))) for p in rng.sample(range(101, 121), rng.randint(0, 10))],
+  )
+
+
+def test_matches_re_merging_every_venue():
+  """Diff by diff, the consolidated book equals merging every fee-adjusted venue book."""
+  rng = random.Random(17)
+  fees = {'mexc': Decimal('0.001'), 'hyperliquid': Decimal('0.00045'), 'dydx': Decimal(0)}
+  view = DiffView(resync_every=10)
+  lives = {venue: LiveBook(random_book(rng)) for venue in fees}
+  book = ConsolidatedBook(fees=dict(fees))
+  for venue, live in lives.items():
+    book.apply(venue, view(live))
+
+  for _ in range(200):
+    venue = rng.choice(list(fees))
+    lives[venue].replace(random_book(rng))
+    book.apply(venue, view(lives[venue]))
+
+    merged = Book().merge(*(live.book.with_fees(fees[v]) for v, live in lives.items()))
+    assert levels(book.bids) == levels(merged.bids)
+    assert levels(book.asks) == levels(merged.asks)
+    assert [e.price for e in book.asks] == sorted(e.price for e in book.asks)
+    assert book.market_buy_price(qty=Decimal(5)) == merged.market_buy_price(qty=Decimal(5))
+    assert book.sellable_at(Decimal(90)) == merged.sellable_at(Decimal(90))
+
+
+def test_levels_are_attributed_to_their_venue():
+  book = ConsolidatedBook(fees={'a': Decimal('0.01')})
+  book.apply('a', BookDiff(seq=0, snapshot=True, book=Book(asks=entries(('100', '1'), ('102', '1')))))
+  book.apply('b', BookDiff(seq=0, snapshot=True, book=Book(asks=entries(('101', '1'), ('103', '1')))))
+  assert [(e.venue, e.venue_price, e.price) for e in book.asks[:2]] == [('a', 100, 101), ('b', 101, 101)] # type: ignore
+  assert book.buy_route(qty=Decimal('2.5')) == {'a': Decimal(1), 'b': Decimal('1.5')}
+  assert book.buy_route(qty=Decimal(5)) is None
+
+  # Same fee-adjusted price on both venues: only `b`'s level goes.
+  book.apply('b', BookDiff(seq=1, book=Book(asks=entries(('101', '0')))))
+  assert [(e.venue, e.price) for e in book.asks] == [('a', 101), ('b', 103), ('a', Decimal('103.02'))] # type: ignore
+
+
+def test_a_seq_gap_drops_the_venue_until_its_next_snapshot():
+  book = ConsolidatedBook()
+  book.apply('a', BookDiff(seq=0, snapshot=True, book=Book(bids=entries(('99', '1')))))
+  book.apply('b', BookDiff(seq=0, snapshot=True, book=Book(bids=entries(('98', '1')))))
+  book.apply('a', BookDiff(seq=2, book=Book(bids=entries(('97', '1')))))
+  assert [e.venue for e in book.bids] == ['b'] # type: ignore
+  book.apply('a', BookDiff(seq=3, book=Book(bids=entries(('96', '1')))))
+  assert [e.venue for e in book.bids] == ['b'] # type: ignore
+  book.apply('a', BookDiff(seq=4, snapshot=True, book=Book(bids=entries(('99', '2')))))
+  assert [(e.venue, e.qty) for e in book.bids] == [('a', 2), ('b', 1)] # type: ignore
+
+
+async def test_an_ended_or_failed_stream_drops_its_venue_and_is_recorded():
+  ended = asyncio.Event()
+
+  async def a():
+    yield BookDiff(seq=0, snapshot=True, book=Book(asks=entries(('100', '1'))))
+    await ended.wait()
+
+  async def b():
+    yield BookDiff(seq=0, snapshot=True, book=Book(asks=entries(('101', '1'))))
+
+  async def c():
+    yield BookDiff(seq=0, snapshot=True, book=Book(asks=entries(('102', '1'))))
+    raise ConnectionError('closed')
+
+  book = ConsolidatedBook()
+  async with book.following({'a': a(), 'b': b(), 'c': c()}):
+    await asyncio.sleep(0)
+    assert [e.venue for e in book.asks] == ['a'] # type: ignore
+    assert book.ended['b'] is None
+    assert isinstance(book.ended['c'], ConnectionError)
+    assert 'a' not in book.ended
+    ended.set()
+  assert book.asks == []
@@ -10,6 +10,8 @@ from tribulnation.hyperliquid.market.impl.collateral import (
   cross_collateral,
   isolated_collateral,
 )
+from tribulnation.hyperliquid.market.impl.depth import live_books
+from tribulnation.sdk.market import DiffView, Grid
 
 from conftest import load_venue_env
 from test_market import MarketTestPlan, test_market
@@ -82,6 +84,47 @@ def test_isolated_collateral_math() -> None:
   assert i.margin_mode == 'isolated'
 
 
+def _l2(bids: list[tuple[str, str]], asks: list[tuple[str, str]]) -> dict:
+  return {
+    'coin': 'BTC',
+    'levels': [
+      [{'px': px, 'sz': sz, 'n': 1} for px, sz in bids],
+      [{'px': px, 'sz': sz, 'n': 1} for px, sz in asks],
+    ],
+    'time': 0,
+  }
+
+
+async def test_l2_snapshots_become_live_book_diffs() -> None:
+  async def feed():
+    yield _l2([('100.5', '1'), ('100', '2')], [('101', '3')])
+    yield _l2([('100.5', '1'), ('99.5', '4')], [('101', '2.5')])
+
+  view = DiffView()
+  diffs = [view(live) async for live in live_books(feed(), price=Grid.of(Decimal('0.5')), qty=Grid.of(Decimal('0.1')))] # pyright: ignore[reportArgumentType]
+
+  assert diffs[0].snapshot
+  assert [(e.price, e.qty) for e in diffs[0].book.bids] == [(Decimal('100.5'), Decimal('1')), (Decimal('100'), Decimal('2'))]
+  assert not diffs[1].snapshot
+  assert [(e.price, e.qty) for e in diffs[1].book.bids] == [(Decimal('100'), Decimal('0')), (Decimal('99.5'), Decimal('4'))]
+  assert [(e.price, e.qty) for e in diffs[1].book.asks] == [(Decimal('101'), Decimal('2.5'))]
+
+
+async def test_off_grid_levels_refine_the_grid_and_resync() -> None:
+  async def feed():
+    yield _l2([('100.5', '1')], [('101', '3')])
+    yield _l2([('100.25', '1')], [('101', '3')])  # finer than the 0.5 grid
+    yield _l2([('100.25', '2')], [('101', '3')])
+
+  view = DiffView()
+  diffs = [view(live) async for live in live_books(feed(), price=Grid.of(Decimal('0.5')), qty=Grid.of(Decimal('0.1')))] # pyright: ignore[reportArgumentType]
+
+  assert [d.snapshot for d in diffs] == [True, True, False]
+  assert [(e.price, e.qty) for e in diffs[1].book.bids] == [(Decimal('100.25'), Decimal('1'))]
+  assert [(e.price, e.qty) for e in diffs[2].book.bids] == [(Decimal('100.25'), Decimal('2'))]
+  assert [d.seq for d in diffs] == [0, 1, 2]
+
+
 async def test_public_instance_constructs() -> None:
   """A public/no-credential venue instance constructs without error.
 
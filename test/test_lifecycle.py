@@ -239,3 +239,131 @@ async def test_exit_can_suppress_an_exception():
 
   async with Owns():
     raise RuntimeError('swallowed')
+
+
+# --- Resource pools -----------------------------------------------------------
+
+
+async def test_resource_pool_builds_each_key_once_and_follows_its_owner():
+  """Concurrent first uses share one resource; the owner's lifecycle enters and exits them."""
+  import asyncio
+  from tribulnation.sdk.core import ResourcePool
+
+  events: list[str] = []
+  built: list[str] = []
+
+  def create(name: str) -> Resource:
+    built.append(name)
+    return Resource(name, events)
+
+  @dataclass(frozen=True)
+  class Pooled(SDK):
+    pool: ResourcePool[str, Resource]
+    def resources(self):
+      yield self.pool.active()
+
+  owner = Pooled(ResourcePool())
+  # Outside the owner's context nothing would close a pooled resource: it is the caller's.
+  unpooled = await owner.pool.get('a', lambda: create('a'))
+  assert not owner.pool.members and events == []
+  async with owner:
+    a = await owner.pool.get('a', lambda: create('a'))
+    assert a is not unpooled
+    assert events == ['enter:a']
+    b1, b2 = await asyncio.gather(*(owner.pool.get('b', lambda: create('b')) for _ in range(2)))
+    assert b1 is b2
+    assert await owner.pool.get('a', lambda: create('a')) is a
+    assert events == ['enter:a', 'enter:b']
+  assert built == ['a', 'a', 'b']
+  assert events == ['enter:a', 'enter:b', 'exit:b', 'exit:a']
+  assert not owner.pool.members
+
+
+async def test_market_sdk_reuses_venues_while_entered():
+  from tribulnation.sdk import MarketSDK
+
+  sdk = MarketSDK()
+  assert await sdk.venue('mexc') is not await sdk.venue('mexc')
+  async with sdk:
+    assert await sdk.venue('mexc') is await sdk.venue('mexc')
+    with pytest.raises(ValueError, match='No account'):
+      await sdk.venue('missing')
+
+
+async def test_trading_markets_cache_resolved_markets_until_refetch():
+  from tribulnation.sdk.market import TradingMarkets
+
+  resolved: list[str] = []
+
+  class Market:
+    async def position(self):
+      return 0
+
+    async def rules(self, *, refetch: bool = False):
+      return refetch
+
+  class Markets(TradingMarkets):
+    async def venue(self, id: str, /):
+      raise NotImplementedError
+
+    async def venues(self):
+      return []
+
+    async def market(self, id: str, /):
+      resolved.append(id)
+      return Market()
+
+  sdk = Markets()
+  for _ in range(3):
+    await sdk.position('a:spot:X')
+  await sdk.position('b:spot:X')
+  assert resolved == ['a:spot:X', 'b:spot:X']
+
+  assert await sdk.rules('a:spot:X', refetch=True)
+  assert resolved == ['a:spot:X', 'b:spot:X', 'a:spot:X']
+
+  sdk.handles.invalidate('b')
+  assert list(sdk.handles.markets) == ['a:spot:X']
+  async with sdk:
+    pass
+  assert not sdk.handles.markets
+
+
+async def test_trading_markets_resolve_afresh_on_entry():
+  """A market resolved before entering must not keep its unpooled venue inside the context."""
+  from tribulnation.sdk.core import ResourcePool
+  from tribulnation.sdk.market import TradingMarkets
+
+  events: list[str] = []
+
+  @dataclass
+  class Market:
+    venue: Resource
+
+    async def position(self):
+      return self.venue
+
+  @dataclass(frozen=True)
+  class Markets(TradingMarkets):
+    pool: ResourcePool[str, Resource]
+
+    def resources(self):
+      yield from super().resources()
+      yield self.pool.active()
+
+    async def venue(self, id: str, /):
+      return await self.pool.get(id, lambda: Resource(id, events))
+
+    async def venues(self):
+      return []
+
+    async def market(self, id: str, /):
+      return Market(await self.venue(id.split(':', 1)[0]))
+
+  sdk = Markets(ResourcePool())
+  unpooled = await sdk.position('a:spot:X')
+  async with sdk:
+    pooled = await sdk.position('a:spot:X')
+    assert pooled is not unpooled
+    assert pooled is await sdk.venue('a')
+    assert events == ['enter:a']
@@ -14,7 +14,7 @@ import pytest
 from tribulnation.mexc.market.impl.depth import reconstruct_books, parse_snapshot, parse_update
 from tribulnation.mexc.market.impl.mixin import Shared
 from tribulnation.sdk.core import Subscription
-from tribulnation.sdk.market import Book
+from tribulnation.sdk.market import Book, BookDiff, BookView, DiffView, LiveBook
 
 
 def depth_item(price: str, quantity: str) -> PublicAggreDepthV3ApiItem:
@@ -113,9 +113,9 @@ class FakeClient:
     self.exited += 1
 
 
-def depth_subscription(client: FakeClient, symbol: str, source: FakeDepthSource) -> Subscription[Book]:
+def depth_subscription(client: FakeClient, symbol: str, source: FakeDepthSource) -> Subscription[LiveBook]:
   """Build the shared book subscription exactly as the mixin does in production:
-  reconstruct once upstream, fan out full `Book` snapshots."""
+  reconstruct once upstream, fan out views of the live book."""
   async def subscribe():
     return reconstruct_books(client, symbol, source), source.unsubscribe # pyright: ignore[reportArgumentType]
   return Subscription.of(subscribe)
@@ -158,7 +158,7 @@ async def test_mexc_depth_stream_recovers_after_version_gap() -> None:
   ])
   sub = depth_subscription(FakeClient(spot=FakeSpot(market_api)), 'BTCUSDT', source)
 
-  async with sub.subscribe(queue_size=1000, overflow='fail') as stream:
+  async with sub.subscribe(view=BookView(), queue_size=1000, overflow='fail') as stream:
     await source.send(depth_msg(11, 11, bids=[('100', '3')]))
     first = await next_book(stream)
 
@@ -171,6 +171,69 @@ async def test_mexc_depth_stream_recovers_after_version_gap() -> None:
   assert market_api.calls == [('BTCUSDT', None), ('BTCUSDT', None)]
 
 
+async def test_mexc_depth_stream_truncated_views_are_shared() -> None:
+  """Subscribers asking for the same `levels` share one truncated snapshot per update."""
+  source = FakeDepthSource()
+  market_api = FakeMarketApi([
+    snapshot(11, bids=[('100', '3'), ('99', '2'), ('98', '1')], asks=[('101', '1'), ('102', '2')]),
+  ])
+  sub = depth_subscription(FakeClient(spot=FakeSpot(market_api)), 'BTCUSDT', source)
+
+  async with sub.subscribe(view=BookView(1), queue_size=10, overflow='fail') as top_a, \
+    sub.subscribe(view=BookView(1), queue_size=10, overflow='fail') as top_b, \
+    sub.subscribe(view=BookView(), queue_size=10, overflow='fail') as full:
+    await source.send(depth_msg(11, 11))
+    a, b, book = await next_book(top_a), await next_book(top_b), await next_book(full)
+
+    await source.send(depth_msg(12, 12, bids=[('100', '0')]))
+    later = await next_book(top_a)
+
+  assert a is b
+  assert [e.price for e in a.bids] == [Decimal('100')]
+  assert [e.price for e in a.asks] == [Decimal('101')]
+  assert len(book.bids) == 3
+  assert [e.price for e in later.bids] == [Decimal('99')]
+
+
+async def next_diff(stream: AsyncIterable[BookDiff]) -> BookDiff:
+  """Read the next diff from a stream."""
+  return await asyncio.wait_for(anext(aiter(stream)), timeout=1)
+
+
+async def test_mexc_depth_diff_stream_joins_and_resyncs() -> None:
+  """Diff subscribers start from a snapshot, then see numbered diffs and resync snapshots."""
+  source = FakeDepthSource()
+  market_api = FakeMarketApi([
+    snapshot(11, bids=[('100', '3')], asks=[('101', '1')]),
+    snapshot(15, bids=[('98', '2')], asks=[('103', '5')]),
+  ])
+  sub = depth_subscription(FakeClient(spot=FakeSpot(market_api)), 'BTCUSDT', source)
+
+  async with sub.subscribe(view=BookView(), queue_size=10, overflow='fail') as books:
+    await source.send(depth_msg(11, 11))
+    await next_book(books)
+
+    async with sub.subscribe(view=DiffView(), join=LiveBook.snapshot, queue_size=10, overflow='fail') as diffs:
+      joined = await next_diff(diffs)
+      assert joined.snapshot and joined.seq == 0
+      local = joined.apply()
+
+      await source.send(depth_msg(12, 12, bids=[('100', '0'), ('99', '1')]))
+      diff = await next_diff(diffs)
+      assert not diff.snapshot and diff.seq == 1
+      assert [e.price for e in diff.book.bids] == [Decimal('100'), Decimal('99')]
+      local = diff.apply(local)
+
+      await source.send(depth_msg(14, 14))  # version gap: resync from the REST snapshot
+      await source.send(depth_msg(15, 16, bids=[('97', '1')]))
+      resync = await next_diff(diffs)
+      assert resync.snapshot and resync.seq == 2
+      local = resync.apply(local)
+
+  assert [(e.price, e.qty) for e in local.bids] == [(Decimal('98'), Decimal('2')), (Decimal('97'), Decimal('1'))]
+  assert local.best_ask.price == Decimal('103')
+
+
 async def test_mexc_depth_stream_unsubscribe_closes_source() -> None:
   """Tearing down the shared subscription unsubscribes the source exactly once."""
   source = FakeDepthSource()
@@ -179,7 +242,7 @@ async def test_mexc_depth_stream_unsubscribe_closes_source() -> None:
   ])
   sub = depth_subscription(FakeClient(spot=FakeSpot(market_api)), 'BTCUSDT', source)
 
-  async with sub.subscribe(queue_size=1, overflow='latest') as stream:
+  async with sub.subscribe(view=BookView(), queue_size=1, overflow='latest') as stream:
     await source.send(depth_msg(11, 11, bids=[('100', '3')]))
     await next_book(stream)
 
@@ -195,3 +258,28 @@ async def test_mexc_shared_context_keeps_streams_lazy() -> None:
     assert client.entered == 0
 
   assert client.exited == 0
+
+
+async def test_mexc_refetch_does_not_join_a_lazy_load_in_flight() -> None:
+  """A `refetch=True` load sends its own request rather than reusing an older one."""
+  release = asyncio.Event()
+  calls = 0
+
+  class Markets:
+    async def exchange_info(self, *, validate: bool = True):
+      nonlocal calls
+      calls += 1
+      version = calls
+      await release.wait()
+      return {'symbols': [{'symbol': 'BTCUSDT', 'version': version}]}
+
+  shared = Shared(client=FakeClient(spot=FakeSpot(Markets()))) # pyright: ignore[reportArgumentType]
+  lazy = asyncio.ensure_future(shared.load_markets())
+  await asyncio.sleep(0)
+  fresh = asyncio.ensure_future(shared.load_markets(refetch=True))
+  again = asyncio.ensure_future(shared.load_markets(refetch=True))
+  await asyncio.sleep(0)
+  release.set()
+  await asyncio.gather(lazy, fresh, again)
+  assert calls == 2
+  assert fresh.result()['BTCUSDT']['version'] == 2 # type: ignore
@@ -0,0 +1,168 @@
+"""Tests for the stream-maintained order state store."""
+
+import asyncio
+from decimal import Decimal
+
+from dydx.protos.dydxprotocol import clob, subaccounts
+
+from tribulnation.sdk.market import OrderState, OrderStore
+from tribulnation.hyperliquid.market.impl.orders import order_updates as hyperliquid_updates
+from tribulnation.dydx.market.impl.orders import parse_update, serialize_id
+
+
+def state(id: str, *, filled: str = '0', active: bool = True) -> OrderState:
+  return OrderState(id=id, price=Decimal(100), qty=Decimal(1), filled_qty=Decimal(filled), active=active)
+
+
+class Rest:
+  """Open orders endpoint counting its calls."""
+  def __init__(self, *orders: OrderState):
+    self.orders = list(orders)
+    self.calls = 0
+
+  async def open_orders(self):
+    self.calls += 1
+    return list(self.orders)
+
+  async def query_order(self):
+    self.calls += 1
+    return None
+
+
+async def test_reconciles_once_then_answers_from_memory():
+  now = [0.0]
+  store = OrderStore(reconcile_every=10, clock=lambda: now[0])
+  rest = Rest(state('a'), state('b'))
+  assert [o.id for o in await store.open_orders('BTC', rest.open_orders)] == ['a', 'b']
+
+  store.update(state('a', filled='1', active=False), 'BTC')
+  store.update(state('c'), 'BTC')
+  assert [o.id for o in await store.open_orders('BTC', rest.open_orders)] == ['b', 'c']
+  assert await store.query_order('BTC', 'a', rest.query_order, rest.open_orders) == state('a', filled='1', active=False)
+  assert rest.calls == 1
+
+  now[0] = 10  # stale: reconcile, 'b' is gone
+  rest.orders = [state('c')]
+  assert [o.id for o in await store.open_orders('BTC', rest.open_orders)] == ['c']
+  assert store.get('b') == state('b', active=False)
+  assert rest.calls == 2
+
+
+async def test_stream_updates_during_a_fetch_win():
+  store = OrderStore()
+  fetching = asyncio.Event()
+  release = asyncio.Event()
+
+  async def fetch():
+    fetching.set()
+    await release.wait()
+    return [state('a')]  # listed before it filled
+
+  task = asyncio.ensure_future(store.open_orders('BTC', fetch))
+  await fetching.wait()
+  store.update(state('a', filled='1', active=False), 'BTC')
+  release.set()
+  assert [o.id for o in await task] == ['a']
+  assert await store.open_orders('BTC', fetch) == []
+
+
+async def test_query_order_alone_reconciles_then_answers_from_memory():
+  store = OrderStore(reconcile_every=10, clock=lambda: 0)
+  rest = Rest(state('a'))
+  for _ in range(3):
+    assert await store.query_order('BTC', 'a', rest.query_order, rest.open_orders) == state('a')
+  assert rest.calls == 1
+  eth = Rest()
+  assert await store.query_order('ETH', 'a', eth.query_order, eth.open_orders) is None
+  assert eth.calls == 1  # listed, and 'a' is known to be BTC's
+
+
+async def test_placements_survive_a_listing_fetched_before_them():
+  store = OrderStore()
+  fetching = asyncio.Event()
+  release = asyncio.Event()
+
+  async def fetch():
+    fetching.set()
+    await release.wait()
+    return []
+
+  task = asyncio.ensure_future(store.open_orders('BTC', fetch))
+  await fetching.wait()
+  store.add('BTC', state('a'))
+  release.set()
+  await task
+  assert [o.id for o in await store.open_orders('BTC', fetch)] == ['a']
+
+
+async def test_updates_of_unknown_markets_wait_for_reconciliation():
+  store = OrderStore()
+  store.update(state('a'))
+  assert store.get('a') is None
+  store.add('BTC', state('a'))
+  store.update(state('a', filled='0.5'))
+  assert store.get('a') == state('a', filled='0.5')
+
+
+async def test_stream_end_falls_back_to_rest():
+  store = OrderStore()
+  rest = Rest(state('a'))
+  queue: asyncio.Queue = asyncio.Queue()
+
+  async def updates():
+    while (batch := await queue.get()) is not None:
+      yield batch
+
+  async with store.following(updates()):
+    await store.open_orders('BTC', rest.open_orders)
+    await queue.put([('BTC', state('b'))])
+    await queue.put(None)
+    await asyncio.sleep(0)
+    assert not store.live and store.error is None
+    await store.open_orders('BTC', rest.open_orders)
+    assert rest.calls == 2
+
+
+async def test_stream_failure_is_recorded():
+  store = OrderStore()
+
+  async def updates():
+    yield [('BTC', state('a'))]
+    raise ConnectionError('dropped')
+
+  async with store.following(updates()):
+    await asyncio.sleep(0)
+    assert not store.live
+    assert isinstance(store.error, ConnectionError)
+
+
+async def test_hyperliquid_order_updates_are_keyed_by_coin():
+  async def messages():
+    yield [{
+      'order': {'coin': 'BTC', 'side': 'B', 'limitPx': '100', 'sz': '0.4', 'oid': 7, 'timestamp': 0, 'origSz': '1'},
+      'status': 'open', 'statusTimestamp': 0,
+    }]
+  [[(market, order)]] = [batch async for batch in hyperliquid_updates(messages())] # type: ignore
+  assert market == 'BTC'
+  assert (order.id, order.filled_qty, order.active) == ('7', Decimal('0.6'), True)
+
+
+def test_dydx_partial_order_messages_fill_in_from_the_store():
+  store = OrderStore()
+  msg = {
+    'id': 'uuid', 'subaccountId': 'sub', 'clientId': '5', 'clobPairId': '0', 'side': 'SELL',
+    'size': Decimal(2), 'type': 'LIMIT', 'timeInForce': 'GTT', 'status': 'OPEN',
+    'orderFlags': '64', 'subaccountNumber': 0,
+  }
+  assert parse_update(msg, address='dydx1', store=store) is None # type: ignore
+
+  id = serialize_id(clob.OrderId(
+    client_id=5, order_flags=64, clob_pair_id=0,
+    subaccount_id=subaccounts.SubaccountId(owner='dydx1', number=0),
+  ))
+  store.add('BTC-USD', OrderState(id=id, price=Decimal(50), qty=Decimal(-2), filled_qty=Decimal(0), active=True))
+  update = parse_update({**msg, 'totalFilled': Decimal(2), 'status': 'FILLED'}, address='dydx1', store=store) # type: ignore
+  assert update is not None
+  market, order = update
+  assert market is None
+  assert (order.price, order.filled_qty, order.active) == (Decimal(50), Decimal(-2), False)
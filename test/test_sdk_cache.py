@@ -0,0 +1,95 @@
+"""Tests for the TTL response cache middleware."""
+
+import asyncio
+
+import pytest
+
+from tribulnation.sdk.core import CachePolicy, ResponseCache
+from tribulnation.sdk.core.invocations import Context, SDK
+
+
+class Exchange(SDK):
+  def __init__(self):
+    self.calls = 0
+
+  @SDK.method
+  async def tickers(self, market: str = 'BTC') -> int:
+    self.calls += 1
+    return self.calls
+
+  @SDK.method
+  async def balance(self) -> int:
+    self.calls += 1
+    return self.calls
+
+
+async def test_results_are_served_until_ttl_and_uncached_methods_pass_through():
+  exchange = Exchange()
+  clock = [1000.0]
+  store = ResponseCache(clock=lambda: clock[0])
+  with Context().cached({'tickers': 10}, store=store).use():
+    assert [await exchange.tickers(), await exchange.tickers(), await exchange.tickers('ETH')] == [1, 1, 2]
+    assert await exchange.balance() == 3
+    assert await exchange.balance() == 4
+    clock[0] += 11
+    assert await exchange.tickers() == 5
+
+    store.invalidate('tickers')
+    assert await exchange.tickers('ETH') == 6
+
+
+async def test_stale_results_are_served_while_refreshing():
+  exchange = Exchange()
+  clock = [1000.0]
+  store = ResponseCache(clock=lambda: clock[0])
+  with Context().cached({'tickers': CachePolicy(ttl=10, stale=30)}, store=store).use():
+    assert await exchange.tickers() == 1
+    clock[0] += 15
+    assert await exchange.tickers() == 1  # stale, refresh started
+    await asyncio.gather(*store.refreshes)
+    assert await exchange.tickers() == 2
+    clock[0] += 100
+    assert await exchange.tickers() == 3  # too stale: fetched inline
+
+
+def test_lru_evicts_least_recently_used():
+  store = ResponseCache(max_size=2)
+  store.put('a', 1)
+  store.put('b', 2)
+  store.get('a')
+  store.put('c', 3)
+  assert list(store.entries) == ['a', 'c']
+
+
+async def test_invalidate_matches_nested_paths_and_discards_calls_in_flight():
+  store = ResponseCache()
+  store.put((('market', 'rules'), 1, (), frozenset()), 'old')
+  store.put((('tickers',), 1, (), frozenset()), 'kept')
+  started = asyncio.Event()
+  release = asyncio.Event()
+
+  async def fetch():
+    started.set()
+    await release.wait()
+    return 'stale'
+
+  key = (('rules',), 1, (), frozenset())
+  task = asyncio.ensure_future(store.fetch(key, fetch))
+  await started.wait()
+  store.invalidate('rules')
+  release.set()
+  assert await task == 'stale'
+  assert [k[0] for k in store.entries] == [('tickers',)]
+
+
+async def test_entries_are_not_served_to_other_objects():
+  store = ResponseCache()
+  with Context().cached({'tickers': 10}, store=store).use():
+    a, b = Exchange(), Exchange()
+    assert await a.tickers() == 1
+    key, = store.entries
+    entry = store.entries.pop(key)
+    # As if `b` took over `a`'s id: the entry still names `a` as its owner.
+    store.entries[(key[0], id(b), *key[2:])] = entry
+    assert await b.tickers() == 1
+    assert b.calls == 1
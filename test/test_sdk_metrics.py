@@ -0,0 +1,48 @@
+"""Tests for the metrics middleware and its in-process registry."""
+
+import pytest
+
+from tribulnation.sdk.core.invocations import Context, MetricsRegistry, SDK
+
+
+class Venue(SDK):
+  """A stand-in SDK exposing a coroutine and an async-generator method."""
+
+  @SDK.method
+  async def price(self, fail: bool = False) -> int:
+    if fail:
+      raise KeyError('missing')
+    return 1
+
+  @SDK.method
+  async def pages(self, n: int):
+    for i in range(n):
+      yield [i]
+
+
+async def test_coroutine_calls_and_errors_are_recorded_per_path():
+  registry = MetricsRegistry()
+  venue = Venue()
+  with Context(path=('venue',)).measured(registry).use():
+    assert await venue.price() == 1
+    with pytest.raises(KeyError):
+      await venue.price(fail=True)
+
+  m = registry.get(('venue', 'price'))
+  assert m.calls == 2
+  assert m.errors == {'KeyError': 1}
+  assert m.latency.count == 2
+  assert registry.dump()['venue.price']['calls'] == 2
+
+
+async def test_async_generator_records_first_item_and_item_count():
+  registry = MetricsRegistry()
+  venue = Venue()
+  with Context().measured(registry).use():
+    assert [page async for page in venue.pages(3)] == [[0], [1], [2]]
+
+  m = registry.get(('pages',))
+  assert (m.calls, m.items, m.first_item.count, m.latency.count) == (1, 3, 1, 1)
+  assert m.first_item.max <= m.latency.max
+  assert m.latency.quantile(0.5) is not None
+  assert [path for path, _ in registry.slowest()] == ['pages']
@@ -0,0 +1,107 @@
+"""Tests for the weighted token-bucket limiter and its middleware."""
+
+import asyncio
+
+import pytest
+
+from tribulnation.sdk.core import RateLimiter, Weight
+from tribulnation.sdk.core.invocations import Context, SDK
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+  """Capture limiter waits without sleeping."""
+  delays: list[float] = []
+  async def sleep(delay: float):
+    delays.append(delay)
+  monkeypatch.setattr(asyncio, 'sleep', sleep)
+  return delays
+
+
+async def test_acquire_waits_for_refill_and_response_weight_becomes_debt(sleeps: list[float]):
+  limiter = RateLimiter(capacity=10, per=1)
+  await limiter.acquire(10)
+  assert sleeps == []
+  limiter.charge(5)  # weight known only from the response
+  await limiter.acquire(5)
+  assert sleeps[0] == pytest.approx(1, abs=0.01)  # 10 weight of debt at 10/s
+
+
+class Venue(SDK):
+  @SDK.method
+  async def fills(self) -> list[int]:
+    return list(range(40))
+
+  @SDK.method
+  async def pages(self):
+    for i in range(3):
+      yield [i]
+
+
+async def test_middleware_charges_per_method_weights(sleeps: list[float]):
+  limiter = RateLimiter(capacity=100, per=1)
+  weights = {'fills': Weight(20, response=lambda fills: len(fills) // 20), 'pages': 5}
+  with Context().rate_limited(limiter, weights).use():
+    await Venue().fills()
+    assert [page async for page in Venue().pages()] == [[0], [1], [2]]
+  # 20 + 2 for fills; 5 per page, the step finding no more refunded.
+  assert limiter.tokens == pytest.approx(100 - 22 - 15, abs=0.5)
+  assert sleeps == []
+
+
+async def test_a_caller_cancelled_while_waiting_gets_its_weight_back():
+  limiter = RateLimiter(capacity=10, per=1)
+  await limiter.acquire(10)
+  waiter = asyncio.ensure_future(limiter.acquire(10))
+  await asyncio.sleep(0)
+  waiter.cancel()
+  with pytest.raises(asyncio.CancelledError):
+    await waiter
+  assert limiter.tokens == pytest.approx(0, abs=0.5)
+
+
+def test_shared_limiters_are_per_name():
+  a = RateLimiter.shared('test-venue', capacity=5, per=1)
+  assert RateLimiter.shared('test-venue', capacity=5, per=1) is a
+  assert RateLimiter.shared('other-venue', capacity=5, per=1) is not a
+
+
+async def test_hyperliquid_info_requests_draw_documented_weights():
+  from tribulnation.hyperliquid.core.rate_limits import RateLimitedInfoClient
+
+  class Transport:
+    async def request(self, params):
+      return [{}] * 45 if params['type'] == 'userFillsByTime' else {}
+
+  limiter = RateLimiter(capacity=1200, per=60)
+  client = RateLimitedInfoClient(client=Transport(), limiter=limiter) # type: ignore
+  await client.request({'type': 'l2Book', 'coin': 'BTC'})
+  await client.request({'type': 'userFillsByTime', 'user': '0x0'})
+  assert limiter.tokens == pytest.approx(1200 - 2 - 20 - 3, abs=0.5)
+
+
+async def test_hyperliquid_history_streams_each_source_as_it_completes():
+  from tribulnation.hyperliquid.report.history.main import History
+
+  release = asyncio.Event()
+  cancelled = []
+
+  def source(name: str, slow: bool = False):
+    async def fetch(start, end):
+      try:
+        if slow:
+          await release.wait()
+        return [name]
+      except asyncio.CancelledError:
+        cancelled.append(name)
+        raise
+    return fetch
+
+  history = History(object(), '0xabc') # type: ignore
+  history.trades = source('trades', slow=True) # type: ignore
+  history.funding, history.ledger, history.staking = source('funding'), source('ledger'), source('staking') # type: ignore
+  records = history.history()
+  # Fast sources stream out while the slow one is still fetching.
+  assert {await anext(records) for _ in range(3)} == {'funding', 'ledger', 'staking'}
+  await records.aclose()
+  assert cancelled == ['trades']
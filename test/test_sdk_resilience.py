@@ -0,0 +1,110 @@
+"""Tests for the circuit breaker and hedged-request middleware."""
+
+import asyncio
+
+import pytest
+
+from tribulnation.sdk.core import (
+  SDK, Context, BadRequest, CircuitOpen, NetworkError, BreakerPolicy, CircuitBreaker,
+)
+
+
+class Venue(SDK):
+  """Venue whose calls fail or stall on demand."""
+  def __init__(self):
+    self.calls = 0
+    self.fail: type[Exception] | None = None
+    self.delays: list[float] = []
+
+  @SDK.method
+  async def depth(self) -> int:
+    self.calls += 1
+    call = self.calls
+    if self.delays:
+      await asyncio.sleep(self.delays.pop(0))
+    if self.fail is not None:
+      raise self.fail
+    return call
+
+
+async def test_breaker_opens_fails_fast_and_closes_after_a_probe():
+  now = [0.0]
+  breaker = CircuitBreaker(BreakerPolicy(failures=2, cooldown=10), clock=lambda: now[0])
+  venue = Venue()
+  with Context().guarded(breaker).use():
+    venue.fail = BadRequest
+    for _ in range(3):
+      with pytest.raises(BadRequest):
+        await venue.depth()
+    assert set(breaker.states().values()) == {'closed'}
+
+    venue.fail = NetworkError
+    for _ in range(2):
+      with pytest.raises(NetworkError):
+        await venue.depth()
+    with pytest.raises(CircuitOpen):
+      await venue.depth()
+    assert venue.calls == 5
+
+    now[0] += 10  # half-open: the probe fails and reopens the circuit
+    with pytest.raises(NetworkError):
+      await venue.depth()
+    with pytest.raises(CircuitOpen):
+      await venue.depth()
+
+    now[0] += 10
+    venue.fail = None
+    assert await venue.depth() == 7
+    assert await venue.depth() == 8
+    assert set(breaker.states().values()) == {'closed'}
+
+
+async def test_slow_calls_count_as_failures():
+  breaker = CircuitBreaker(BreakerPolicy(failures=1, slow=0.01))
+  venue = Venue()
+  venue.delays = [0.02]
+  with Context().guarded(breaker).use():
+    assert await venue.depth() == 1
+    with pytest.raises(CircuitOpen):
+      await venue.depth()
+
+
+async def test_slow_calls_are_hedged_within_budget():
+  venue = Venue()
+  with Context().hedged(['depth'], min_samples=5, budget=0.5).use():
+    for _ in range(5):
+      await venue.depth()
+    venue.delays = [1, 0]
+    # The first call stalls past the usual latency; the hedge answers first.
+    assert await asyncio.wait_for(venue.depth(), 0.5) == 7
+    assert venue.calls == 7
+
+
+class VenueMarket(Venue):
+  """Market of a venue: markets sharing `shared` share their endpoints."""
+  def __init__(self, shared: object):
+    super().__init__()
+    self.shared = shared
+
+  def venue_identity(self) -> object:
+    return self.shared
+
+
+async def test_markets_of_a_venue_share_circuits_until_it_is_collected():
+  breaker = CircuitBreaker(BreakerPolicy(failures=1))
+
+  class Shared:
+    pass
+
+  shared = Shared()
+  btc, eth = VenueMarket(shared), VenueMarket(shared)
+  with Context().guarded(breaker).use():
+    btc.fail = NetworkError
+    with pytest.raises(NetworkError):
+      await btc.depth()
+    with pytest.raises(CircuitOpen):
+      await eth.depth()
+    assert eth.calls == 0
+
+    del btc, eth, shared
+    assert breaker.states() == {}
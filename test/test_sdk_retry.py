@@ -6,6 +6,7 @@ import math
 
 import pytest
 
+from tribulnation.sdk.core import PaginatedResponse
 from tribulnation.sdk.core.invocations import Context, SDK
 from tribulnation.sdk.core.invocations.middleware import full_jitter, retry
 
@@ -197,3 +198,208 @@ async def test_default_retry_logger_excludes_sensitive_values(
   assert 'repr-secret' not in output
   assert 'argument-secret' not in output
   assert 'secret-key' not in output
+
+
+class Sweep(SDK):
+  """Paginated history whose pages fail once each at chosen points."""
+  def __init__(self, pages: list[list[int]], *, fail_at: set[int]):
+    self.pages = pages
+    self.fail_at = fail_at
+    self.fetched: list[int] = []
+
+  async def fetch(self, cursor: int) -> tuple[list[int], int | None]:
+    """Fetch page `cursor`, failing the first time if listed in `fail_at`."""
+    if cursor in self.fail_at:
+      self.fail_at.discard(cursor)
+      raise RetriableError
+    self.fetched.append(cursor)
+    return self.pages[cursor], (cursor + 1 if cursor + 1 < len(self.pages) else None)
+
+  @SDK.method
+  def cursored(self) -> PaginatedResponse[int]:
+    return PaginatedResponse.cursored(self.fetch, 0)
+
+  @SDK.method
+  def checkpointed(self) -> PaginatedResponse[int]:
+    async def since(start: int):
+      """Pages of items `>= start` (each item is its own checkpoint)."""
+      for i, page in enumerate(self.pages):
+        if page[-1] < start:
+          continue
+        if i in self.fail_at:
+          self.fail_at.discard(i)
+          raise RetriableError
+        self.fetched.append(i)
+        yield [x for x in page if x >= start]
+    return PaginatedResponse.checkpointed(since, 0, lambda x: x)
+
+  @SDK.method
+  @PaginatedResponse.lift
+  async def plain(self):
+    cursor = 0
+    while cursor is not None:
+      page, cursor = await self.fetch(cursor)
+      yield page
+
+
+RETRY_NOW = Context().retried(RetriableError, max_retries=1, base_delay=0)
+
+
+async def test_cursored_pages_resume_after_the_last_delivered_page():
+  sweep = Sweep([[1, 2], [3], [4, 5]], fail_at={2})
+  with RETRY_NOW.use():
+    assert await sweep.cursored() == [1, 2, 3, 4, 5]
+  assert sweep.fetched == [0, 1, 2]
+
+
+async def test_checkpointed_pages_resume_without_duplicates():
+  sweep = Sweep([[1, 2, 2], [2, 3], [4]], fail_at={1, 2})
+  with RETRY_NOW.use():
+    assert await sweep.checkpointed() == [1, 2, 2, 3, 4]
+  # Resumed from the last checkpoint (2, then 3), refetching the page holding it.
+  assert sweep.fetched == [0, 0, 1, 1, 2]
+
+
+async def test_non_resumable_pages_are_retried_only_until_the_first_page():
+  with RETRY_NOW.use():
+    assert await Sweep([[1], [2]], fail_at={0}).plain() == [1, 2]
+    with pytest.raises(RetriableError):
+      await Sweep([[1], [2]], fail_at={1}).plain()
+
+
+async def test_async_generators_are_retried_until_their_first_item():
+  attempts = 0
+
+  class Feed(SDK):
+    @SDK.method
+    async def items(self) -> AsyncIterator[int]:
+      nonlocal attempts
+      attempts += 1
+      if attempts == 1:
+        raise RetriableError
+      yield 1
+      if attempts == 2:
+        raise RetriableError
+      yield 2
+
+  with RETRY_NOW.use():
+    with pytest.raises(RetriableError):
+      [x async for x in Feed().items()]
+  assert attempts == 2
+
+
+async def test_middleware_chains_are_compiled_once_per_context_path():
+  """Each context path binds a method's middleware once and reuses it."""
+  bound: list[tuple[str, ...]] = []
+
+  def counting(fn, ctx):
+    bound.append(ctx.path)
+    return fn
+
+  class Venue(SDK):
+    @SDK.method
+    async def place_order(self) -> str:
+      return 'ok'
+
+    @SDK.method
+    async def replace_order(self) -> str:
+      return await self.place_order()
+
+  venue = Venue()
+  ctx = Context().add(counting)
+  with ctx.use():
+    for _ in range(3):
+      await venue.place_order()
+      await venue.replace_order()
+
+  assert bound == [('place_order',), ('replace_order',), ('replace_order', 'place_order')]
+  assert ctx.child('replace_order').child('place_order') == Context(middleware=(counting,), path=('replace_order', 'place_order'))
+
+
+async def test_deadline_cancels_the_call_and_cuts_retries_short():
+  """A `within` budget bounds a call, its nested calls and its retries."""
+  from tribulnation.sdk.core import DeadlineExceeded
+  attempts = 0
+
+  class Venue(SDK):
+    @SDK.method
+    async def place_order(self, delay: float) -> str:
+      nonlocal attempts
+      attempts += 1
+      await asyncio.sleep(delay)
+      raise RetriableError
+
+    @SDK.method
+    async def replace_order(self, delay: float) -> str:
+      return await self.place_order(delay)
+
+  venue = Venue()
+  ctx = Context().add(retry(RetriableError, base_delay=0.05, jitter=None, log=None))
+
+  with ctx.within(0.02).use():
+    with pytest.raises(DeadlineExceeded):
+      await venue.replace_order(1)
+  assert attempts == 1
+
+  attempts = 0
+  with ctx.within(0.15).use():
+    # Backoff of 0.1s, then 0.2s: the second would outlast the budget.
+    with pytest.raises(RetriableError):
+      await venue.place_order(0)
+  assert attempts == 2
+
+  assert Context().within(10).within(1).remaining <= 1  # type: ignore
+
+
+async def test_deadline_contexts_share_compiled_chains():
+  """`within` keeps the memo: a per-request deadline does not recompile middleware."""
+  bound: list[tuple[str, ...]] = []
+
+  def counting(fn, ctx):
+    bound.append(ctx.path)
+    return fn
+
+  class Venue(SDK):
+    @SDK.method
+    async def place_order(self) -> str:
+      return 'ok'
+
+  venue = Venue()
+  ctx = Context().add(counting)
+  for _ in range(3):
+    with ctx.within(1).use():
+      await venue.place_order()
+  assert bound == [('place_order',)]
+  assert ctx.within(1).child('place_order').deadline is not None
+  assert ctx.child('place_order').deadline is None
+
+
+async def test_deadline_bounds_every_page_of_generators_and_paginated_responses():
+  """The budget spans the whole iteration, not just the call creating the generator."""
+  from tribulnation.sdk.core import DeadlineExceeded, PaginatedResponse
+
+  class Venue(SDK):
+    @SDK.method
+    async def fills(self):
+      for i in range(3):
+        await asyncio.sleep(0 if i < 2 else 1)  # not an SDK call: only the step is bounded
+        yield [i]
+
+    @SDK.method
+    async def nested(self):
+      async for page in self.fills():
+        yield page
+
+    @SDK.method
+    def trades(self) -> PaginatedResponse[int]:
+      return PaginatedResponse.lift(self.fills.__wrapped__)(self) # type: ignore
+
+  venue = Venue()
+  for pages in (venue.fills, venue.nested, venue.trades):
+    got = []
+    with Context().within(0.05).use():
+      with pytest.raises(DeadlineExceeded):
+        async for page in pages():
+          got.append(page)
+    assert got == [[0], [1]]
+  assert Context.current() is None
@@ -0,0 +1,80 @@
+"""Tests for single-flight call coalescing."""
+
+import asyncio
+
+from tribulnation.sdk.core import SingleFlight
+from tribulnation.sdk.core.invocations import Context, SDK
+
+
+async def test_concurrent_calls_share_one_flight_then_start_afresh():
+  flights = SingleFlight()
+  calls = 0
+  async def fetch():
+    nonlocal calls
+    calls += 1
+    await asyncio.sleep(0.01)
+    return calls
+
+  assert await asyncio.gather(*(flights.run('k', fetch) for _ in range(5))) == [1] * 5
+  assert await flights.run('k', fetch) == 2
+  assert flights.flights == {}
+
+
+async def test_errors_reach_every_waiter_and_lone_cancellation_cancels_the_call():
+  flights = SingleFlight()
+  async def fail():
+    await asyncio.sleep(0.01)
+    raise KeyError('boom')
+  results = await asyncio.gather(*(flights.run('k', fail) for _ in range(3)), return_exceptions=True)
+  assert all(isinstance(r, KeyError) for r in results)
+
+  started = asyncio.Event()
+  cancelled = asyncio.Event()
+  async def slow():
+    started.set()
+    try:
+      await asyncio.sleep(10)
+    except asyncio.CancelledError:
+      cancelled.set()
+      raise
+  waiter = asyncio.ensure_future(flights.run('slow', slow))
+  await started.wait()
+  waiter.cancel()
+  await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+async def test_call_after_lone_cancellation_starts_a_fresh_flight():
+  flights = SingleFlight()
+  calls = 0
+  async def fetch():
+    nonlocal calls
+    calls += 1
+    await asyncio.sleep(0.01)
+    return calls
+
+  waiter = asyncio.ensure_future(flights.run('k', fetch))
+  await asyncio.sleep(0)
+  waiter.cancel()
+  await asyncio.sleep(0)
+  # The cancelled flight has not landed yet; joining it would raise `CancelledError` here.
+  assert await flights.run('k', fetch) == 2
+  assert flights.flights == {}
+
+
+class Venue(SDK):
+  def __init__(self):
+    self.calls = 0
+
+  @SDK.method
+  async def rules(self, market: str) -> str:
+    self.calls += 1
+    await asyncio.sleep(0.01)
+    return market
+
+
+async def test_middleware_coalesces_equal_arguments_per_object():
+  a, b = Venue(), Venue()
+  with Context().coalesced().use():
+    results = await asyncio.gather(a.rules('BTC'), a.rules('BTC'), a.rules('ETH'), b.rules('BTC'))
+  assert results == ['BTC', 'BTC', 'ETH', 'BTC']
+  assert (a.calls, b.calls) == (2, 1)
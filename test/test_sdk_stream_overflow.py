@@ -6,6 +6,7 @@ always delivered promptly without silently dropping buffered data.
 """
 
 import asyncio
+import time
 
 import pytest
 
@@ -90,6 +91,59 @@ def test_terminal_is_idempotent_and_never_overflows_queue():
   assert len(items) == 2  # only one terminal marker
 
 
+def test_push_batch_matches_pushing_each_item():
+  latest = StreamInbox.new(2, 'latest')
+  assert latest.push('a') is True
+  assert latest.push_batch(['b', 'c', 'd']) is True
+  assert drain(latest.queue) == ['c', 'd']
+
+  fail = StreamInbox.new(3, 'fail')
+  assert fail.push_batch(['a', 'b']) is True
+  assert fail.push_batch(['c', 'd']) is False
+  items = drain(fail.queue)
+  assert items[:3] == ['a', 'b', 'c']
+  assert isinstance(items[3], _Failed)
+  # The overflowing item counts as offered, as it does under `push`.
+  assert fail.stats.pushed == 4
+
+
+def test_conflate_keeps_newest_per_key_when_full():
+  with pytest.raises(ValueError):
+    StreamInbox.new(2, 'conflate')
+  inbox = StreamInbox.new(2, 'conflate', key=lambda x: x[0])
+  for x in ('a1', 'b1', 'a2', 'c1', 'b2', 'a3'):
+    assert inbox.push(x) is True
+  inbox.close()
+  # a1 was superseded in place; b1 and c1 kept their queue position.
+  assert [inbox._value(item) for item in drain(inbox.queue)[:-1]] == ['a3', 'b2', 'c1']
+  assert inbox.keyed == {}
+
+
+async def test_conflate_after_dequeue_queues_a_fresh_item():
+  inbox = StreamInbox.new(1, 'conflate', key=lambda x: x[0])
+  inbox.push('a1')
+  inbox.push('a2')
+  assert await anext(aiter(inbox)) == 'a2'
+  inbox.push('a3')
+  inbox.push('b1')
+  inbox.push('a4')
+  inbox.close()
+  assert await collect(inbox) == ['a4', 'b1']
+
+
+async def test_inbox_stats_count_pushes_drops_and_latency():
+  inbox = StreamInbox.new(2, 'latest')
+  received = time.monotonic() - 1
+  inbox.push_batch(['a', 'b', 'c'], received)
+  inbox.push('d', received)
+  assert (inbox.stats.pushed, inbox.stats.dropped, inbox.stats.high_water, inbox.depth) == (4, 2, 2, 2)
+
+  assert await anext(aiter(inbox)) == 'c'
+  assert inbox.depth == 1
+  assert inbox.stats.dequeued == 1
+  assert inbox.stats.latency_max >= 1
+
+
 def test_push_after_close_is_rejected():
   inbox = StreamInbox.new(4, 'latest')
   inbox.push('a')
@@ -130,9 +184,34 @@ async def test_iteration_latches_terminal_and_does_not_hang():
   assert await asyncio.wait_for(collect(inbox), timeout=2) == []
 
 
+async def test_batches_yield_everything_buffered_then_fail():
+  inbox = StreamInbox.new(10, 'fail')
+  for x in 'abcde':
+    inbox.push(x)
+  inbox.fail(NetworkError('boom'))
+
+  batches = []
+  with pytest.raises(NetworkError):
+    async for batch in inbox.batches(max_items=3):
+      batches.append(batch)
+  assert batches == [['a', 'b', 'c'], ['d', 'e']]
+  with pytest.raises(NetworkError):
+    await anext(aiter(inbox))
+
+
+async def test_batches_max_wait_collects_late_items():
+  inbox = StreamInbox.new(10, 'fail')
+  inbox.push('a')
+  asyncio.get_running_loop().call_later(0.01, inbox.push, 'b')
+  asyncio.get_running_loop().call_later(0.02, inbox.close)
+
+  batches = [batch async for batch in inbox.batches(max_wait=1)]
+  assert batches == [['a', 'b']]
+
+
 # --- Subscription integration tests -----------------------------------------
 
-def driven_subscription():
+def driven_subscription(*, batched: bool = False):
   """A `Subscription` whose upstream is fed manually via the returned queue.
 
   Push items to drive the pump; push `None` to end the upstream.
@@ -150,7 +229,7 @@ def driven_subscription():
       ...
     return Subscription.Context(gen(), unsubscribe)
 
-  return Subscription(subscribe_stream), upstream
+  return Subscription(subscribe_stream, batched), upstream
 
 
 async def _settle():
@@ -189,3 +268,84 @@ async def test_latest_subscriber_skips_stale_and_sees_newest():
   assert first == 'c'  # stale 'a'/'b' skipped, newest book delivered
 
   await cm.__aexit__(None, None, None)
+
+
+async def test_batched_pump_delivers_ready_items_together():
+  sub, upstream = driven_subscription(batched=True)
+  calls = []
+  def view(item):
+    calls.append(item)
+    return item.upper()
+
+  async with sub.subscribe(queue_size=10, overflow='fail') as every, \
+    sub.subscribe(view=view, queue_size=2, overflow='latest') as newest:
+    for x in ('a', 'b', 'c', 'd'):
+      upstream.put_nowait(x)
+    await _settle()
+
+    assert [await anext(aiter(every)) for _ in range(4)] == ['a', 'b', 'c', 'd']
+    assert [await anext(aiter(newest)) for _ in range(2)] == ['C', 'D']
+    assert calls == ['c', 'd']  # one batch: items a `latest` inbox drops are never viewed
+
+    assert (sub.stats.items, sub.stats.batches) == (4, 1)
+    assert (newest.stats.pushed, newest.stats.dropped) == (4, 2)
+
+    upstream.put_nowait(None)
+    with pytest.raises(NetworkError):
+      await anext(aiter(every))
+
+
+# --- Subscriber views --------------------------------------------------------
+
+async def test_equal_views_are_built_once_per_item():
+  sub, upstream = driven_subscription()
+  calls = []
+  def view(item):
+    calls.append(item)
+    return item.upper()
+
+  async with sub.subscribe(view=view, queue_size=10, overflow='fail') as a, \
+    sub.subscribe(view=view, queue_size=10, overflow='fail') as b, \
+    sub.subscribe(queue_size=10, overflow='fail') as raw:
+    for x in ('a', 'b'):
+      upstream.put_nowait(x)
+    await _settle()
+
+    assert [await anext(aiter(a)) for _ in range(2)] == ['A', 'B']
+    assert [await anext(aiter(b)) for _ in range(2)] == ['A', 'B']
+    assert [await anext(aiter(raw)) for _ in range(2)] == ['a', 'b']
+  assert calls == ['a', 'b']  # one build per item, shared by both subscribers
+
+
+async def test_latest_view_is_built_on_dequeue_from_live_item():
+  sub, upstream = driven_subscription()
+  live = []
+  calls = 0
+  def snapshot(item: list):
+    nonlocal calls
+    calls += 1
+    return list(item)
+
+  async with sub.subscribe(view=snapshot, queue_size=1, overflow='latest') as stream:
+    for x in ('a', 'b', 'c'):
+      live.append(x)
+      upstream.put_nowait(live)  # the same object, mutated in place
+    await _settle()
+    assert calls == 0  # skipped items were never snapshotted
+
+    live.append('d')
+    assert await anext(aiter(stream)) == ['a', 'b', 'c', 'd']
+  assert calls == 1
+
+
+async def test_join_view_is_delivered_before_later_items():
+  sub, upstream = driven_subscription()
+  async with sub.subscribe(queue_size=10, overflow='fail') as first:
+    upstream.put_nowait('a')
+    await _settle()
+    assert await anext(aiter(first)) == 'a'
+
+    async with sub.subscribe(view=str.upper, join=lambda x: f'join:{x}', queue_size=10, overflow='fail') as late:
+      upstream.put_nowait('b')
+      await _settle()
+      assert [await anext(aiter(late)) for _ in range(2)] == ['join:a', 'B']